@@ -0,0 +1 @@
+"""Performance benchmarks of the kytos/pathfinder NApp."""
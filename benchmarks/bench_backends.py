@@ -0,0 +1,75 @@
+"""Compare the memory and latency of the graph backends.
+
+For each mesh size, the memory allocated by the networkx graph is compared
+with the memory allocated by its CSR copy, and the time to find
+``MAX_PATHS`` paths is measured with each backend. The copy is kept along
+with the networkx graph, so the CSR backend adds its memory to the graph's.
+
+Run it from the directory holding the ``napps`` package::
+
+    python -m napps.kytos.pathfinder.benchmarks.bench_backends
+"""
+import tracemalloc
+from time import perf_counter
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder import settings
+from napps.kytos.pathfinder.benchmarks.topologies import get_mesh_topology
+from napps.kytos.pathfinder.csr import CSRGraph
+from napps.kytos.pathfinder.graph import KytosGraph
+
+# pylint: enable=import-error
+
+SIZES = (8, 16, 32, 48)
+MAX_PATHS = 10
+METADATA = {'delay': 10, 'bandwidth': 100}
+
+
+def allocated(function, *args):
+    """Return the result of a call and the memory it left allocated."""
+    tracemalloc.start()
+    result = function(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def search_time(topology, backend, source, destination):
+    """Return the time to find the paths with a backend, once compiled."""
+    settings.GRAPH_BACKEND = backend
+    graph = KytosGraph()
+    graph.update_topology(topology)
+    start = perf_counter()
+    graph.shortest_paths(source, destination, 'delay', MAX_PATHS)
+    return perf_counter() - start
+
+
+def bench(size):
+    """Return the memory and search time of each backend on a mesh."""
+    topology = get_mesh_topology(size, METADATA)
+    graph = KytosGraph()
+    _, nx_size = allocated(graph.update_topology, topology)
+    _, csr_size = allocated(CSRGraph, graph.graph)
+
+    switches = list(topology.switches.values())
+    source = switches[0].interfaces[1].id
+    destination = switches[-1].interfaces[1].id
+    nx_time = search_time(topology, 'networkx', source, destination)
+    csr_time = search_time(topology, 'csr', source, destination)
+    return nx_size, csr_size, nx_time, csr_time
+
+
+def main():
+    """Print the memory and search time of each backend for each size."""
+    backend = settings.GRAPH_BACKEND
+    print(f"{'switches':>8} {'nx (KiB)':>9} {'csr (KiB)':>10} "
+          f"{'nx (ms)':>8} {'csr (ms)':>9}")
+    for size in SIZES:
+        nx_size, csr_size, nx_time, csr_time = bench(size)
+        print(f'{size:>8} {nx_size / 1024:>9.0f} {csr_size / 1024:>10.0f} '
+              f'{nx_time * 1000:>8.2f} {csr_time * 1000:>9.2f}')
+    settings.GRAPH_BACKEND = backend
+
+
+if __name__ == '__main__':
+    main()
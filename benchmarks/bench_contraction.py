@@ -0,0 +1,74 @@
+"""Compare the search on interface nodes with the switch-level search.
+
+For each mesh size, ``MAX_PATHS`` paths are found by networkx on a graph
+having a node for each switch and interface, as done before the graph was
+contracted, and by ``KytosGraph.shortest_paths`` on the switch-level graph.
+Both return the same hops.
+
+Run it from the directory holding the ``napps`` package::
+
+    python -m napps.kytos.pathfinder.benchmarks.bench_contraction
+"""
+from itertools import islice
+from time import perf_counter
+
+import networkx as nx
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.benchmarks.topologies import get_mesh_topology
+from napps.kytos.pathfinder.graph import KytosGraph
+
+# pylint: enable=import-error
+
+SIZES = (8, 16, 32, 48)
+MAX_PATHS = 10
+METADATA = {'delay': 10, 'bandwidth': 100}
+
+
+def get_interface_graph(topology):
+    """Return a graph with a node for each switch and interface."""
+    graph = nx.Graph()
+    for switch in topology.switches.values():
+        for interface in switch.interfaces.values():
+            graph.add_edge(switch.id, interface.id, delay=0, bandwidth=0)
+    for link in topology.links.values():
+        graph.add_edge(link.endpoint_a.id, link.endpoint_b.id,
+                       **link.metadata)
+    return graph
+
+
+def bench(size):
+    """Return the node counts and search times of both graphs on a mesh."""
+    topology = get_mesh_topology(size, METADATA)
+    interface_graph = get_interface_graph(topology)
+    graph = KytosGraph()
+    graph.update_topology(topology)
+    switches = list(topology.switches.values())
+    source = switches[0].interfaces[1].id
+    destination = switches[-1].interfaces[1].id
+
+    start = perf_counter()
+    list(islice(nx.shortest_simple_paths(interface_graph, source,
+                                         destination, 'delay'), MAX_PATHS))
+    interface_time = perf_counter() - start
+
+    start = perf_counter()
+    graph.shortest_paths(source, destination, 'delay', MAX_PATHS)
+    switch_time = perf_counter() - start
+    return (interface_graph.number_of_nodes(), graph.graph.number_of_nodes(),
+            interface_time, switch_time)
+
+
+def main():
+    """Print the size and search time of both graphs for each mesh size."""
+    print(f"{'switches':>8} {'nodes':>6} {'contracted':>10} "
+          f"{'interfaces (ms)':>16} {'switches (ms)':>14} {'speedup':>8}")
+    for size in SIZES:
+        nodes, contracted, interface_time, switch_time = bench(size)
+        print(f'{size:>8} {nodes:>6} {contracted:>10} '
+              f'{interface_time * 1000:>16.2f} {switch_time * 1000:>14.2f} '
+              f'{interface_time / switch_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Compare the ALT search with the bidirectional Dijkstra search.
+
+For each WAN size, ``QUERIES`` pairs of switches are searched for their
+shortest path by delay and for their ``MAX_PATHS`` shortest paths, first
+with the bidirectional Dijkstra search and then with A* over ``LANDMARKS``
+landmarks. The time taken to pick the landmarks and compute their distances
+on a topology update is reported as well.
+
+Run it from the directory holding the ``napps`` package::
+
+    python -m napps.kytos.pathfinder.benchmarks.bench_landmarks
+"""
+from itertools import islice
+from random import Random
+from time import perf_counter
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.benchmarks.topologies import get_wan_topology
+from napps.kytos.pathfinder.graph import KytosGraph
+
+# pylint: enable=import-error
+
+SIZES = (100, 400, 1000)
+QUERIES = 20
+MAX_PATHS = 10
+LANDMARKS = 8
+
+
+def search_time(engine, pairs, max_paths):
+    """Return the time to find the paths of every pair."""
+    start = perf_counter()
+    for source, destination in pairs:
+        list(islice(engine.simple_paths(source, destination, 'delay'),
+                    max_paths))
+    return perf_counter() - start
+
+
+def bench(size):
+    """Return the landmark and search times on a WAN of a given size."""
+    graph = KytosGraph()
+    graph.update_topology(get_wan_topology(size))
+    rand = Random(size)
+    pairs = [rand.sample(list(graph.graph), 2) for _ in range(QUERIES)]
+
+    dijkstra = graph.get_engine()
+    # pylint: disable=protected-access
+    alt = KytosGraph._get_engine(graph.graph)
+    start = perf_counter()
+    alt.set_landmarks(LANDMARKS)
+    landmark_time = perf_counter() - start
+    return (landmark_time,
+            [(search_time(dijkstra, pairs, max_paths),
+              search_time(alt, pairs, max_paths))
+             for max_paths in (1, MAX_PATHS)])
+
+
+def main():
+    """Print the landmark and search times for each WAN size."""
+    print(f"{'switches':>8} {'landmarks (ms)':>14} {'paths':>5} "
+          f"{'dijkstra (ms)':>13} {'alt (ms)':>9} {'speedup':>8}")
+    for size in SIZES:
+        landmark_time, times = bench(size)
+        for max_paths, (dijkstra_time, alt_time) in zip((1, MAX_PATHS),
+                                                        times):
+            print(f'{size:>8} {landmark_time * 1000:>14.1f} {max_paths:>5} '
+                  f'{dijkstra_time * 1000:>13.2f} {alt_time * 1000:>9.2f} '
+                  f'{dijkstra_time / alt_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Measure the cost of bounded k-shortest-path enumeration on full meshes.
+
+The number of simple paths of a full mesh grows factorially with its size,
+while the cost of each path found by Yen's algorithm only depends on the size
+of the graph. With ``max_paths`` bounding the enumeration, the time per
+returned path should stay flat as k grows.
+
+Run it from the directory holding the ``napps`` package::
+
+    python -m napps.kytos.pathfinder.benchmarks.bench_max_paths
+"""
+from time import perf_counter
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.benchmarks.topologies import get_mesh_topology
+from napps.kytos.pathfinder.graph import KytosGraph
+
+# pylint: enable=import-error
+
+SIZES = (8, 16, 32)
+MAX_PATHS = (1, 10, 100)
+
+
+def bench(size, max_paths):
+    """Return the time spent to find ``max_paths`` paths on a mesh."""
+    graph = KytosGraph()
+    topology = get_mesh_topology(size)
+    graph.update_topology(topology)
+    switches = list(topology.switches.values())
+    source = switches[0].interfaces[1].id
+    destination = switches[-1].interfaces[1].id
+
+    start = perf_counter()
+    paths = graph.shortest_paths(source, destination, max_paths=max_paths)
+    return perf_counter() - start, len(paths)
+
+
+def main():
+    """Print the time per returned path for each size and k."""
+    print(f"{'switches':>8} {'k':>5} {'paths':>5} {'total (ms)':>11} "
+          f"{'per path (ms)':>14}")
+    for size in SIZES:
+        for max_paths in MAX_PATHS:
+            elapsed, found = bench(size, max_paths)
+            print(f'{size:>8} {max_paths:>5} {found:>5} '
+                  f'{elapsed * 1000:>11.2f} {elapsed * 1000 / found:>14.3f}')
+
+
+if __name__ == '__main__':
+    main()
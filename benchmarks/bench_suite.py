@@ -0,0 +1,291 @@
+"""Measure the graph builds, updates and path queries on synthetic networks.
+
+Fat-tree, ring, grid and random WAN topologies of several sizes are built
+from the same mocks, with a fixed seed. On each one, the suite records the
+time to build the graph from scratch, to load it from a checkpoint, to
+apply a link flap, the memory held by the graph, and the median time of
+path queries by hop count, by delay and under constraints, asking for one
+and for ``MAX_PATHS`` paths, along with the number of paths they found.
+The constraints are derived from the link metadata of each topology, so
+that most pairs still have a path. The queries bypass the path cache and
+the worker pool. The time to import the NApp, which the controller waits for
+on startup, is measured once, in new interpreters.
+
+The results are printed, and written as JSON with ``--output`` so that two
+runs, for instance of two releases, can be compared with ``--compare``::
+
+    python -m napps.kytos.pathfinder.benchmarks.bench_suite -o new.json
+    python -m napps.kytos.pathfinder.benchmarks.bench_suite --compare old.json
+
+Run it from the directory holding the ``napps`` package.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from random import Random
+from statistics import median
+from time import perf_counter
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.benchmarks.topologies import (
+    get_fat_tree_topology, get_grid_topology, get_ring_topology,
+    get_wan_topology)
+from napps.kytos.pathfinder.graph import KytosGraph
+
+# pylint: enable=import-error
+
+TOPOLOGIES = {
+    'fat-tree': lambda size: get_fat_tree_topology(size, SEED),
+    'ring': lambda size: get_ring_topology(size, SEED),
+    'grid': lambda size: get_grid_topology(size, size, SEED),
+    'wan': lambda size: get_wan_topology(size, seed=SEED),
+}
+SIZES = {
+    'fat-tree': (4, 8, 12),
+    'ring': (64, 256),
+    'grid': (8, 16),
+    'wan': (100, 400),
+}
+QUERIES = {
+    'hops': {},
+    'delay': {'parameter': 'delay'},
+}
+PAIRS = 20
+# Quantiles of the link bandwidths tried as the minimum of the constrained
+# queries, from the strictest, with the opposite quantile of the delays as
+# their maximum. The first one leaving a path for MIN_CONNECTED of the pairs
+# is used.
+QUANTILES = (0.5, 0.25, 0.1, 0)
+MIN_CONNECTED = 0.8
+REPEATS = 3
+MAX_PATHS = 10
+SEED = 0
+
+
+def build_time(topology):
+    """Return the median time to build a new graph from a topology."""
+    times = []
+    for _ in range(REPEATS):
+        start = perf_counter()
+        KytosGraph().update_topology(topology)
+        times.append(perf_counter() - start)
+    return median(times)
+
+
+def import_time():
+    """Return the median time to import the NApp main module.
+
+    Each import runs in a new interpreter, after the Kytos packages, so
+    that only the modules of the NApp and the packages they need count.
+    """
+    code = ('from time import perf_counter\n'
+            'import kytos.core, kytos.core.helpers, flask\n'
+            'start = perf_counter()\n'
+            'import napps.kytos.pathfinder.main\n'
+            'print(perf_counter() - start)')
+    times = []
+    for _ in range(REPEATS):
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        times.append(float(output))
+    return median(times)
+
+
+def load_time(graph):
+    """Return the median time to load a graph from its checkpoint."""
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'graph.checkpoint')
+        graph.save(path)
+        for _ in range(REPEATS):
+            start = perf_counter()
+            KytosGraph().load(path)
+            times.append(perf_counter() - start)
+    return median(times)
+
+
+def update_time(graph, topology):
+    """Return the median time to apply a link flap to a graph."""
+    link = next(iter(topology.links.values()))
+    times = []
+    for _ in range(REPEATS):
+        for active in (False, True):
+            link.is_active.return_value = active
+            start = perf_counter()
+            graph.update_topology(topology)
+            times.append(perf_counter() - start)
+    return median(times)
+
+
+def graph_memory(topology):
+    """Return the bytes allocated by a graph holding a topology."""
+    tracemalloc.start()
+    graph = KytosGraph()
+    graph.update_topology(topology)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graph
+    return size
+
+
+def get_quantile(values, fraction):
+    """Return the value found at a fraction of a sorted list."""
+    return values[round(fraction * (len(values) - 1))]
+
+
+def get_constraints(topology, engine, pairs):
+    """Return constraints on the link metadata that most pairs can meet.
+
+    The links below a bandwidth quantile or above a delay quantile are
+    pruned, at the strictest of QUANTILES leaving a path for MIN_CONNECTED
+    of the pairs. The delay along a path is bounded by half again the
+    delay of the longest of the best paths left, so that every pair left
+    keeps its best path while the other paths are cut short.
+    """
+    bandwidths = sorted(link.metadata['bandwidth']
+                        for link in topology.links.values())
+    delays = sorted(link.metadata['delay']
+                    for link in topology.links.values())
+    for quantile in QUANTILES:
+        constraints = [('bandwidth', 'min', get_quantile(bandwidths,
+                                                         quantile)),
+                       ('delay', 'max', get_quantile(delays, 1 - quantile))]
+        costs = []
+        for source, destination in pairs:
+            paths, _ = KytosGraph.search(engine, source, destination,
+                                         'delay', 1, None, None, constraints)
+            costs.extend(path.cost for path in paths)
+        if len(costs) >= MIN_CONNECTED * len(pairs):
+            break
+    return constraints + [('delay', 'max_total', 1.5 * max(costs))]
+
+
+def query_time(engine, pairs, query, max_paths):
+    """Return the median time of a query between each pair.
+
+    The number of paths found for all the pairs is returned as well.
+    """
+    times = []
+    count = 0
+    for source, destination in pairs:
+        start = perf_counter()
+        paths, _ = KytosGraph.search(engine, source, destination,
+                                     query.get('parameter'), max_paths,
+                                     None, None, query.get('constraints'))
+        times.append(perf_counter() - start)
+        count += len(paths)
+    return median(times), count
+
+
+def bench(name, size):
+    """Return the measures of a topology of a given size."""
+    topology = TOPOLOGIES[name](size)
+    graph = KytosGraph()
+    graph.update_topology(topology)
+    rand = Random(SEED)
+    pairs = [rand.sample(sorted(topology.switches), 2) for _ in range(PAIRS)]
+
+    result = {'topology': name, 'size': size,
+              'switches': len(topology.switches),
+              'links': len(topology.links),
+              'build_ms': build_time(topology) * 1000,
+              'load_ms': load_time(graph) * 1000,
+              'update_ms': update_time(graph, topology) * 1000,
+              'memory_kb': graph_memory(topology) / 1024,
+              'queries_ms': {}, 'queries_paths': {}}
+    engine = graph.get_engine()
+    constraints = get_constraints(topology, engine, pairs)
+    result['constraints'] = constraints
+    queries = dict(QUERIES, constrained={'parameter': 'delay',
+                                         'constraints': constraints})
+    for query_name, query in queries.items():
+        for max_paths in (1, MAX_PATHS):
+            key = f'{query_name}/{max_paths}'
+            seconds, result['queries_paths'][key] = query_time(
+                engine, pairs, query, max_paths)
+            result['queries_ms'][key] = seconds * 1000
+    return result
+
+
+def get_measures(result):
+    """Return the flat ``{name: value}`` measures of a result."""
+    measures = {key: result[key]
+                for key in ('build_ms', 'load_ms', 'update_ms',
+                            'memory_kb')}
+    measures.update((f'{key}_ms', value)
+                    for key, value in result['queries_ms'].items())
+    return measures
+
+
+def run(quick=False):
+    """Return the report of every topology and size."""
+    results = []
+    for name, sizes in SIZES.items():
+        for size in sizes[:1] if quick else sizes:
+            results.append(bench(name, size))
+    with open(os.path.join(os.path.dirname(__file__), os.pardir,
+                           'kytos.json'), encoding='utf-8') as napp_file:
+        version = json.load(napp_file)['version']
+    return {'version': version, 'python': platform.python_version(),
+            'seed': SEED, 'pairs': PAIRS, 'import_ms': import_time() * 1000,
+            'results': results}
+
+
+def compare(report, baseline):
+    """Print the ratio of each measure of a report to a baseline.
+
+    Ratios above 1 mean the report is slower or larger than the baseline.
+    """
+    baseline_results = {(result['topology'], result['size']): result
+                        for result in baseline['results']}
+    print(f"{'topology':>8} {'size':>5} {'measure':>22} {'baseline':>10} "
+          f"{'current':>10} {'ratio':>6} {'paths':>6}")
+    if baseline.get('import_ms'):
+        print(f"{'':>8} {'':>5} {'import_ms':>22} "
+              f"{baseline['import_ms']:>10.2f} {report['import_ms']:>10.2f} "
+              f"{report['import_ms'] / baseline['import_ms']:>5.2f}x")
+    for result in report['results']:
+        old = baseline_results.get((result['topology'], result['size']))
+        if old is None:
+            continue
+        old_measures = get_measures(old)
+        paths = result['queries_paths']
+        for key, value in get_measures(result).items():
+            if old_measures.get(key):
+                print(f"{result['topology']:>8} {result['size']:>5} "
+                      f'{key:>22} {old_measures[key]:>10.2f} '
+                      f'{value:>10.2f} {value / old_measures[key]:>5.2f}x '
+                      f"{paths.get(key[:-len('_ms')], ''):>6}")
+
+
+def main():
+    """Run the suite, then print, write or compare its report."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n', maxsplit=1)[0])
+    parser.add_argument('-o', '--output', help='file to write the report')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='report file to compare the results with')
+    parser.add_argument('--quick', action='store_true',
+                        help='measure only the smallest size of each '
+                        'topology')
+    args = parser.parse_args()
+
+    report = run(args.quick)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            compare(report, json.load(baseline_file))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
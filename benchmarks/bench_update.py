@@ -0,0 +1,104 @@
+"""Compare rebuilding the graph with applying a port flap to it.
+
+For each mesh size, a link going down and back up is applied to a graph that
+already holds the topology, either by building a new graph and engine from
+scratch, or through ``KytosGraph.update_topology``, which patches the graph
+and reuses the engine. The topology elements are read beforehand, since
+reading the mocks standing for the switches and links takes longer than the
+update itself. The time the updates hold the graph lock, keeping other
+writers waiting, is shown too.
+
+Run it from the directory holding the ``napps`` package::
+
+    python -m napps.kytos.pathfinder.benchmarks.bench_update
+"""
+import gc
+from threading import Lock
+from time import perf_counter
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.benchmarks.topologies import get_mesh_topology
+from napps.kytos.pathfinder.graph import KytosGraph
+
+# pylint: enable=import-error
+
+SIZES = (8, 16, 32, 48)
+REPEAT = 5
+METADATA = {'delay': 10, 'bandwidth': 100}
+
+
+class TimedLock:
+    """Lock adding up the time it is held."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.held = 0
+        self.start = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.start = perf_counter()
+
+    def __exit__(self, *_):
+        self.held += perf_counter() - self.start
+        self.lock.release()
+
+
+def rebuild(graph, topology):
+    """Build a new graph and engine holding all the topology elements."""
+    # pylint: disable=protected-access
+    new_graph = KytosGraph()
+    new_graph._get_elements = graph._get_elements
+    new_graph.update_topology(topology)
+
+
+def bench(size, update):
+    """Return the time spent by ``update`` to apply a port flap.
+
+    The best time of REPEAT flaps is returned, with the time the graph lock
+    was held meanwhile. The garbage collector is paused, as ``timeit``
+    does, since the mocks of the topology make its runs slow and erratic.
+    """
+    # pylint: disable=protected-access
+    graph = KytosGraph()
+    topology = get_mesh_topology(size, METADATA)
+    graph.update_topology(topology)
+    link = next(iter(topology.links.values()))
+    states = []
+    for active in (False, True):
+        link.is_active.return_value = active
+        states.append(KytosGraph._get_elements(topology))
+    graph._lock = TimedLock()
+
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(REPEAT):
+            graph._lock.held = 0
+            start = perf_counter()
+            for elements in states:
+                graph._get_elements = lambda _, elements=elements: elements
+                update(graph, topology)
+            times.append((perf_counter() - start, graph._lock.held))
+        return min(times)
+    finally:
+        gc.enable()
+
+
+def main():
+    """Print the rebuild and port flap update times for each size."""
+    print(f"{'switches':>8} {'links':>6} {'rebuild (ms)':>13} "
+          f"{'port flap (ms)':>17} {'speedup':>8} {'locked (ms)':>12}")
+    for size in SIZES:
+        rebuild_time, _ = bench(size, rebuild)
+        update_time, locked_time = bench(size, KytosGraph.update_topology)
+        links = size * (size - 1) // 2
+        print(f'{size:>8} {links:>6} {rebuild_time * 1000:>13.2f} '
+              f'{update_time * 1000:>17.2f} '
+              f'{rebuild_time / update_time:>7.1f}x '
+              f'{locked_time * 1000:>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Synthetic topologies used by the benchmarks.
+
+The objects expose the same attributes as the mocks created by
+``kytos.lib.helpers``, but are plain ``Mock`` instances, because building
+thousands of autospec mocks would take longer than the benchmarks themselves.
+"""
+from itertools import combinations
+from math import hypot
+from random import Random
+from unittest.mock import Mock
+
+
+def get_switch(number):
+    """Return a switch whose dpid is derived from ``number``."""
+    dpid = ':'.join(f'{byte:02x}' for byte in number.to_bytes(8, 'big'))
+    return Mock(id=dpid, dpid=dpid, interfaces={})
+
+
+def get_interface(switch, port_number):
+    """Return a new interface of ``switch`` and register it there."""
+    interface = Mock(id=f'{switch.dpid}:{port_number}',
+                     port_number=port_number, switch=switch)
+    switch.interfaces[port_number] = interface
+    return interface
+
+
+def get_link(endpoint_a, endpoint_b, metadata=None):
+    """Return an active link between two interfaces."""
+    link = Mock(id=f'{endpoint_a.id}-{endpoint_b.id}',
+                endpoint_a=endpoint_a, endpoint_b=endpoint_b,
+                metadata=metadata or {})
+    link.is_active.return_value = True
+    return link
+
+
+def get_topology(switches, links):
+    """Return a topology with the given switches and links lists."""
+    return Mock(switches={switch.dpid: switch for switch in switches},
+                links={link.id: link for link in links})
+
+
+def get_random_metadata(rand):
+    """Return link metadata with a random ``delay`` and ``bandwidth``."""
+    return {'delay': rand.randint(1, 100),
+            'bandwidth': rand.choice((1, 10, 100))}
+
+
+def link_switches(switch_a, switch_b, metadata=None):
+    """Return a link between new interfaces of two switches."""
+    endpoint_a = get_interface(switch_a, len(switch_a.interfaces) + 1)
+    endpoint_b = get_interface(switch_b, len(switch_b.interfaces) + 1)
+    return get_link(endpoint_a, endpoint_b, metadata)
+
+
+def get_mesh_topology(size, metadata=None):
+    """Return a full mesh of ``size`` switches.
+
+    Every link receives a copy of ``metadata``.
+    """
+    switches = [get_switch(number) for number in range(1, size + 1)]
+    links = []
+    for switch_a, switch_b in combinations(switches, 2):
+        links.append(link_switches(switch_a, switch_b,
+                                   dict(metadata or {})))
+    return get_topology(switches, links)
+
+
+def get_ring_topology(size, seed=0):
+    """Return a ring of ``size`` switches with random link metadata."""
+    rand = Random(seed)
+    switches = [get_switch(number) for number in range(1, size + 1)]
+    links = [link_switches(switch, switches[index - 1],
+                           get_random_metadata(rand))
+             for index, switch in enumerate(switches)]
+    return get_topology(switches, links)
+
+
+def get_grid_topology(rows, columns, seed=0):
+    """Return a grid of ``rows`` by ``columns`` switches.
+
+    Each switch is linked to its neighbours on the same row and column, with
+    random link metadata.
+    """
+    rand = Random(seed)
+    switches = [get_switch(number) for number in range(1, rows * columns + 1)]
+    links = []
+    for index, switch in enumerate(switches):
+        if index % columns:
+            links.append(link_switches(switches[index - 1], switch,
+                                       get_random_metadata(rand)))
+        if index >= columns:
+            links.append(link_switches(switches[index - columns], switch,
+                                       get_random_metadata(rand)))
+    return get_topology(switches, links)
+
+
+def get_fat_tree_topology(pods, seed=0):
+    """Return a fat-tree of switches with ``pods`` pods, an even number.
+
+    Each pod holds ``pods / 2`` edge and aggregation switches, fully linked
+    to each other, and the aggregation switch of rank ``i`` of every pod is
+    linked to the ``i``-th group of ``pods / 2`` of the ``(pods / 2) ** 2``
+    core switches. Hosts are left out, and links get random metadata.
+    """
+    rand = Random(seed)
+    half = pods // 2
+    numbers = iter(range(1, 5 * half * half + 1))
+    core = [get_switch(next(numbers)) for _ in range(half * half)]
+    switches = list(core)
+    links = []
+    for _ in range(pods):
+        aggregation = [get_switch(next(numbers)) for _ in range(half)]
+        edge = [get_switch(next(numbers)) for _ in range(half)]
+        switches.extend(aggregation + edge)
+        for rank, switch_a in enumerate(aggregation):
+            links.extend(link_switches(switch_a, switch_b,
+                                       get_random_metadata(rand))
+                         for switch_b in edge)
+            links.extend(link_switches(switch_a, switch_b,
+                                       get_random_metadata(rand))
+                         for switch_b in core[rank * half:(rank + 1) * half])
+    return get_topology(switches, links)
+
+
+def get_wan_pairs(points, degree):
+    """Return the index pairs of the points to link in a WAN.
+
+    Each point is paired with its ``degree`` nearest points, and with the
+    next point when that is needed to keep the network connected.
+    """
+    pairs = set()
+    for index, point in enumerate(points):
+        nearest = sorted(range(len(points)), key=lambda other, point=point:
+                         hypot(points[other][0] - point[0],
+                               points[other][1] - point[1]))
+        pairs.update(tuple(sorted((index, other)))
+                     for other in nearest[1:degree + 1])
+
+    components = list(range(len(points)))
+
+    def find(index):
+        while components[index] != index:
+            index = components[index]
+        return index
+
+    for index_a, index_b in pairs:
+        components[find(index_a)] = find(index_b)
+    for index in range(1, len(points)):
+        if find(index - 1) != find(index):
+            pairs.add((index - 1, index))
+            components[find(index - 1)] = find(index)
+    return sorted(pairs)
+
+
+def get_wan_topology(size, degree=3, seed=0):
+    """Return a random WAN of ``size`` switches spread over a square.
+
+    Each switch is linked to its ``degree`` nearest switches, and to others
+    as needed to keep the network connected. The ``delay`` of a link grows
+    with the distance it spans, while its ``bandwidth`` is picked at random.
+    """
+    rand = Random(seed)
+    switches = [get_switch(number) for number in range(1, size + 1)]
+    points = [(rand.random(), rand.random()) for _ in switches]
+    links = []
+    for index_a, index_b in get_wan_pairs(points, degree):
+        switch_a, switch_b = switches[index_a], switches[index_b]
+        distance = hypot(points[index_a][0] - points[index_b][0],
+                         points[index_a][1] - points[index_b][1])
+        links.append(link_switches(switch_a, switch_b, {
+            'delay': max(1, round(distance * 100)),
+            'bandwidth': rand.choice((1, 10, 100))}))
+    return get_topology(switches, links)
@@ -0,0 +1,116 @@
+"""Module Cache of kytos/pathfinder Kytos Network Application."""
+
+from collections import OrderedDict, defaultdict
+from threading import Lock
+
+
+class PathCache:
+    """Bounded LRU cache of path results.
+
+    Each entry holds the paths found for a query, and an index from every edge
+    to the entries whose paths use it allows evicting only the entries
+    affected by the removal of some edges.
+
+    The paths are stored and returned as they are, so they are not to be
+    changed by the callers.
+
+    A result is only stored if it was computed on the latest graph version
+    known by the cache, so a search that ran while the topology changed can
+    not leave a stale entry behind.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._edges = defaultdict(set)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _get_edges(paths):
+        """Return the edges used by a list of paths."""
+        return {frozenset(edge) for path in paths
+                for edge in zip(path[:-1], path[1:])}
+
+    def get(self, key, max_paths=None):
+        """Return the first ``max_paths`` paths cached for a key.
+
+        None is returned when there is no entry for the key or when the entry
+        holds fewer paths than requested while more paths might exist.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                paths, complete = entry
+                if complete or (max_paths and len(paths) >= max_paths):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return paths[:max_paths]
+            self.misses += 1
+            return None
+
+    def put(self, key, paths, version, max_paths=None):
+        """Store the paths found for a key on a given graph version.
+
+        Finding fewer than ``max_paths`` paths means that every path was
+        found, so the entry can also answer queries asking for more paths.
+        """
+        if not self.max_size:
+            return
+        complete = max_paths is None or len(paths) < max_paths
+        with self._lock:
+            if version != self.version:
+                return
+            self._remove(key)
+            self._entries[key] = (list(paths), complete)
+            for edge in self._get_edges(paths):
+                self._edges[edge].add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, version, edges=None):
+        """Move to a new graph version, evicting the affected entries.
+
+        Only the entries whose paths use one of ``edges`` are evicted. When
+        ``edges`` is None, every entry is evicted.
+        """
+        with self._lock:
+            self.version = version
+            if edges is None:
+                keys = list(self._entries)
+            else:
+                keys = {key for edge in edges
+                        for key in self._edges.get(frozenset(edge), ())}
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+
+    def _remove(self, key):
+        """Remove an entry and its edge index references, if present."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for edge in self._get_edges(entry[0]):
+            keys = self._edges[edge]
+            keys.discard(key)
+            if not keys:
+                del self._edges[edge]
+
+    def stats(self):
+        """Return the cache counters."""
+        with self._lock:
+            return {'size': len(self._entries),
+                    'max_size': self.max_size,
+                    'version': self.version,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'invalidations': self.invalidations}
@@ -0,0 +1,68 @@
+"""Module Checkpoint of kytos/pathfinder Kytos Network Application."""
+
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+
+from kytos.core import log
+
+# Bumped whenever the contents of the checkpoint files change, so that the
+# files written by other versions are ignored instead of misread.
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct('<8sH')
+_MAGIC = b'KPFGRAPH'
+
+
+def save_checkpoint(path, graph, engine, key):
+    """Write a graph and its engine to a checkpoint file.
+
+    ``key`` describes the settings the engine was built with. The file is
+    written next to its final path and then renamed over it, so a crash
+    never leaves a partial checkpoint behind.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as checkpoint_file:
+            checkpoint_file.write(_HEADER.pack(_MAGIC, FORMAT_VERSION))
+            pickle.dump({'key': key, 'graph': graph, 'engine': engine},
+                        checkpoint_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def load_checkpoint(path):
+    """Return the ``(graph, engine, key)`` of a checkpoint file, or None.
+
+    The file is memory-mapped and unpickled from the mapping, without being
+    read into a buffer first. None is returned when the file is missing,
+    unreadable or written in another format version. Any failure to
+    unpickle it, such as a class renamed or moved since it was written,
+    makes it unreadable.
+    """
+    try:
+        with open(path, 'rb') as checkpoint_file, \
+                mmap.mmap(checkpoint_file.fileno(), 0,
+                          access=mmap.ACCESS_READ) as mapping:
+            if mapping[:_HEADER.size] != _HEADER.pack(_MAGIC,
+                                                      FORMAT_VERSION):
+                log.warning(f'Ignoring the graph checkpoint {path}, written '
+                            'in another format.')
+                return None
+            mapping.seek(_HEADER.size)
+            content = pickle.load(mapping)
+            return content['graph'], content['engine'], content['key']
+    except FileNotFoundError:
+        return None
+    except OSError:
+        raise
+    except Exception as error:  # pylint: disable=broad-except
+        log.warning(f'Ignoring the unreadable graph checkpoint {path}: '
+                    f'{error!r}')
+        return None
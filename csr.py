@@ -0,0 +1,97 @@
+"""Module CSR of kytos/pathfinder Kytos Network Application."""
+
+# A missing NumPy fails the import, so get_engine_class uses networkx.
+import numpy as np
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.search import PathSearch
+
+# pylint: enable=import-error
+
+
+class CSRGraph(PathSearch):
+    """Compact, read-only copy of a graph used to search paths.
+
+    Node IDs are interned to integers and the adjacency is kept in compressed
+    sparse row (CSR) form: the neighbors of the node ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]``, reached through the edges
+    ``edges[indptr[i]:indptr[i + 1]]``. Each numeric metadata key is stored
+    as an array indexed by edge, made when a search first weighs by it. The
+    arrays hold integers when every value is one, so the costs have the same
+    type as the ones of the other engines.
+    """
+
+    def __init__(self, graph, defaults=None):
+        edges = self.get_edges(graph)
+        super().__init__(graph, edges, defaults)
+        self.nodes = list(graph)
+        self.index = {node: index for index, node in enumerate(self.nodes)}
+
+        self.endpoints = np.array(
+            [(self.index[node_a], self.index[node_b])
+             for node_a, node_b, _, _ in edges], dtype=np.int32).reshape(-1, 2)
+
+        heads = np.concatenate((self.endpoints[:, 0], self.endpoints[:, 1]))
+        tails = np.concatenate((self.endpoints[:, 1], self.endpoints[:, 0]))
+        order = np.argsort(heads, kind='stable')
+        self.indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(heads, minlength=len(self.nodes)),
+                  out=self.indptr[1:])
+        self.indices = tails[order].astype(np.int32)
+        self.edges = (order % max(len(edges), 1)).astype(np.int32)
+        self.spans = np.array(self.spans, dtype=np.int8)
+
+        self.columns = {}
+
+        self._set_views()
+
+    def __getstate__(self):
+        """Return the attributes to pickle, leaving the memoryviews out."""
+        state = dict(self.__dict__)
+        state['_views'] = None
+        state['_costs'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._set_views()
+
+    def _set_views(self):
+        """Keep memoryviews of the adjacency arrays, faster to slice."""
+        self._views = {'indptr': memoryview(self.indptr),
+                       'indices': memoryview(self.indices),
+                       'edges': memoryview(self.edges)}
+
+    @property
+    def nbytes(self):
+        """Return the memory used by the arrays of the graph."""
+        return (self.endpoints.nbytes + self.indptr.nbytes +
+                self.indices.nbytes + self.edges.nbytes + self.spans.nbytes +
+                sum(column.nbytes for column in self.columns.values()))
+
+    def _node(self, name):
+        """Return the index of a node, or None if it is not a node."""
+        return self.index.get(name)
+
+    def _name(self, node):
+        """Return the ID of a node index."""
+        return self.nodes[node]
+
+    def _adjacent(self, node):
+        """Return ``(neighbor, edge)`` for each edge of a node."""
+        start, end = self._views['indptr'][node:node + 2]
+        return zip(self._views['indices'][start:end].tolist(),
+                   self._views['edges'][start:end].tolist())
+
+    def _build_costs(self, weight, hop_cost):
+        """Return the cost of each edge, given the cost of a switch hop."""
+        if weight not in self.keys:
+            column = np.ones(len(self.links), dtype=np.int64)
+        else:
+            column = self.columns.get(weight)
+            if column is None:
+                column = np.array(self._get_column(weight))
+                if column.dtype.kind not in 'if':
+                    column = column.astype(np.float64)
+                self.columns[weight] = column
+        return memoryview(column + self.spans * hop_cost)
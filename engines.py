@@ -0,0 +1,33 @@
+"""Module Engines of kytos/pathfinder Kytos Network Application."""
+
+from importlib import import_module
+
+from kytos.core import log
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder import settings
+
+# pylint: enable=import-error
+
+
+def get_engine_class(name):
+    """Return the path search engine class registered under a name.
+
+    The classes are listed by dotted path in GRAPH_ENGINES, and their module
+    is only imported when an engine is first built with them, along with
+    the packages it needs. An unknown name, or an engine that fails to
+    import, gets the networkx engine.
+    """
+    path = settings.GRAPH_ENGINES.get(name)
+    if path is None:
+        log.error(f'Unknown GRAPH_BACKEND {name!r}, using networkx.')
+        return get_engine_class('networkx')
+    module, _, attribute = path.rpartition('.')
+    try:
+        return getattr(import_module(module), attribute)
+    except (ImportError, AttributeError) as error:
+        if name == 'networkx':
+            raise
+        log.error(f'Could not import the {name} engine, using networkx: '
+                  f'{error!r}')
+        return get_engine_class('networkx')
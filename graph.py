@@ -1,68 +1,394 @@
 """Module Graph of kytos/pathfinder Kytos Network Application."""
 
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, permutations, product
+from threading import Lock
+from time import perf_counter, time
+
 from kytos.core import log
 
+# pylint: disable=import-error
+from napps.kytos.pathfinder import settings
+from napps.kytos.pathfinder.cache import PathCache
+from napps.kytos.pathfinder.checkpoint import (load_checkpoint,
+                                               save_checkpoint)
+from napps.kytos.pathfinder.engines import get_engine_class
+from napps.kytos.pathfinder.metrics import Metrics
+from napps.kytos.pathfinder.paths import HopNames, LazyPaths, merge_chains
+from napps.kytos.pathfinder.search import PathSearch
+
+# pylint: enable=import-error
+
 try:
     import networkx as nx
-    from networkx.exception import NodeNotFound, NetworkXNoPath
 except ImportError:
     PACKAGE = 'networkx>=2.2'
     log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
 
 
+_Snapshot = namedtuple('_Snapshot', 'version graph engine')
+
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-public-methods
 class KytosGraph:
-    """Class responsible for the graph generation."""
+    """Class responsible for the graph generation.
 
-    def __init__(self):
-        self.graph = nx.Graph()
+    The graph is published as an immutable snapshot, holding the graph, its
+    version and the engine searching it. Each path search keeps using the
+    snapshot it started with, so searches never see a half-updated graph
+    and need no lock.
+    """
+
+    def __init__(self, pool=None):
+        self.cache = PathCache(settings.PATH_CACHE_SIZE)
+        self.pool = pool
+        self.metrics = Metrics()
+        self._lock = Lock()
+        self._update_lock = Lock()
+        self._snapshot = _Snapshot(0, None, None)
+        self._protections = {}
+        self._subscriptions = {}
+        self._subscribed_edges = defaultdict(set)
+        self._tables = (0, {})
+        self._tables_executor = None
+        self.tables_future = None
+        self.graph = nx.MultiGraph()
+
+    @property
+    def graph(self):
+        """Return the graph of the current snapshot."""
+        return self._snapshot.graph
+
+    @graph.setter
+    def graph(self, graph):
+        """Publish a new graph, replacing the current one."""
+        self._publish(graph)
+
+    @property
+    def version(self):
+        """Return the version of the current graph."""
+        return self._snapshot.version
 
     def clear(self):
         """Remove all nodes and links registered."""
-        self.graph.clear()
+        self.graph = nx.MultiGraph()
+
+    def save(self, path):
+        """Write the current graph and its engine to a checkpoint file.
+
+        Nothing is written while the graph is empty, so that a checkpoint is
+        not overwritten before the topology is known. Return whether the
+        graph was written.
+        """
+        snapshot = self._snapshot
+        if not snapshot.graph:
+            return False
+        save_checkpoint(path, snapshot.graph, snapshot.engine,
+                        self._get_engine_key())
+        return True
+
+    def load(self, path):
+        """Publish the graph of a checkpoint file, returning if it exists.
+
+        The engine saved with the graph, along with its indexes and landmark
+        distances, is reused when it was built with the current settings.
+        The next topology update then only applies what changed since the
+        checkpoint.
+        """
+        checkpoint = load_checkpoint(path)
+        if checkpoint is None:
+            return False
+        graph, engine, key = checkpoint
+        self._publish(graph, engine=engine
+                      if key == self._get_engine_key() else None)
+        return True
+
+    def _publish(self, graph, removed_edges=None, engine=None, base=None):
+        """Freeze a graph and swap it in as the current snapshot.
+
+        The cached paths and the protected pairs are refreshed as well. When
+        only edges were removed from the ``base`` snapshot, the paths that do
+        not use them are still the best ones, so only the cached paths and
+        protected pairs using ``removed_edges`` are evicted or recomputed.
+        Otherwise, or when another snapshot replaced the base meanwhile,
+        every cached path is evicted and every protected pair is recomputed.
+        The engine is built from the graph unless given.
+
+        The engine and the protection paths are computed before taking the
+        lock, which is only held to swap them in, so searches and other
+        writers do not wait for them.
+
+        ``removed_edges`` are name pairs, matched with the paths by their
+        IDs in the ``hop_names`` table of the graph. Without a table, every
+        path is refreshed.
+        """
+        nx.freeze(graph)
+        if engine is None:
+            engine = self._get_engine(graph)
+        table = graph.graph.get('hop_names')
+        removed = None
+        if removed_edges is not None and table is not None:
+            removed_edges = table.get_edges(removed_edges)
+            removed = {frozenset(edge) for edge in removed_edges}
+        else:
+            removed_edges = None
+        protections = self._protections
+        refreshed = self._refresh_protections(protections, engine, removed)
+
+        with self._lock:
+            if removed is not None and base is not self._snapshot:
+                removed_edges = removed = protections = None
+            if protections is not self._protections:
+                refreshed = self._refresh_protections(self._protections,
+                                                      engine, removed)
+            version = self.version + 1
+            self._snapshot = _Snapshot(version, graph, engine)
+            self.cache.invalidate(version, removed_edges)
+            self._protections = refreshed
+        self.metrics.set('pathfinder_graph_nodes', graph.number_of_nodes())
+        # pylint: disable=protected-access
+        self.metrics.set('pathfinder_graph_edges',
+                         len(engine.links) - len(engine._hidden))
+
+        if settings.NEXT_HOP_TABLES:
+            if self._tables_executor is None:
+                self._tables_executor = ThreadPoolExecutor(max_workers=1)
+            self.tables_future = self._tables_executor.submit(
+                self._build_tables)
+
+    def _refresh_protections(self, protections, engine, removed):
+        """Return the protection paths of an engine.
+
+        Only the paths using a ``removed`` edge are recomputed, or all of
+        them when it is None.
+        """
+        refreshed = {}
+        for key, paths in protections.items():
+            if removed is None or any(
+                    frozenset(edge) in removed
+                    for path in paths for edge in zip(path, path[1:])):
+                paths = self._get_protection_paths(engine, *key)
+            refreshed[key] = paths
+        return refreshed
+
+    def _build_tables(self):
+        """Compute the next-hop tables of the current snapshot.
+
+        When NEXT_HOP_TABLES is set, this runs in a background thread for
+        each snapshot, computing the shortest paths between every pair of
+        nodes for the queries of a single best path. The tables are swapped
+        in once all of them are computed. A snapshot replaced in the
+        meantime is dropped, leaving the tables to the job scheduled by its
+        replacement. The tables, and SciPy with them, are only imported
+        here, and none are computed when they fail to import.
+        """
+        snapshot = self._snapshot
+        if self._tables[0] == snapshot.version or not snapshot.graph:
+            return
+        try:
+            # pylint: disable=import-error,import-outside-toplevel
+            from napps.kytos.pathfinder.tables import NextHopTable
+
+            # pylint: enable=import-error,import-outside-toplevel
+        except ImportError as error:
+            log.error(f'Could not import the next-hop tables: {error!r}')
+            return
+        tables = {}
+        for weight in [None, *settings.NEXT_HOP_PARAMETERS]:
+            if self._snapshot is not snapshot:
+                return
+            tables[weight] = NextHopTable(snapshot.graph, snapshot.engine,
+                                          weight)
+        self._tables = (snapshot.version, tables)
+
+    def _table_paths(self, snapshot, source, destination, parameter):
+        """Return the best path of a snapshot from its tables, or None.
+
+        None is returned when the tables of the snapshot are not ready or
+        do not hold the parameter, source or destination.
+        """
+        version, tables = self._tables
+        table = tables.get(parameter)
+        if version != snapshot.version or table is None:
+            return None
+        path = table.path(source, destination)
+        if path is None:
+            return None
+        return [path] if path else []
 
     def update_topology(self, topology):
-        """Update all nodes and links inside the graph."""
-        self.graph.clear()
-        self.update_nodes(topology.switches)
-        self.update_links(topology.links)
-
-    def update_nodes(self, nodes):
-        """Update all nodes inside the graph."""
-        for node in nodes.values():
-            try:
-                self.graph.add_node(node.id)
+        """Update all nodes and links inside the graph.
 
-                for interface in node.interfaces.values():
-                    self.graph.add_node(interface.id)
-                    self.graph.add_edge(node.id, interface.id)
+        The graph has a node for each switch and an edge for each link,
+        keyed by the interfaces it joins, and the ``interfaces`` graph
+        attribute maps each interface to its switch, while ``hop_names``
+        interns every node and interface. The table is shared by the
+        snapshots, and the paths hold the IDs of their hops in it, looking
+        their names up only when serialized. The topology is compared with
+        the current graph, and a new graph is built and published only when
+        they differ. The update is timed in ``self.metrics``.
 
-            except AttributeError:
-                pass
+        Return the ``id``, ``hops`` and validity of the subscribed paths
+        using a link removed or changed by the update.
+        """
+        start = perf_counter()
+        try:
+            return self._update_topology(topology)
+        finally:
+            self.metrics.observe('pathfinder_topology_update_seconds',
+                                 perf_counter() - start)
 
-    def update_links(self, links):
-        """Update all links inside the graph."""
-        keys = []
-        for link in links.values():
-            if link.is_active():
-                self.graph.add_edge(link.endpoint_a.id, link.endpoint_b.id)
-                for key, value in link.metadata.items():
-                    keys.append(key)
-                    endpoint_a = link.endpoint_a.id
-                    endpoint_b = link.endpoint_b.id
-                    self.graph[endpoint_a][endpoint_b][key] = value
+    def _update_topology(self, topology):
+        """Publish the graph of a topology, if it differs from the current.
+
+        The topology is compared with the current graph and a new graph is
+        built when they differ, while the searches go on. When only links
+        went down, or came back up unchanged, the new graph shares the
+        untouched adjacency of the current one, and the engine is a view of
+        the current engine hiding the links that are down, so a port flap
+        neither copies the topology nor builds an engine. Updates are
+        serialized by their own lock, and ``self._lock`` is only held by
+        ``_publish`` to swap the new snapshot in.
+        """
+        nodes, interfaces, links = self._get_elements(topology)
+        ends = {(end_a, end_b): (interfaces.get(end_a, end_a),
+                                 interfaces.get(end_b, end_b))
+                for end_a, end_b in links}
 
-        self._set_default_metadata(keys)
+        with self._update_lock:
+            base = self._snapshot
+            current = base.graph
+            current_links = {key: (node_a, node_b, metadata)
+                             for node_a, node_b, key, metadata
+                             in PathSearch.get_edges(current)}
+            current_interfaces = current.graph.get('interfaces', {})
+            table = current.graph.get('hop_names')
+            stale_nodes = any(node not in nodes for node in current)
+            stale_links = [key for key, (node_a, node_b, _)
+                           in current_links.items()
+                           if ends.get(key) not in ((node_a, node_b),
+                                                    (node_b, node_a))]
+            stale_interfaces = [(switch, interface) for interface, switch
+                                in current_interfaces.items()
+                                if interfaces.get(interface) != switch]
+            new_interfaces = interfaces != current_interfaces and any(
+                current_interfaces.get(interface) != switch
+                for interface, switch in interfaces.items())
+            new_nodes = any(node not in current for node in nodes)
+            new_links = [key for key, metadata in links.items()
+                         if key not in current_links or
+                         current_links[key][2] != metadata or
+                         ends[key] not in (current_links[key][:2],
+                                           current_links[key][1::-1])]
+            if not (stale_nodes or stale_links or stale_interfaces or
+                    new_nodes or new_links or new_interfaces):
+                return []
 
-    def _set_default_metadata(self, keys):
-        """Set metadata to all links.
+            removed_edges = stale_links + stale_interfaces
+            full = new_nodes or new_interfaces or table is None
+            engine = None
+            if not (full or stale_nodes or stale_interfaces):
+                engine = base.engine.relink(
+                    stale_links, {key: links[key] for key in new_links})
+            if engine is not None:
+                graph = self._patch_graph(
+                    current, [(*current_links[key][:2], key)
+                              for key in stale_links],
+                    [(*ends[key], key, links[key]) for key in new_links])
+            else:
+                graph = nx.MultiGraph(interfaces=interfaces)
+                graph.add_nodes_from(nodes)
+                graph.add_edges_from((*ends[key], key, metadata)
+                                     for key, metadata in links.items())
+                if table is None:
+                    table = HopNames(graph)
+                for name in [*nodes, *interfaces]:
+                    table.intern(name)
+                graph.graph['hop_names'] = table
+            if full or new_links:
+                self._publish(graph, engine=engine)
+            else:
+                self._publish(graph, removed_edges, engine, base)
+            return self._get_affected(
+                removed_edges + [key for key in new_links
+                                 if key in current_links])
 
-        Set the value to zero for inexistent metadata in a link to make those
-        irrelevant in pathfinding.
+    @staticmethod
+    def _patch_graph(base, removed, added):
+        """Return a copy of a frozen graph with links removed and added.
+
+        The links are ``(node_a, node_b, key)`` tuples, with the metadata
+        last when added. The copy shares the adjacency of the switches the
+        links do not touch with the base.
         """
-        for key in keys:
-            for endpoint_a, endpoint_b in self.graph.edges:
-                if key not in self.graph[endpoint_a][endpoint_b]:
-                    self.graph[endpoint_a][endpoint_b][key] = 0
+        # pylint: disable=protected-access
+        graph = nx.MultiGraph()
+        graph.graph.update(base.graph)
+        graph._node = base._node
+        adjacency = dict(base._adj)
+        keydicts = {}
+        for node_a, node_b, key, *metadata in [*removed, *added]:
+            pair = frozenset((node_a, node_b))
+            if pair not in keydicts:
+                keydicts[pair] = dict(base._adj[node_a].get(node_b, {}))
+                for node, neighbor in ((node_a, node_b), (node_b, node_a)):
+                    if adjacency[node] is base._adj[node]:
+                        adjacency[node] = dict(base._adj[node])
+                    adjacency[node][neighbor] = keydicts[pair]
+            if metadata:
+                keydicts[pair][key] = dict(metadata[0])
+            else:
+                keydicts[pair].pop(key, None)
+        for pair, keydict in keydicts.items():
+            if not keydict:
+                node_a, node_b = (*pair, *pair)[:2]
+                del adjacency[node_a][node_b]
+                adjacency[node_b].pop(node_a, None)
+        graph._adj = adjacency
+        return graph
+
+    def _get_affected(self, edges):
+        """Return the subscribed paths using any of the given edges."""
+        engine = self.get_engine()
+        path_ids = set()
+        with self._lock:
+            for edge in edges:
+                path_ids.update(self._subscribed_edges.get(frozenset(edge),
+                                                           ()))
+            return [{'id': path_id,
+                     'hops': list(self._subscriptions[path_id]),
+                     'valid': engine.is_path(self._subscriptions[path_id])}
+                    for path_id in sorted(path_ids)]
+
+    @staticmethod
+    def _get_elements(topology):
+        """Return the nodes, interfaces and links of a topology.
+
+        The nodes are the switches and the link endpoints not found in them.
+        The interfaces map each interface to its switch, and the links map
+        the endpoints of each active link to its metadata. A metadata key
+        missing in some links is left out of them, and the search engines
+        give them the METADATA_DEFAULTS value of the key.
+        """
+        nodes = set()
+        interfaces = {}
+        for node in topology.switches.values():
+            try:
+                nodes.add(node.id)
+                for interface in node.interfaces.values():
+                    interfaces[interface.id] = node.id
+            except AttributeError:
+                pass
+
+        links = {}
+        for link in topology.links.values():
+            if link.is_active():
+                endpoints = (link.endpoint_a.id, link.endpoint_b.id)
+                nodes.update(endpoint for endpoint in endpoints
+                             if endpoint not in interfaces)
+                links[endpoints] = dict(link.metadata)
+        return nodes, interfaces, links
 
     @staticmethod
     def _remove_switch_hops(circuit):
@@ -71,12 +397,547 @@ class KytosGraph:
             if len(hop.split(':')) == 8:
                 circuit['hops'].remove(hop)
 
-    def shortest_paths(self, source, destination, parameter=None):
-        """Calculate the shortest paths and return them."""
-        try:
-            paths = list(nx.shortest_simple_paths(self.graph,
-                                                  source,
-                                                  destination, parameter))
-        except (NodeNotFound, NetworkXNoPath):
+    def shortest_paths(self, source, destination, parameter=None,
+                       max_paths=None, desired=None, undesired=None,
+                       constraints=None, disjoint=None):
+        """Calculate the shortest paths and return them as ``Path`` objects.
+
+        Simple paths are generated lazily in increasing order of cost, so
+        only the first ``max_paths`` of them are computed. When
+        ``max_paths`` is None, every simple path is returned.
+
+        ``desired`` and ``undesired`` are lists of edges, given as endpoint
+        pairs. Every path returned uses all the desired edges and none of the
+        undesired ones. Both constraints are applied during the search, so
+        no path is computed only to be thrown away.
+
+        ``constraints`` holds ``(key, operator, value)`` tuples on the link
+        metadata. The ``min``, ``max`` and ``in`` operators hide the links
+        failing them before the search, and ``max_total`` bounds the sum of
+        a key along each path, cutting the enumeration short.
+
+        When ``disjoint`` is ``'link'`` or ``'node'``, up to ``max_paths``
+        paths sharing no link, or no switch but the ones of the source and
+        destination, are found in one pass, the set of them costing the
+        least. ``desired`` edges are not supported with it.
+
+        Results are kept in ``self.cache`` until a topology update affects
+        them.
+        """
+        return self.find_paths(source, destination, parameter, max_paths,
+                               desired, undesired, constraints, disjoint)[0]
+
+    def find_paths(self, source, destination, parameter=None, max_paths=None,
+                   desired=None, undesired=None, constraints=None,
+                   disjoint=None, deadline=None):
+        """Return the shortest paths found by a deadline, and if cut short.
+
+        The arguments are the ones of ``shortest_paths``, and ``deadline``
+        is a ``time.time()`` value after which the enumeration stops,
+        returning the paths found so far. The search runs in ``self.pool``
+        when there is one, or in the calling thread otherwise. Only the
+        results found in full are cached.
+        """
+        key = self._get_key(source, destination, parameter, desired,
+                            undesired, constraints,
+                            disjoint and (disjoint, max_paths))
+        paths = self.cache.get(key, max_paths)
+        if paths is not None:
+            return paths, False
+
+        snapshot = self._snapshot
+        if max_paths == 1 and not (desired or undesired or constraints or
+                                   disjoint):
+            paths = self._table_paths(snapshot, source, destination,
+                                      parameter)
+            if paths is not None:
+                return paths, False
+
+        query = (source, destination, parameter, max_paths, desired,
+                 undesired, constraints, disjoint)
+        start = perf_counter()
+        if self.pool is not None:
+            paths, truncated = self.pool.search(snapshot, query, deadline,
+                                                self.metrics)
+        else:
+            paths, truncated = self.search(snapshot.engine, *query,
+                                           deadline=deadline,
+                                           metrics=self.metrics)
+        self._observe_search(start, len(paths), truncated)
+        if not truncated:
+            self.cache.put(key, paths, snapshot.version,
+                           None if disjoint else max_paths)
+        return paths, truncated
+
+    def stream_paths(self, source, destination, parameter=None,
+                     max_paths=None, desired=None, undesired=None,
+                     constraints=None, disjoint=None, deadline=None):
+        """Generate the shortest paths as they are found.
+
+        The arguments are the ones of ``find_paths``, and a None is
+        generated last when the deadline cut the enumeration short. The
+        search runs in the calling thread, even with a pool, and caches the
+        results found in full.
+        """
+        key = self._get_key(source, destination, parameter, desired,
+                            undesired, constraints,
+                            disjoint and (disjoint, max_paths))
+        paths = self.cache.get(key, max_paths)
+        if paths is not None:
+            yield from paths
+            return
+
+        snapshot = self._snapshot
+        paths = []
+        start = perf_counter()
+        for path in self.iter_paths(snapshot.engine, source, destination,
+                                    parameter, max_paths, desired,
+                                    undesired, constraints, disjoint,
+                                    deadline, self.metrics):
+            yield path
+            paths.append(path)
+        truncated = bool(paths) and paths[-1] is None
+        self._observe_search(start, len(paths) - truncated, truncated)
+        if not truncated:
+            self.cache.put(key, paths, snapshot.version,
+                           None if disjoint else max_paths)
+
+    def _observe_search(self, start, paths, truncated):
+        """Record the time and number of paths of a search."""
+        self.metrics.observe('pathfinder_search_seconds',
+                             perf_counter() - start)
+        self.metrics.observe('pathfinder_search_paths', paths)
+        if truncated:
+            self.metrics.increment('pathfinder_search_truncated_total')
+
+    @classmethod
+    def search(cls, engine, *query, **options):
+        """Return the paths of a query on an engine, and if cut short.
+
+        ``query`` and ``options`` hold the ``iter_paths`` arguments after
+        the engine. The paths are those of ``iter_paths``, without the
+        cache.
+        """
+        paths = list(cls.iter_paths(engine, *query, **options))
+        if paths and paths[-1] is None:
+            return paths[:-1], True
+        return paths, False
+
+    @classmethod
+    def iter_paths(cls, engine, source, destination, parameter=None,
+                   max_paths=None, desired=None, undesired=None,
+                   constraints=None, disjoint=None, deadline=None,
+                   metrics=None):
+        """Generate the paths of a query on an engine as they are found.
+
+        The paths are those of ``shortest_paths``, without the cache. The
+        enumeration stops when ``deadline`` is passed, generating a None
+        last, but disjoint paths are found in a single pass and are never
+        cut short. The links pruned and the time to the first path are
+        recorded in ``metrics``, when given.
+        """
+        start = perf_counter()
+        predicates, bounds = cls._split_constraints(constraints)
+        if undesired:
+            engine = engine.restrict(undesired)
+        if predicates:
+            pruned = engine.prune(predicates)
+            if metrics is not None:
+                # pylint: disable=protected-access
+                metrics.observe('pathfinder_pruned_links',
+                                len(pruned._hidden) - len(engine._hidden))
+            engine = pruned
+        if disjoint:
+            paths = engine.disjoint_paths(
+                source, destination, parameter,
+                max_paths or settings.MAX_PATHS_LIMIT, disjoint == 'node')
+            paths = cls._within_bounds(engine, paths, bounds)
+            deadline = None
+        elif desired:
+            paths = cls._waypoint_paths(engine, source, destination, desired,
+                                        parameter, bounds, deadline)
+        else:
+            paths = engine.simple_paths(source, destination, parameter,
+                                        bounds)
+
+        for position, path in enumerate(islice(paths, max_paths), 1):
+            if path is None:
+                yield None
+                return
+            if position == 1 and metrics is not None:
+                metrics.observe('pathfinder_search_first_path_seconds',
+                                perf_counter() - start)
+            yield path
+            if (deadline is not None and time() > deadline and
+                    position != max_paths):
+                yield None
+                return
+
+    def batch_shortest_paths(self, queries):
+        """Calculate the shortest paths of many queries at once.
+
+        Each query is a dict of ``shortest_paths`` arguments, and the paths
+        of each one are returned in the same order, as found by
+        ``batch_find_paths``.
+        """
+        return [paths for paths, _ in self.batch_find_paths(queries)]
+
+    def batch_find_paths(self, queries, deadline=None):
+        """Return the shortest paths of many queries, and if cut short.
+
+        Each query is a dict of ``shortest_paths`` arguments, and the
+        results are returned in the same order. The queries asking for the
+        single best path, without desired edges, ``max_total`` constraints
+        nor ``disjoint``, are grouped by source, parameter, undesired edges
+        and constraints, and each group is answered by a single
+        shortest-path tree. The other ones are searched by ``find_paths``
+        with the ``deadline`` of the batch.
+        """
+        results = [None] * len(queries)
+        groups = defaultdict(list)
+        for position, query in enumerate(queries):
+            if (query.get('max_paths') != 1 or query.get('desired') or
+                    query.get('disjoint') or
+                    self._split_constraints(query.get('constraints'))[1]):
+                results[position] = self.find_paths(**query,
+                                                    deadline=deadline)
+                continue
+            key = self._get_key(query['source'], query['destination'],
+                                query.get('parameter'), None,
+                                query.get('undesired'),
+                                query.get('constraints'))
+            paths = self.cache.get(key, 1)
+            if paths is None and not (key[4] or key[5]):
+                paths = self._table_paths(self._snapshot, key[0], key[1],
+                                          key[2])
+            if paths is None:
+                groups[key[0], key[2], key[4], key[5]].append((position,
+                                                               key))
+            else:
+                results[position] = paths, False
+
+        snapshot = self._snapshot
+        for group_key, group in groups.items():
+            source, parameter, undesired, constraints = group_key
+            engine = snapshot.engine
+            if undesired:
+                engine = engine.restrict([tuple(edge) for edge in undesired])
+            if constraints:
+                engine = engine.prune(constraints)
+            tree = engine.shortest_paths_from(
+                source, {key[1] for _, key in group}, parameter)
+            for position, key in group:
+                paths = [tree[key[1]]] if key[1] in tree else []
+                self.cache.put(key, paths, snapshot.version, 1)
+                results[position] = paths, False
+        return results
+
+    def shortest_path_tree(self, source, destinations, parameter=None,
+                           desired=None, undesired=None, constraints=None,
+                           deadline=None):
+        """Return the best path from a source to each destination.
+
+        A ``(path, truncated)`` pair is returned for each destination, in
+        their order, with a None path for an unreachable one. The paths are
+        computed as a batch, so the destinations not in the cache are
+        answered by a single Dijkstra from the source, unless desired edges
+        or ``max_total`` constraints require a search for each of them.
+        Those searches stop at the ``deadline``, and the destinations they
+        did not finish are marked as cut short.
+        """
+        results = self.batch_find_paths([
+            {'source': source, 'destination': destination,
+             'parameter': parameter, 'max_paths': 1, 'desired': desired,
+             'undesired': undesired, 'constraints': constraints}
+            for destination in destinations], deadline)
+        return [(found[0] if found else None, truncated)
+                for found, truncated in results]
+
+    def ecmp_paths(self, source, destination, parameter=None, max_paths=None,
+                   undesired=None, constraints=None, flow_key=None):
+        """Return the count and the ``Path`` of the equal-cost shortest paths.
+
+        The paths come from a single shortest-path DAG, without the cache.
+        Up to ``max_paths`` of them are built, or only the one ``flow_key``
+        hashes to when given, so that a flow is always given the same path.
+        ``max_total`` constraints are ignored, as they would make paths of
+        the same cost differ.
+        """
+        engine = self.get_engine()
+        predicates, _ = self._split_constraints(constraints)
+        if undesired:
+            engine = engine.restrict(undesired)
+        if predicates:
+            engine = engine.prune(predicates)
+        paths = engine.equal_cost_paths(source, destination, parameter)
+        if paths is None:
+            return 0, []
+        if flow_key is not None:
+            return paths.count, [paths.select(flow_key)]
+        return paths.count, list(islice(paths, max_paths))
+
+    @staticmethod
+    def merge_paths(paths):
+        """Return the hop pairs of a list of paths, each one once.
+
+        The pairs keep the orientation and the order in which the paths
+        first use them, so the paths of a tree give its edges from the root.
+        """
+        edges = {}
+        for path in paths:
+            hops = path.hops if path else []
+            for edge in zip(hops, hops[1:]):
+                edges.setdefault(frozenset(edge), list(edge))
+        return list(edges.values())
+
+    def protect(self, source, destination, parameter=None, disjoint='link'):
+        """Keep a primary and a disjoint backup path between two nodes.
+
+        The paths of a pair already protected are returned as they are.
+        Otherwise, they are computed and refreshed on every topology update
+        until ``unprotect`` is called, so that a failover finds its paths
+        with a dict lookup.
+        """
+        key = (source, destination, parameter, disjoint)
+        with self._lock:
+            paths = self._protections.get(key)
+            if paths is None:
+                paths = self._get_protection_paths(self.get_engine(), *key)
+                protections = dict(self._protections)
+                protections[key] = paths
+                self._protections = protections
+        return self._get_protection(paths)
+
+    def unprotect(self, source, destination, parameter=None,
+                  disjoint='link'):
+        """Stop protecting a pair, returning whether it was protected."""
+        key = (source, destination, parameter, disjoint)
+        with self._lock:
+            if key not in self._protections:
+                return False
+            protections = dict(self._protections)
+            del protections[key]
+            self._protections = protections
+        return True
+
+    def get_protection(self, source, destination, parameter=None,
+                       disjoint='link'):
+        """Return the primary and backup paths of a protected pair, or None.
+
+        The paths were computed when the pair was protected or on the last
+        topology update, so this is a single dict lookup.
+        """
+        paths = self._protections.get((source, destination, parameter,
+                                       disjoint))
+        if paths is None:
+            return None
+        return self._get_protection(paths)
+
+    def protections(self):
+        """Return the protected pairs with their primary and backup paths."""
+        return [dict(zip(('source', 'destination', 'parameter', 'disjoint'),
+                         key), **self._get_protection(paths))
+                for key, paths in self._protections.items()]
+
+    def validate_paths(self, paths):
+        """Return whether each list of hops is a path of the graph."""
+        engine = self.get_engine()
+        return [engine.is_path(hops) for hops in paths]
+
+    def subscribe(self, path_id, hops):
+        """Register a path, to be reported when an update affects it.
+
+        A path already registered with the same ``path_id`` is replaced.
+        Paths are indexed by the hop pairs they use, so that an update finds
+        the ones crossing a removed or changed link without scanning all of
+        them.
+        """
+        with self._lock:
+            self._unsubscribe(path_id)
+            self._subscriptions[path_id] = tuple(hops)
+            for edge in zip(hops, hops[1:]):
+                self._subscribed_edges[frozenset(edge)].add(path_id)
+
+    def unsubscribe(self, path_id):
+        """Unregister a path, returning whether it was registered."""
+        with self._lock:
+            return self._unsubscribe(path_id)
+
+    def _unsubscribe(self, path_id):
+        """Unregister a path and drop it from the edge index."""
+        hops = self._subscriptions.pop(path_id, None)
+        if hops is None:
+            return False
+        for edge in zip(hops, hops[1:]):
+            path_ids = self._subscribed_edges[frozenset(edge)]
+            path_ids.discard(path_id)
+            if not path_ids:
+                del self._subscribed_edges[frozenset(edge)]
+        return True
+
+    def get_subscription(self, path_id):
+        """Return the hops of a subscribed path, or None."""
+        hops = self._subscriptions.get(path_id)
+        return None if hops is None else list(hops)
+
+    def subscriptions(self):
+        """Return the ``id`` and ``hops`` of each subscribed path."""
+        with self._lock:
+            return [{'id': path_id, 'hops': list(hops)}
+                    for path_id, hops in self._subscriptions.items()]
+
+    @staticmethod
+    def _get_protection_paths(engine, source, destination, parameter,
+                              disjoint):
+        """Return the two disjoint paths of least cost between two nodes."""
+        return tuple(engine.disjoint_paths(source, destination, parameter,
+                                           2, disjoint == 'node'))
+
+    @staticmethod
+    def _get_protection(paths):
+        """Return the primary and backup hops of protection paths."""
+        paths = [path.hops for path in paths] + [None, None]
+        return {'primary': paths[0], 'backup': paths[1]}
+
+    def get_engine(self):
+        """Return the path search engine of the current snapshot."""
+        return self._snapshot.engine
+
+    @staticmethod
+    def _get_engine(graph):
+        """Return the path search engine selected by GRAPH_BACKEND.
+
+        The engine class is looked up in the GRAPH_ENGINES registry. The CSR
+        backend searches a compact copy of the graph, compiled when the
+        graph is published. The ALT_LANDMARKS landmarks are picked and their
+        distances computed here as well.
+        """
+        engine_class = get_engine_class(settings.GRAPH_BACKEND)
+        engine = engine_class(graph, settings.METADATA_DEFAULTS)
+        engine.set_landmarks(settings.ALT_LANDMARKS)
+        return engine
+
+    @staticmethod
+    def _get_engine_key():
+        """Return the settings an engine is built with."""
+        return (settings.GRAPH_BACKEND, settings.ALT_LANDMARKS,
+                sorted(settings.METADATA_DEFAULTS.items()))
+
+    @classmethod
+    def _get_key(cls, source, destination, parameter, desired, undesired,
+                 constraints=None, disjoint=None):
+        """Return the cache key of a query."""
+        return (source, destination, parameter, cls._edge_set(desired),
+                cls._edge_set(undesired), frozenset(constraints or ()),
+                disjoint)
+
+    @staticmethod
+    def _split_constraints(constraints):
+        """Return the link predicates and the path bounds of constraints."""
+        predicates = [constraint for constraint in constraints or ()
+                      if constraint[1] != 'max_total']
+        bounds = {key: value for key, operator, value in constraints or ()
+                  if operator == 'max_total'}
+        return predicates, bounds
+
+    @staticmethod
+    def _edge_set(edges):
+        """Return a hashable, orientation-free set of edges."""
+        return frozenset(frozenset(edge) for edge in edges or ())
+
+    @staticmethod
+    def _waypoint_paths(engine, source, destination, desired, weight,
+                        bounds=None, deadline=None):
+        """Generate the ``Path`` of each path using all desired edges.
+
+        A path using the desired edges in a given order and orientation is
+        made of independent segments joining the source, the desired edges
+        and the destination. The simple paths of each segment are enumerated
+        only as far as needed to merge the chains of segments of all orders
+        and orientations, adding the cost of the desired edges. A segment
+        beyond a bound is left out, and the merged paths are checked against
+        the bounds. A None is generated last when ``deadline`` passes before
+        the paths run out.
+        """
+        desired = [tuple(edge) for edge in KytosGraph._edge_set(desired)]
+        if not all(engine.has_edge(*edge) for edge in desired):
             return []
-        return paths
+
+        segments = {}
+
+        def get_chains():
+            for waypoints in KytosGraph._get_waypoints(source, destination,
+                                                       desired):
+                chain = []
+                for pair in zip(waypoints[::2], waypoints[1::2]):
+                    if pair not in segments:
+                        segments[pair] = LazyPaths(
+                            engine.simple_paths(*pair, weight, bounds))
+                    chain.append(segments[pair])
+                yield chain
+        cost = sum(engine.path_cost(edge, weight) for edge in desired)
+        return KytosGraph._within_bounds(
+            engine, merge_chains(get_chains(), deadline, cost), bounds or {})
+
+    @staticmethod
+    def _within_bounds(engine, paths, bounds):
+        """Generate the paths within bounds, keeping their totals.
+
+        No path is within a bound on a key that is not numeric. A None in
+        ``paths`` is passed on, ending them.
+        """
+        if not engine.keys.issuperset(bounds):
+            return
+        for path in paths:
+            if path is None:
+                yield None
+                return
+            path.totals.update((key, engine.path_cost(path, key))
+                               for key in bounds)
+            if all(path.totals[key] <= maximum
+                   for key, maximum in bounds.items()):
+                yield path
+
+    @staticmethod
+    def _get_waypoints(source, destination, edges):
+        """Generate the waypoints of each order and orientation of edges."""
+        for order in permutations(edges):
+            for flips in product((False, True), repeat=len(order)):
+                waypoints = [source]
+                for (node_a, node_b), flip in zip(order, flips):
+                    waypoints += [node_b, node_a] if flip else [node_a, node_b]
+                waypoints.append(destination)
+                yield waypoints
+
+
+class NetworkXGraph(PathSearch):
+    """Path search over the adjacency of a networkx graph."""
+
+    def __init__(self, graph, defaults=None):
+        edges = self.get_edges(graph)
+        super().__init__(graph, edges, defaults)
+        self.graph = graph
+        self._adjacency = {node: [] for node in graph}
+        for edge, (node_a, node_b, _, _) in enumerate(edges):
+            self._adjacency[node_a].append((node_b, edge))
+            if node_b != node_a:
+                self._adjacency[node_b].append((node_a, edge))
+
+    def _node(self, name):
+        """Return the node of a name, or None if it is not a node."""
+        return name if name in self._adjacency else None
+
+    def _name(self, node):
+        """Return the name of a node."""
+        return node
+
+    def _adjacent(self, node):
+        """Return ``(neighbor, edge)`` for each edge of a node."""
+        return self._adjacency[node]
+
+    def _build_costs(self, weight, hop_cost):
+        """Return the cost of each edge, given the cost of a switch hop."""
+        if weight not in self.keys:
+            return [1 + span * hop_cost for span in self.spans]
+        return [value + span * hop_cost
+                for value, span in zip(self._get_column(weight), self.spans)]
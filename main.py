@@ -1,11 +1,20 @@
 """Main module of kytos/pathfinder Kytos Network Application."""
 
-from flask import jsonify, request
-from kytos.core import KytosNApp, log, rest
+import json
+from concurrent.futures import ThreadPoolExecutor
+from math import isfinite
+from numbers import Integral
+from time import perf_counter, time
+
+from flask import Response, jsonify, request, stream_with_context
+from kytos.core import KytosEvent, KytosNApp, log, rest
 from kytos.core.helpers import listen_to
+from werkzeug.exceptions import BadRequest, NotFound
 
 # pylint: disable=import-error
-from napps.kytos.pathfinder.graph import KytosGraph
+from napps.kytos.pathfinder import settings
+from napps.kytos.pathfinder.metrics import profile
+from napps.kytos.pathfinder.scheduler import CoalescingScheduler
 
 # pylint: enable=import-error
 
@@ -17,87 +26,576 @@ class Main(KytosNApp):
     """
 
     def setup(self):
-        """Create a graph to handle the nodes and edges."""
-        self.graph = KytosGraph()
+        """Start building the graph in the background.
+
+        The graph is built by ``_build_graph`` in a background thread, so
+        the NApp is set up without waiting for networkx and the search
+        engines to be imported, nor for the checkpoint to be loaded. Path
+        requests and topology updates wait for the build to end. The graph
+        is checkpointed every CHECKPOINT_INTERVAL seconds.
+        """
+        self.pool = None
+        self.updates = CoalescingScheduler(
+            self._apply_topology, settings.TOPOLOGY_UPDATE_WINDOW_MS / 1000,
+            settings.TOPOLOGY_UPDATE_MAX_DELAY_MS / 1000)
         self._topology = None
+        self._checkpoint_version = 0
+        executor = ThreadPoolExecutor(max_workers=1)
+        self._graph_future = executor.submit(self._build_graph)
+        executor.shutdown(wait=False)
+        if settings.CHECKPOINT_FILE and settings.CHECKPOINT_INTERVAL:
+            self.execute_as_loop(settings.CHECKPOINT_INTERVAL)
+
+    @property
+    def graph(self):
+        """Return the graph, waiting for its first build to end."""
+        return self._graph_future.result()
+
+    def _build_graph(self):
+        """Import the graph module and create the graph.
+
+        Path requests are searched by a pool of worker processes, unless
+        PATH_POOL_SIZE is zero. The graph of the last checkpoint is loaded,
+        if any. When the checkpoint or the engine fails to load, the error
+        is logged and an empty graph is kept instead, filled by the next
+        topology update. The time taken is kept in the
+        ``pathfinder_startup_seconds`` metric.
+        """
+        start = perf_counter()
+        # pylint: disable=import-error,import-outside-toplevel
+        from napps.kytos.pathfinder.graph import KytosGraph
+        from napps.kytos.pathfinder.pool import PathPool
+
+        # pylint: enable=import-error,import-outside-toplevel
+        if settings.PATH_POOL_SIZE:
+            self.pool = PathPool(settings.PATH_POOL_SIZE)
+        graph = KytosGraph(self.pool)
+        if settings.CHECKPOINT_FILE:
+            try:
+                if graph.load(settings.CHECKPOINT_FILE):
+                    log.info('Graph loaded from '
+                             f'{settings.CHECKPOINT_FILE}.')
+            except Exception as error:  # pylint: disable=broad-except
+                log.error(f'Could not load the graph checkpoint: {error!r}')
+                graph = KytosGraph(self.pool)
+            self._checkpoint_version = graph.version
+        graph.metrics.set('pathfinder_startup_seconds',
+                          perf_counter() - start)
+        return graph
 
     def execute(self):
-        """Do nothing."""
+        """Checkpoint the graph if it changed since the last checkpoint."""
+        self._checkpoint()
 
     def shutdown(self):
-        """Shutdown the napp."""
-
-    def _filter_paths(self, paths, desired, undesired):
-        """Apply filters to the paths list.
-
-        Make sure that each path in the list has all the desired links and none
-        of the undesired ones.
-        """
-        filtered_paths = []
-
-        if desired:
-            for link_id in desired:
-                try:
-                    endpoint_a = self._topology.links[link_id].endpoint_a.id
-                    endpoint_b = self._topology.links[link_id].endpoint_b.id
-                except KeyError:
-                    return []
-
-                for path in paths:
-                    head = path['hops'][:-1]
-                    tail = path['hops'][1:]
-                    if (((endpoint_a, endpoint_b) in zip(head, tail)) or
-                            ((endpoint_b, endpoint_a) in zip(head, tail))):
-                        filtered_paths.append(path)
-        else:
-            filtered_paths = paths
+        """Shutdown the napp, saving the graph and stopping the workers."""
+        self.updates.flush()
+        self._checkpoint()
+        if self.pool is not None:
+            self.pool.close()
+
+    def _checkpoint(self):
+        """Save the graph to CHECKPOINT_FILE if it changed."""
+        version = self.graph.version
+        if not settings.CHECKPOINT_FILE or version == self._checkpoint_version:
+            return
+        try:
+            if self.graph.save(settings.CHECKPOINT_FILE):
+                self._checkpoint_version = version
+        except OSError as error:
+            log.error(f'Could not save the graph checkpoint: {error}')
+
+    def _get_endpoints(self, link_ids):
+        """Return the endpoints of the known links among ``link_ids``."""
+        links = self._topology.links if self._topology else {}
+        return [(links[link_id].endpoint_a.id, links[link_id].endpoint_b.id)
+                for link_id in link_ids if link_id in links]
+
+    @staticmethod
+    def _get_max_paths(data):
+        """Return the number of paths requested, capped by the settings."""
+        max_paths = data.get('max_paths', settings.DEFAULT_MAX_PATHS)
+        if (isinstance(max_paths, bool) or not isinstance(max_paths, int) or
+                not 0 < max_paths <= settings.MAX_PATHS_LIMIT):
+            raise BadRequest('max_paths must be an integer between 1 and '
+                             f'{settings.MAX_PATHS_LIMIT}.')
+        return max_paths
+
+    @staticmethod
+    def _get_constraints(data):
+        """Return the constraints of a path request as predicate tuples.
+
+        The constraints map a link metadata key to conditions: ``min`` and
+        ``max`` bound its value on each link, ``in`` lists the values
+        accepted on each link and ``max_total`` bounds its sum along a path.
+        """
+        constraints = data.get('constraints') or {}
+        error = BadRequest('constraints must map metadata keys to min, max, '
+                           'max_total numbers or in lists.')
+        if not isinstance(constraints, dict):
+            raise error
+
+        predicates = []
+        for key, conditions in constraints.items():
+            if not isinstance(conditions, dict):
+                raise error
+            for operator, value in conditions.items():
+                if operator == 'in' and isinstance(value, list):
+                    try:
+                        value = frozenset(value)
+                    except TypeError as exception:
+                        raise error from exception
+                elif (operator not in ('min', 'max', 'max_total') or
+                      isinstance(value, bool) or
+                      not isinstance(value, (int, float))):
+                    raise error
+                predicates.append((key, operator, value))
+        return predicates
+
+    @staticmethod
+    def _get_output(data):
+        """Return the metrics and the sort order of a path request.
+
+        The metrics map link metadata keys to the ``sum``, ``min`` or
+        ``max`` of their values along each path. The paths are sorted by
+        ``sort_by``, the cost or one of the metrics, or keep the order of
+        the search when it is not given.
+        """
+        metrics = data.get('metrics') or {}
+        if (not isinstance(metrics, dict) or
+                any(aggregate not in ('sum', 'min', 'max')
+                    for aggregate in metrics.values())):
+            raise BadRequest('metrics must map metadata keys to sum, min or '
+                             'max.')
+        sort_by = data.get('sort_by')
+        order = data.get('sort_order', 'asc')
+        if order not in ('asc', 'desc'):
+            raise BadRequest("sort_order must be 'asc' or 'desc'.")
+        if sort_by is None:
+            return metrics, None
+        if not isinstance(sort_by, str) or (sort_by != 'cost' and
+                                            sort_by not in metrics):
+            raise BadRequest('sort_by must be cost or a key of metrics.')
+        return metrics, (sort_by, order == 'desc')
+
+    @staticmethod
+    def _get_deadline(data):
+        """Return the time by which a path request must be answered.
 
-        if undesired:
-            for link_id in undesired:
-                try:
-                    endpoint_a = self._topology.links[link_id].endpoint_a.id
-                    endpoint_b = self._topology.links[link_id].endpoint_b.id
-                except KeyError:
-                    continue
+        When it passes, the paths found so far are returned with the
+        ``truncated`` flag set.
+        """
+        timeout = data.get('timeout_ms', settings.DEFAULT_TIMEOUT_MS)
+        if (isinstance(timeout, bool) or not isinstance(timeout, int) or
+                timeout <= 0):
+            raise BadRequest('timeout_ms must be a positive integer.')
+        return time() + timeout / 1000
+
+    @staticmethod
+    def _get_disjoint(data, desired=None):
+        """Return the disjoint mode of a path request, or None."""
+        disjoint = data.get('disjoint')
+        if disjoint not in (None, 'link', 'node'):
+            raise BadRequest("disjoint must be 'link' or 'node'.")
+        if disjoint and desired:
+            raise BadRequest('disjoint paths can not use desired_links.')
+        return disjoint
+
+    @staticmethod
+    def _get_pair(data):
+        """Return the protect arguments of a protection request."""
+        if (not isinstance(data, dict) or 'source' not in data or
+                'destination' not in data):
+            raise BadRequest('source and destination are required.')
+        return {'source': data['source'],
+                'destination': data['destination'],
+                'parameter': data.get('parameter'),
+                'disjoint': Main._get_disjoint(data) or 'link'}
 
-                for path in paths:
-                    head = path['hops'][:-1]
-                    tail = path['hops'][1:]
-                    if (((endpoint_a, endpoint_b) in zip(head, tail)) or
-                            ((endpoint_b, endpoint_a) in zip(head, tail))):
+    def _get_desired(self, data):
+        """Return the endpoints of the desired links of a request.
 
-                        filtered_paths.remove(path)
+        None is returned when a desired link is unknown.
+        """
+        desired_links = data.get('desired_links') or []
+        if len(desired_links) > settings.MAX_DESIRED_LINKS:
+            raise BadRequest('desired_links can not hold more than '
+                             f'{settings.MAX_DESIRED_LINKS} links.')
+        desired = self._get_endpoints(desired_links)
+        return desired if len(desired) == len(desired_links) else None
+
+    def _get_query(self, data):
+        """Return the shortest_paths arguments of a path request.
 
-        return filtered_paths
+        None is returned when a desired link is unknown, since no path can
+        use it.
+        """
+        if (not isinstance(data, dict) or 'source' not in data or
+                'destination' not in data):
+            raise BadRequest('source and destination are required.')
+
+        disjoint = self._get_disjoint(data, data.get('desired_links'))
+        desired = self._get_desired(data)
+        if desired is None:
+            return None
+        return {'source': data['source'],
+                'destination': data['destination'],
+                'parameter': data.get('parameter'),
+                'max_paths': self._get_max_paths(data),
+                'desired': desired,
+                'undesired': self._get_endpoints(
+                    data.get('undesired_links') or []),
+                'constraints': self._get_constraints(data),
+                'disjoint': disjoint}
 
     @rest('v2/', methods=['POST'])
     def shortest_path(self):
-        """Calculate the best path between the source and destination."""
-        data = request.get_json()
+        """Calculate the best path between the source and destination.
 
-        desired = data.get('desired_links')
-        undesired = data.get('undesired_links')
-        parameter = data.get('parameter')
+        Clients accepting ``application/x-ndjson`` get the paths streamed as
+        they are found.
+        """
+        data = request.get_json()
+        query = self._get_query(data)
+        metrics, sort = self._get_output(data)
+        if data.get('ecmp') is True:
+            return self._ecmp_paths(data, query, metrics, sort)
+        if self._accepts_ndjson():
+            if sort is not None:
+                raise BadRequest('streamed paths can not be sorted.')
+            return self._stream_paths(query, self._get_deadline(data),
+                                      metrics)
+        if query is None:
+            return jsonify({'paths': [], 'truncated': False})
 
         paths = []
-        for path in self.graph.shortest_paths(data['source'],
-                                              data['destination'],
-                                              parameter):
+        summary = None
+        if data.get('profile') is True:
+            found, truncated, summary = self._profile_paths(
+                query, self._get_deadline(data))
+        else:
+            found, truncated = self.graph.find_paths(
+                **query, deadline=self._get_deadline(data))
+        for path in found:
+            paths.append(self._serialize(path, metrics))
+
+        result = {'paths': self._sort_paths(paths, sort),
+                  'truncated': truncated}
+        if summary is not None:
+            result['profile'] = summary
+        return jsonify(result)
+
+    def _profile_paths(self, query, deadline):
+        """Return the paths of a query searched under cProfile.
+
+        The search runs in the request thread, without the cache. The paths
+        are returned with whether they were cut short and a summary of the
+        profile, which is None when the search took less than
+        PROFILE_MIN_MS.
+        """
+        (found, truncated), seconds, summary = profile(
+            self.graph.search, self.graph.get_engine(), **query,
+            deadline=deadline, metrics=self.graph.metrics)
+        if seconds * 1000 < settings.PROFILE_MIN_MS:
+            summary = None
+        return found, truncated, summary
+
+    def _ecmp_paths(self, data, query, metrics, sort):
+        """Return the equal-cost shortest paths of a path request.
+
+        The paths are returned with their count, or only the one selected
+        by ``flow_key``.
+        """
+        if (data.get('desired_links') or query['disjoint'] or
+                any(operator == 'max_total'
+                    for _, operator, _ in query['constraints'])):
+            raise BadRequest('ecmp paths can not use desired_links, disjoint '
+                             'nor max_total constraints.')
+        flow_key = data.get('flow_key')
+        if flow_key is not None:
+            flow_key = json.dumps(flow_key, sort_keys=True)
+        count, paths = self.graph.ecmp_paths(
+            query['source'], query['destination'], query['parameter'],
+            query['max_paths'], query['undesired'], query['constraints'],
+            flow_key)
+        paths = [self._serialize(path, metrics) for path in paths]
+        return jsonify({'paths': self._sort_paths(paths, sort),
+                        'truncated': False, 'ecmp_count': count})
+
+    def _serialize(self, path, metrics=None):
+        """Return the JSON fields of a path, naming its hops.
+
+        The metrics requested are read from the link metadata of the
+        current graph.
+        """
+        result = {'hops': path.hops, 'cost': self._number(path.cost)}
+        if metrics:
+            values = self.graph.get_engine().path_metrics(path, metrics)
+            result['metrics'] = {key: self._number(value)
+                                 for key, value in values.items()}
+        return result
 
-            paths.append({'hops': path})
+    @staticmethod
+    def _number(value):
+        """Return a cost or metric as a JSON number, or None if infinite."""
+        if value is None or not isfinite(value):
+            return None
+        return int(value) if isinstance(value, Integral) else float(value)
 
-        paths = self._filter_paths(paths, desired, undesired)
-        return jsonify({'paths': paths})
+    @staticmethod
+    def _sort_paths(paths, sort):
+        """Sort serialized paths, leaving the ones without a value last."""
+        if sort is None:
+            return paths
+        key, reverse = sort
+
+        def get_value(path):
+            return path['cost'] if key == 'cost' else path['metrics'][key]
+
+        ranked = sorted((path for path in paths
+                         if get_value(path) is not None),
+                        key=get_value, reverse=reverse)
+        return ranked + [path for path in paths if get_value(path) is None]
+
+    @staticmethod
+    def _accepts_ndjson():
+        """Return whether the client prefers paths streamed as NDJSON."""
+        return request.accept_mimetypes.best_match(
+            ['application/json', 'application/x-ndjson']) == \
+            'application/x-ndjson'
+
+    def _stream_paths(self, query, deadline, metrics=None):
+        """Return a response writing each path on a line once found.
+
+        The search runs in the request thread, so the first paths are sent
+        while the next ones are searched. A last ``{"truncated": true}``
+        line tells that the deadline expired.
+        """
+        def generate():
+            if query is None:
+                return
+            for path in self.graph.stream_paths(**query, deadline=deadline):
+                if path is None:
+                    yield json.dumps({'truncated': True}) + '\n'
+                else:
+                    yield json.dumps(self._serialize(path, metrics)) + '\n'
+
+        return Response(stream_with_context(generate()),
+                        mimetype='application/x-ndjson')
+
+    @rest('v2/batch', methods=['POST'])
+    def batch_shortest_paths(self):
+        """Calculate the best paths of a list of path requests.
+
+        The results are returned in the order of the requests. An invalid
+        request gets an error instead of paths, without failing the others.
+        The ``timeout_ms`` deadline of the batch applies to every request,
+        and the ones cut short by it are returned with the ``truncated``
+        flag set.
+        """
+        data = request.get_json()
+        queries = data.get('queries') if isinstance(data, dict) else None
+        if (not isinstance(queries, list) or
+                len(queries) > settings.MAX_BATCH_SIZE):
+            raise BadRequest('queries must be a list of at most '
+                             f'{settings.MAX_BATCH_SIZE} path requests.')
+        deadline = self._get_deadline(data)
+
+        results = [{'paths': [], 'truncated': False} for _ in queries]
+        valid_queries, outputs = [], []
+        for position, data in enumerate(queries):
+            try:
+                query = self._get_query(data)
+                output = self._get_output(data)
+            except BadRequest as error:
+                results[position] = {'error': error.description}
+                continue
+            if query is not None:
+                valid_queries.append(query)
+                outputs.append((position, *output))
+
+        for (position, metrics, sort), (paths, truncated) in zip(
+                outputs, self.graph.batch_find_paths(valid_queries,
+                                                     deadline)):
+            paths = [self._serialize(path, metrics) for path in paths]
+            results[position] = {'paths': self._sort_paths(paths, sort),
+                                 'truncated': truncated}
+        return jsonify({'results': results})
+
+    @rest('v2/tree', methods=['POST'])
+    def shortest_path_tree(self):
+        """Calculate the best path from a source to each destination.
+
+        Destinations without a path get an empty hops list, and the ones
+        whose search the ``timeout_ms`` deadline cut short are flagged as
+        ``truncated``. The links used by the paths are also returned as hop
+        pairs when ``merged`` is set.
+        """
+        data = request.get_json()
+        if (not isinstance(data, dict) or 'source' not in data or
+                not isinstance(data.get('destinations'), list) or
+                len(data['destinations']) > settings.MAX_BATCH_SIZE):
+            raise BadRequest('source and a list of at most '
+                             f'{settings.MAX_BATCH_SIZE} destinations are '
+                             'required.')
+        destinations = data['destinations']
+        deadline = self._get_deadline(data)
+
+        results = [(None, False)] * len(destinations)
+        desired = self._get_desired(data)
+        if desired is not None:
+            results = self.graph.shortest_path_tree(
+                data['source'], destinations, data.get('parameter'), desired,
+                self._get_endpoints(data.get('undesired_links') or []),
+                self._get_constraints(data), deadline)
+
+        result = {'paths': [dict(self._serialize(path) if path else
+                                 {'hops': []}, destination=destination,
+                                 truncated=truncated)
+                            for destination, (path, truncated)
+                            in zip(destinations, results)]}
+        if data.get('merged'):
+            result['tree'] = self.graph.merge_paths(
+                [path for path, _ in results])
+        return jsonify(result)
+
+    @rest('v2/protection', methods=['POST'])
+    def protect(self):
+        """Protect a pair, returning its primary and backup paths.
+
+        The paths of a protected pair are recomputed on topology updates, so
+        later requests for the same pair are answered without a search.
+        """
+        pair = self._get_pair(request.get_json())
+        if (self.graph.get_protection(**pair) is None and
+                len(self.graph.protections()) >=
+                settings.MAX_PROTECTED_PAIRS):
+            raise BadRequest('at most '
+                             f'{settings.MAX_PROTECTED_PAIRS} pairs can be '
+                             'protected.')
+        return jsonify(self.graph.protect(**pair))
+
+    @rest('v2/protection', methods=['DELETE'])
+    def unprotect(self):
+        """Stop protecting a pair."""
+        if not self.graph.unprotect(**self._get_pair(request.get_json())):
+            raise NotFound('pair not protected.')
+        return jsonify({})
+
+    @rest('v2/protection', methods=['GET'])
+    def protections(self):
+        """List the protected pairs with their primary and backup paths."""
+        return jsonify({'protections': self.graph.protections()})
+
+    @staticmethod
+    def _get_hops(hops):
+        """Return a list of hops given in a request."""
+        if (not isinstance(hops, list) or
+                not all(isinstance(hop, str) for hop in hops)):
+            raise BadRequest('hops must be a list of strings.')
+        return hops
+
+    @rest('v2/validate', methods=['POST'])
+    def validate_paths(self):
+        """Tell whether each list of hops is still a path of the graph.
+
+        Each path is checked with a lookup per hop, without a search.
+        """
+        data = request.get_json()
+        paths = data.get('paths') if isinstance(data, dict) else None
+        if (not isinstance(paths, list) or
+                len(paths) > settings.MAX_BATCH_SIZE):
+            raise BadRequest('paths must be a list of at most '
+                             f'{settings.MAX_BATCH_SIZE} hop lists.')
+        valid = self.graph.validate_paths([self._get_hops(hops)
+                                           for hops in paths])
+        return jsonify({'valid': valid})
+
+    @rest('v2/subscription', methods=['POST'])
+    def subscribe(self):
+        """Register a path to be notified of the updates affecting it.
+
+        A ``kytos/pathfinder.paths_affected`` event lists the registered
+        paths using a link removed or changed by a topology update.
+        """
+        data = request.get_json()
+        if (not isinstance(data, dict) or
+                not isinstance(data.get('id'), str)):
+            raise BadRequest('id and hops are required.')
+        hops = self._get_hops(data.get('hops'))
+        if (self.graph.get_subscription(data['id']) is None and
+                len(self.graph.subscriptions()) >=
+                settings.MAX_SUBSCRIBED_PATHS):
+            raise BadRequest('at most '
+                             f'{settings.MAX_SUBSCRIBED_PATHS} paths can be '
+                             'subscribed.')
+        self.graph.subscribe(data['id'], hops)
+        return jsonify({'valid': self.graph.validate_paths([hops])[0]})
+
+    @rest('v2/subscription', methods=['DELETE'])
+    def unsubscribe(self):
+        """Unregister a subscribed path."""
+        data = request.get_json()
+        if not isinstance(data, dict) or 'id' not in data:
+            raise BadRequest('id is required.')
+        if not self.graph.unsubscribe(data['id']):
+            raise NotFound('path not subscribed.')
+        return jsonify({})
+
+    @rest('v2/subscription', methods=['GET'])
+    def subscriptions(self):
+        """List the subscribed paths."""
+        return jsonify({'subscriptions': self.graph.subscriptions()})
+
+    @rest('v2/cache', methods=['GET'])
+    def cache_stats(self):
+        """Return the path cache counters."""
+        return jsonify(self.graph.cache.stats())
+
+    @rest('v2/stats', methods=['GET'])
+    def metrics(self):
+        """Return the topology update, search and cache metrics.
+
+        They are written in the Prometheus text format, to be scraped.
+        """
+        cache = self.graph.cache.stats()
+        counters = {f'pathfinder_cache_{name}_total':
+                    (f'Path cache {name}.', cache[name])
+                    for name in ('hits', 'misses', 'evictions',
+                                 'invalidations')}
+        updates = self.updates.stats()
+        counters.update({
+            'pathfinder_topology_events_total': (
+                'Topology update events received.', updates['received']),
+            'pathfinder_topology_events_applied_total': (
+                'Topology update events applied to the graph.',
+                updates['applied']),
+            'pathfinder_topology_events_coalesced_total': (
+                'Topology update events superseded by a newer one before '
+                'being applied.', updates['coalesced'])})
+        return Response(self.graph.metrics.render(counters),
+                        mimetype='text/plain; version=0.0.4')
 
     @listen_to('kytos.topology.updated')
     def update_topology(self, event):
         """Update the graph when the network topology was updated.
 
-        Clear the current graph and create a new with the most topoly updated.
+        The events of a burst are coalesced, and only the newest topology is
+        applied once no event came for TOPOLOGY_UPDATE_WINDOW_MS, or after
+        TOPOLOGY_UPDATE_MAX_DELAY_MS. Only the nodes, edges and metadata
+        that changed since the previous topology are applied to the graph.
         """
         if 'topology' not in event.content:
             return
         topology = event.content['topology']
         self._topology = topology
-        self.graph.update_topology(topology)
+        self.updates.submit(topology)
+
+    def _apply_topology(self, topology):
+        """Apply a topology to the graph, notifying the affected paths."""
+        affected = self.graph.update_topology(topology)
         log.debug('Topology graph updated.')
+        if affected:
+            event = KytosEvent(name='kytos/pathfinder.paths_affected',
+                               content={'paths': affected})
+            self.controller.buffers.app.put(event)
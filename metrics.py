@@ -0,0 +1,131 @@
+"""Module Metrics of kytos/pathfinder Kytos Network Application."""
+
+import cProfile
+import io
+import pstats
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+
+SECONDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1, 2.5, 5, 10)
+
+# Type, help text and histogram buckets of each metric.
+METRICS = {
+    'pathfinder_topology_update_seconds': (
+        'histogram', 'Time spent applying a topology update.', SECONDS),
+    'pathfinder_startup_seconds': (
+        'gauge', 'Time spent building the graph after the NApp setup, '
+        'loading the checkpoint if any.', None),
+    'pathfinder_graph_nodes': (
+        'gauge', 'Nodes of the current graph.', None),
+    'pathfinder_graph_edges': (
+        'gauge', 'Edges of the current graph.', None),
+    'pathfinder_search_seconds': (
+        'histogram', 'Time spent searching the paths of a query.', SECONDS),
+    'pathfinder_search_first_path_seconds': (
+        'histogram', 'Time until the first path of a query was found.',
+        SECONDS),
+    'pathfinder_search_paths': (
+        'histogram', 'Paths found by a search.', (0, 1, 2, 5, 10, 20, 50,
+                                                  100)),
+    'pathfinder_search_truncated_total': (
+        'counter', 'Searches cut short by their deadline.', None),
+    'pathfinder_pruned_links': (
+        'histogram', 'Links hidden by the constraints of a search.',
+        (0, 1, 10, 100, 1000, 10000)),
+}
+
+# Only one request is profiled at a time, as profilers can not nest.
+_profile_lock = Lock()
+
+
+class Metrics:
+    """Counters, gauges and histograms rendered in Prometheus text format.
+
+    The metrics are the ones of ``METRICS``. A histogram keeps the count of
+    the observations falling in each bucket, with their count and sum, so
+    recording a value takes a bisection and a few additions.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = Lock()
+        for name, (kind, _, buckets) in METRICS.items():
+            if kind == 'histogram':
+                self._values[name] = [[0] * (len(buckets) + 1), 0, 0]
+            else:
+                self._values[name] = 0
+
+    def observe(self, name, value):
+        """Record a value in a histogram."""
+        buckets = METRICS[name][2]
+        with self._lock:
+            counts = self._values[name]
+            counts[0][bisect_left(buckets, value)] += 1
+            counts[1] += 1
+            counts[2] += value
+
+    def increment(self, name, value=1):
+        """Add a value to a counter."""
+        with self._lock:
+            self._values[name] += value
+
+    def set(self, name, value):
+        """Set the value of a gauge."""
+        with self._lock:
+            self._values[name] = value
+
+    def render(self, counters=None):
+        """Return the metrics in Prometheus text format.
+
+        ``counters`` maps the names of other counters to their help text
+        and value, to be rendered with the metrics.
+        """
+        lines = []
+        with self._lock:
+            values = {name: value if METRICS[name][0] != 'histogram' else
+                      [list(value[0]), value[1], value[2]]
+                      for name, value in self._values.items()}
+        for name, (kind, text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind != 'histogram':
+                lines.append(f'{name} {values[name]}')
+                continue
+            counts, count, total = values[name]
+            cumulative = 0
+            for bucket, bucket_count in zip([*buckets, '+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{le="{bucket}"}} {cumulative}')
+            lines.append(f'{name}_sum {total}')
+            lines.append(f'{name}_count {count}')
+        for name, (text, value) in (counters or {}).items():
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def profile(function, *args, **kwargs):
+    """Call a function under cProfile.
+
+    Return its result, the seconds it took and a summary of the functions
+    taking the most cumulative time. When another call is being profiled,
+    the function runs without the profiler and the summary is None.
+    """
+    # pylint: disable=consider-using-with
+    if not _profile_lock.acquire(blocking=False):
+        start = perf_counter()
+        return function(*args, **kwargs), perf_counter() - start, None
+    try:
+        profiler = cProfile.Profile()
+        start = perf_counter()
+        result = profiler.runcall(function, *args, **kwargs)
+        seconds = perf_counter() - start
+    finally:
+        _profile_lock.release()
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats(
+        'cumulative').print_stats(20)
+    return result, seconds, summary.getvalue()
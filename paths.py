@@ -0,0 +1,241 @@
+"""Module Paths of kytos/pathfinder Kytos Network Application."""
+
+from array import array
+from heapq import heappop, heappush
+from itertools import count
+from time import time
+from zlib import crc32
+
+# pylint: disable=too-many-arguments,too-many-locals
+
+
+class HopNames:
+    """Append-only table interning hop names to integer IDs.
+
+    Every switch, interface and link endpoint gets an ID the first time it
+    is seen, and keeps it for as long as the table lives, even when it
+    leaves the topology. A table is shared by the graph snapshots of a
+    topology, so the paths found on one snapshot still refer to the same
+    hops on the next ones.
+    """
+
+    __slots__ = ('names', 'ids')
+
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getstate__(self):
+        return self.names
+
+    def __setstate__(self, names):
+        self.names = names
+        self.ids = {name: hop_id for hop_id, name in enumerate(names)}
+
+    def intern(self, name):
+        """Return the ID of a name, giving it the next one if it is new.
+
+        The name is appended before its ID is published, so a reader never
+        finds an ID the names do not hold yet.
+        """
+        hop_id = self.ids.get(name)
+        if hop_id is None:
+            hop_id = len(self.names)
+            self.names.append(name)
+            self.ids[name] = hop_id
+        return hop_id
+
+    def get_edges(self, edges):
+        """Return the ID pairs of name pairs, leaving out unknown names."""
+        ids = self.ids
+        return [(ids[name_a], ids[name_b]) for name_a, name_b in edges
+                if name_a in ids and name_b in ids]
+
+
+class Path:
+    """A path as an array of hop IDs, with its cost and metric totals.
+
+    The hops are the IDs of a ``HopNames`` table, and the path behaves as a
+    sequence of them, so paths are compared, hashed and indexed by edge
+    without touching their names. ``hops`` builds the list of names, only
+    when the path is serialized. ``totals`` maps metadata keys to their
+    values along the path, for the keys that were computed.
+
+    The table is not pickled with the path, to keep the results sent by
+    the worker processes small, and is set again by the receiver, which
+    holds the same table.
+    """
+
+    __slots__ = ('ids', 'cost', 'totals', 'table')
+
+    def __init__(self, ids, cost, table, totals=None):
+        self.ids = ids if isinstance(ids, array) else array('I', ids)
+        self.cost = cost
+        self.table = table
+        self.totals = totals if totals is not None else {}
+
+    @property
+    def hops(self):
+        """Return the names of the hops."""
+        names = self.table.names
+        return [names[hop_id] for hop_id in self.ids]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __getitem__(self, index):
+        return self.ids[index]
+
+    def __copy__(self):
+        return self
+
+    def __getstate__(self):
+        return self.ids, self.cost, self.totals
+
+    def __setstate__(self, state):
+        self.ids, self.cost, self.totals = state
+        self.table = None
+
+    def __repr__(self):
+        return f'Path({self.cost!r}, {self.ids.tolist()!r})'
+
+
+class EqualCostPaths:
+    """The equal-cost shortest paths between two nodes of a graph view.
+
+    ``predecessors`` maps each node of the shortest-path DAG to the
+    ``(node, edge)`` pairs reaching it at its shortest cost. The number of
+    paths reaching the destination is counted once, from the destination
+    back to the source, and the paths are only built when asked for: path
+    ``index`` is unranked by walking the DAG back from the destination.
+    """
+
+    def __init__(self, view, source, destination, cost, predecessors):
+        self.view = view
+        self.source = source
+        self.destination = destination
+        self.cost = cost
+        self.predecessors = predecessors
+        self._counts = self._count()
+        self.count = self._counts[destination]
+
+    def _count(self):
+        """Return the number of shortest paths reaching each DAG node."""
+        counts = {self.source: 1}
+        stack = [self.destination]
+        while stack:
+            node = stack[-1]
+            missing = [previous for previous, _ in self.predecessors[node]
+                       if previous not in counts]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            if node not in counts:
+                counts[node] = sum(counts[previous]
+                                   for previous, _ in self.predecessors[node])
+        return counts
+
+    def get(self, index):
+        """Return the ``Path`` at ``index``, from 0 to ``count - 1``."""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        nodes, edges = [self.destination], []
+        while nodes[-1] != self.source:
+            for previous, edge in self.predecessors[nodes[-1]]:
+                if index < self._counts[previous]:
+                    nodes.append(previous)
+                    edges.append(edge)
+                    break
+                index -= self._counts[previous]
+        nodes.reverse()
+        edges.reverse()
+        # pylint: disable=protected-access
+        return self.view._path(nodes, edges, self.cost)
+
+    def __iter__(self):
+        """Yield the ``Path`` of each path, built as they are asked for."""
+        for index in range(self.count):
+            yield self.get(index)
+
+    def select(self, key):
+        """Return the ``Path`` a flow key hashes to.
+
+        The same key always selects the same path of the same DAG, in any
+        process, as the hash does not depend on the interpreter's seed.
+        """
+        return self.get(crc32(key.encode('utf-8')) % self.count)
+
+
+class LazyPaths:
+    """Simple paths of a generator, computed on demand and kept."""
+
+    def __init__(self, paths):
+        self._generator = paths
+        self._paths = []
+
+    def get(self, index):
+        """Return the ``Path`` at a position, by cost.
+
+        None is returned if there are not so many paths.
+        """
+        while len(self._paths) <= index and self._generator is not None:
+            try:
+                self._paths.append(next(self._generator))
+            except StopIteration:
+                self._generator = None
+        if index < len(self._paths):
+            return self._paths[index]
+        return None
+
+
+def merge_chains(chains, deadline=None, offset=0):
+    """Generate the ``Path`` of each simple path made of chain segments.
+
+    The combinations of segment paths are enumerated lazily from a heap, in
+    increasing order of cost, and the combinations that repeat a hop ID are
+    discarded. ``offset`` is added to the cost of each path, for the edges
+    joining its segments. The chains are taken from an iterable as the heap
+    is filled. When ``deadline`` passes, while filling the heap or between
+    two combinations, a None is generated and the enumeration stops.
+    """
+    heap = []
+    counter = count()
+    for chain in chains:
+        if deadline is not None and time() > deadline:
+            yield None
+            return
+        first = [segment.get(0) for segment in chain]
+        if all(first):
+            heappush(heap, (offset + sum(path.cost for path in first),
+                            next(counter), chain, (0,) * len(chain), 0))
+
+    while heap:
+        if deadline is not None and time() > deadline:
+            yield None
+            return
+        cost, _, chain, indexes, last = heappop(heap)
+        paths = [segment.get(index) for segment, index in zip(chain, indexes)]
+        hops = [hop for path in paths for hop in path.ids]
+        if len(set(hops)) == len(hops):
+            yield Path(hops, cost, paths[0].table)
+
+        # Each combination is pushed once, by the combination whose indexes
+        # only differ in the last position incremented.
+        for position in range(last, len(chain)):
+            successor = chain[position].get(indexes[position] + 1)
+            if successor is not None:
+                successor_indexes = list(indexes)
+                successor_indexes[position] += 1
+                successor_cost = (cost + successor.cost -
+                                  chain[position].get(indexes[position]).cost)
+                heappush(heap, (successor_cost, next(counter), chain,
+                                tuple(successor_indexes), position))
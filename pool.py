@@ -0,0 +1,237 @@
+"""Module Pool of kytos/pathfinder Kytos Network Application."""
+
+import os
+import pickle
+import shutil
+import tempfile
+from multiprocessing import get_context
+from threading import BoundedSemaphore, Lock
+from time import time
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.graph import KytosGraph
+
+# pylint: enable=import-error
+
+# Seconds a request waits for a worker past its deadline, since workers only
+# check the deadline between two paths. A worker still searching by then is
+# stopped and replaced by a new one.
+GRACE_PERIOD = 1
+
+# Snapshot files kept, so that the queries queued on the previous versions
+# can still load them.
+KEPT_SNAPSHOTS = 2
+
+_worker = {'path': None, 'engine': None}
+
+
+class _Observer:
+    """Metrics sending the observations of a search through a connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def observe(self, name, value):
+        """Send a histogram value, as a ``(name, value)`` tuple."""
+        self.connection.send((name, value))
+
+
+def _serve(connection):
+    """Answer the queries received through a connection, in a worker.
+
+    The paths of a query and the metrics it observes are sent back as they
+    are found, then whether the search was cut short, or the error raised
+    by the search.
+    """
+    while True:
+        try:
+            path, query, deadline = connection.recv()
+        except EOFError:
+            return
+        try:
+            if _worker['path'] != path:
+                with open(path, 'rb') as snapshot_file:
+                    graph = pickle.load(snapshot_file)
+                # pylint: disable=protected-access
+                _worker.update(path=path,
+                               engine=KytosGraph._get_engine(graph))
+            truncated = False
+            for found in KytosGraph.iter_paths(
+                    _worker['engine'], *query, deadline=deadline,
+                    metrics=_Observer(connection)):
+                if found is None:
+                    truncated = True
+                else:
+                    connection.send(found)
+            connection.send(truncated)
+        except Exception as error:  # pylint: disable=broad-except
+            connection.send(error)
+
+
+def _collect(connection, deadline, metrics=None):
+    """Return the paths received from a worker and the end of its search.
+
+    The paths are received until the worker sends whether it cut the
+    search short, or the error it raised, which is returned as the end.
+    The metrics observed by the worker are recorded in ``metrics``.
+    The end is None when the deadline and its grace period pass first, and
+    an ``EOFError`` when the worker died.
+    """
+    paths = []
+    while True:
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline + GRACE_PERIOD - time(), 0)
+        try:
+            if not connection.poll(timeout):
+                return paths, None
+            message = connection.recv()
+        except (EOFError, OSError):
+            return paths, EOFError()
+        if isinstance(message, (bool, Exception)):
+            return paths, message
+        if isinstance(message, tuple):
+            if metrics is not None:
+                metrics.observe(*message)
+            continue
+        paths.append(message)
+
+
+class _Worker:
+    """Worker process answering the queries sent through a pipe."""
+
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+
+    def stop(self):
+        """Stop the process and close the pipe."""
+        self.process.terminate()
+        self.connection.close()
+
+
+class PathPool:
+    """Pool of worker processes searching paths on graph snapshots.
+
+    Searching in other processes keeps long searches from blocking the
+    request threads and from competing for the GIL with the controller.
+    Each snapshot is pickled once to a file, and each worker loads it on
+    its first query on that version, keeping the engine for the next ones.
+    The workers stream the paths back as they are found, so the ones found
+    by the deadline are returned even when a worker misses it. Such a
+    worker is stopped and replaced, so it does not hold a place in the pool.
+    The processes are spawned on the first searches.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._context = get_context('spawn')
+        self._slots = BoundedSemaphore(size)
+        self._idle = []
+        self._busy = set()
+        self._directory = None
+        self._files = {}
+        self._lock = Lock()
+
+    def search(self, snapshot, query, deadline=None, metrics=None):
+        """Return the paths of a query, and whether they were cut short.
+
+        ``query`` holds the ``KytosGraph.search`` arguments after the
+        engine. The paths a worker found by the deadline and its grace
+        period are returned, marked as cut short when it did not end. When
+        every worker stays busy until the deadline, or the worker dies, the
+        query is searched in the calling thread instead. The paths come back
+        without their hop names table, which is the one of the snapshot.
+        The metrics the search observes are recorded in ``metrics``, when
+        given.
+        """
+        path = self._dump(snapshot)
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - time(), 0)
+        # pylint: disable=consider-using-with
+        if not self._slots.acquire(timeout=timeout):
+            return KytosGraph.search(snapshot.engine, *query,
+                                     deadline=deadline, metrics=metrics)
+        try:
+            worker = self._get_worker()
+            try:
+                worker.connection.send((path, query, deadline))
+                paths, end = _collect(worker.connection, deadline,
+                                      metrics)
+            except OSError:
+                paths, end = [], EOFError()
+            except BaseException:
+                self._release(worker, False)
+                raise
+            self._release(worker, end is not None and
+                          not isinstance(end, EOFError))
+        finally:
+            self._slots.release()
+        if isinstance(end, (EOFError, FileNotFoundError)):
+            return KytosGraph.search(snapshot.engine, *query,
+                                     deadline=deadline, metrics=metrics)
+        if isinstance(end, Exception):
+            raise end
+        for found in paths:
+            found.table = snapshot.engine.table
+        return paths, end is None or end
+
+    def close(self):
+        """Stop the workers and remove the snapshot files."""
+        with self._lock:
+            for worker in [*self._idle, *self._busy]:
+                worker.stop()
+            self._idle = []
+            self._busy = set()
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+            self._files = {}
+
+    def _get_worker(self):
+        """Return an idle worker, spawning one if there is none."""
+        with self._lock:
+            worker = self._idle.pop() if self._idle else _Worker(
+                self._context)
+            self._busy.add(worker)
+            return worker
+
+    def _release(self, worker, ended):
+        """Make a worker idle again, or replace it if its search is on.
+
+        A dead worker is replaced as well.
+
+        The replacement is spawned at once, so it starts up while no query
+        waits for it.
+        """
+        with self._lock:
+            if worker not in self._busy:
+                return
+            self._busy.remove(worker)
+            if ended:
+                self._idle.append(worker)
+                return
+            worker.stop()
+            self._idle.append(_Worker(self._context))
+
+    def _dump(self, snapshot):
+        """Return the file holding a snapshot, pickling it if needed."""
+        with self._lock:
+            path = self._files.get(snapshot.version)
+            if path is not None:
+                return path
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix='pathfinder-')
+            path = os.path.join(self._directory,
+                                f'snapshot-{snapshot.version}.pickle')
+            with open(path, 'wb') as snapshot_file:
+                pickle.dump(snapshot.graph, snapshot_file,
+                            pickle.HIGHEST_PROTOCOL)
+            self._files[snapshot.version] = path
+            for version in sorted(self._files)[:-KEPT_SNAPSHOTS]:
+                os.remove(self._files.pop(version))
+            return path
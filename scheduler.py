@@ -0,0 +1,74 @@
+"""Module Scheduler of kytos/pathfinder Kytos Network Application."""
+
+from threading import Lock, Timer
+from time import monotonic
+
+
+class CoalescingScheduler:
+    """Apply the newest of a burst of items once the burst is over.
+
+    Each submitted item replaces the pending one and restarts a ``window``
+    seconds timer, so the items of a burst collapse into a single call of
+    ``apply`` with the newest one. The call is never deferred by more than
+    ``max_delay`` seconds after the first pending item, even if the burst
+    goes on. With a zero ``window``, items are applied as they come.
+
+    Calls of ``apply`` never overlap, and an item is never applied after a
+    newer one.
+    """
+
+    def __init__(self, apply, window, max_delay):
+        self.apply = apply
+        self.window = window
+        self.max_delay = max_delay
+        self.received = 0
+        self.applied = 0
+        self.coalesced = 0
+        self._pending = None
+        self._first = None
+        self._timer = None
+        self._lock = Lock()
+        self._apply_lock = Lock()
+
+    def submit(self, item):
+        """Schedule an item, replacing the pending one."""
+        with self._lock:
+            self.received += 1
+            if self._first is None:
+                self._first = monotonic()
+            else:
+                self.coalesced += 1
+            self._pending = item
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            delay = min(self.window,
+                        self._first + self.max_delay - monotonic())
+            if delay > 0:
+                self._timer = Timer(delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """Apply the pending item now, if any."""
+        with self._apply_lock:
+            with self._lock:
+                if self._first is None:
+                    return
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                item = self._pending
+                self._pending = self._first = None
+                self.applied += 1
+            self.apply(item)
+
+    def stats(self):
+        """Return the scheduler counters."""
+        with self._lock:
+            return {'received': self.received,
+                    'applied': self.applied,
+                    'coalesced': self.coalesced,
+                    'pending': int(self._first is not None)}
@@ -0,0 +1,1000 @@
+"""Module Search of kytos/pathfinder Kytos Network Application."""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from copy import copy
+from heapq import heappop, heappush
+from itertools import count
+from numbers import Number
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.paths import EqualCostPaths, HopNames, Path
+
+# pylint: enable=import-error
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+class PathSearch:
+    """Path search over a switch-level multigraph.
+
+    The nodes of the graph are the switches and its edges are the links
+    between them, keyed by the pair of interfaces they join. The graph
+    attribute ``interfaces`` maps each interface to its switch. Interfaces
+    are not nodes, so the search only walks through routing decisions, and
+    the interfaces crossed are put back in the hops of each path found.
+    The paths are returned as ``Path`` objects holding the hop IDs of the
+    ``hop_names`` graph attribute, or of a table made for the graph when it
+    has none.
+
+    An edge costs its link metadata plus the switch to interface hops it
+    stands for, which cost 1 when searching by hop count and 0 when
+    searching by a metadata key, so the costs are the ones of a graph having
+    a node for each interface.
+
+    The metadata is kept as a sparse column per key. ``defaults`` maps a
+    key to the value of the edges missing it, zero when not given, so
+    ``float('inf')`` keeps the links without a ``delay`` out of the
+    searches by delay, even when no link has one. The numeric keys, weighed
+    by their values rather than by hop count, are the ones whose values and
+    default are numbers.
+
+    When landmarks are set, the distances from each of them are kept for
+    the hop count and every metadata key, and the searches of Yen's
+    algorithm run A* with the lower bounds they give (ALT).
+
+    Subclasses store the nodes and the adjacency of the graph.
+    """
+
+    def __init__(self, graph, edges, defaults=None):
+        self.names = list(graph)
+        self.interfaces = graph.graph.get('interfaces', {})
+        self.table = graph.graph.get('hop_names')
+        if self.table is None:
+            self.table = HopNames([*graph, *self.interfaces])
+        self.links = [key for _, _, key, _ in edges]
+        self.spans = [(key[0] not in graph) + (key[1] not in graph)
+                      for key in self.links]
+        self.defaults = defaults or {}
+        self._sparse = defaultdict(dict)
+        for edge, (_, _, _, metadata) in enumerate(edges):
+            for key, value in metadata.items():
+                self._sparse[key][edge] = value
+        self._sparse = dict(self._sparse)
+        self.keys = set()
+        for key in {*self._sparse, *self.defaults}:
+            values = list(self._sparse.get(key, {}).values())
+            if key in self.defaults:
+                values.append(self.defaults[key])
+            if all(self._is_number(value) for value in values):
+                self.keys.add(key)
+
+        self._index = {frozenset(key): edge
+                       for edge, key in enumerate(self.links)}
+        self._interface_links = {interface: edge
+                                 for edge, key in enumerate(self.links)
+                                 for interface in key
+                                 if interface in self.interfaces}
+        self._columns = {}
+        self._indexes = {}
+        self._costs = {}
+        self.landmarks = []
+        self._landmark_distances = {}
+        self._hidden = frozenset()
+        self._virtual = frozenset()
+        self._extra = {}
+        self._extra_links = {}
+        self._extra_costs = {}
+        self._extra_hops = {}
+
+    @staticmethod
+    def _is_number(value):
+        """Return whether a metadata value is a number."""
+        return isinstance(value, Number) and not isinstance(value, bool)
+
+    def _get_column(self, key):
+        """Return the value of a metadata key on each edge, or None.
+
+        The edges missing the key take its default. None is returned when
+        no edge has the key and it has no default.
+        """
+        column = self._columns.get(key)
+        if column is None:
+            sparse = self._sparse.get(key)
+            if sparse is None and key not in self.defaults:
+                return None
+            column = [self.defaults.get(key, 0)] * len(self.links)
+            for edge, value in (sparse or {}).items():
+                column[edge] = value
+            self._columns[key] = column
+        return column
+
+    def _get_index(self, key):
+        """Return the indexes of the edges by value of a metadata key.
+
+        They are made on the first search constraining the key, so the edges
+        failing it are found without a scan. The first maps each value to its
+        edges, the second keeps the numeric values in order with their edges,
+        and the third holds the other edges.
+        """
+        index = self._indexes.get(key)
+        if index is None:
+            column = self._get_column(key)
+            if column is None:
+                return {}, ([], []), range(len(self.links))
+            values = defaultdict(list)
+            for edge, value in enumerate(column):
+                try:
+                    values[value].append(edge)
+                except TypeError:
+                    continue
+            pairs = sorted((value, edge) for edge, value in enumerate(column)
+                           if self._is_number(value))
+            unsorted = [edge for edge, value in enumerate(column)
+                        if not self._is_number(value)]
+            index = (dict(values), ([value for value, _ in pairs],
+                                    [edge for _, edge in pairs]), unsorted)
+            self._indexes[key] = index
+        return index
+
+    @staticmethod
+    def get_edges(graph):
+        """Return ``(node_a, node_b, key, metadata)`` for each graph edge.
+
+        The edges of a graph without keys are keyed by their endpoints. The
+        edge views are iterated once, as their length takes another pass.
+        """
+        if graph.is_multigraph():
+            return list(iter(graph.edges(keys=True, data=True)))
+        return [(node_a, node_b, (node_a, node_b), metadata)
+                for node_a, node_b, metadata in graph.edges(data=True)]
+
+    def _node(self, name):
+        """Return the node of a name, or None if it is not a node."""
+        raise NotImplementedError
+
+    def _name(self, node):
+        """Return the name of a node."""
+        raise NotImplementedError
+
+    def _adjacent(self, node):
+        """Return ``(neighbor, edge)`` for each edge of a node."""
+        raise NotImplementedError
+
+    def _build_costs(self, weight, hop_cost):
+        """Return the cost of each edge, given the cost of a switch hop."""
+        raise NotImplementedError
+
+    def _edge_costs(self, weight):
+        """Return the cost of each edge, indexed by edge."""
+        costs = self._costs.get(weight)
+        if costs is None:
+            costs = self._build_costs(weight, self._hop_cost(weight))
+            self._costs[weight] = costs
+        return costs
+
+    def _hop_cost(self, weight):
+        """Return the cost of the hop between a switch and an interface."""
+        return 0 if weight in self.keys else 1
+
+    def _link_cost(self, edge, costs, hop_cost):
+        """Return the cost of the link of an edge, without switch hops."""
+        return costs[edge] - self.spans[edge] * hop_cost
+
+    def _get_weights(self, weight):
+        """Return the costs of the graph edges and of the attached edges."""
+        costs = self._edge_costs(weight)
+        extra_costs = self._extra_costs.get(weight)
+        if extra_costs is None:
+            hop_cost = self._hop_cost(weight)
+            extra_costs = {
+                edge: hops * hop_cost + (
+                    0 if link is None
+                    else self._link_cost(link, costs, hop_cost))
+                for edge, (link, hops) in self._extra_links.items()}
+            self._extra_costs[weight] = extra_costs
+        return costs, extra_costs
+
+    def path_cost(self, hops, weight=None):
+        """Return the cost of a path given by its hops or as a ``Path``."""
+        if isinstance(hops, Path):
+            hops = hops.hops
+        costs = self._edge_costs(weight)
+        hop_cost = self._hop_cost(weight)
+        cost = 0
+        for pair in zip(hops[:-1], hops[1:]):
+            edge = self._index.get(frozenset(pair))
+            if edge is None:
+                cost += hop_cost
+            else:
+                cost += self._link_cost(edge, costs, hop_cost)
+        return cost
+
+    def path_metrics(self, path, metrics):
+        """Return the metadata of the links of a path, aggregated by key.
+
+        ``metrics`` maps metadata keys to ``sum``, ``min`` or ``max``. The
+        numeric values of the links are aggregated, and the sums already
+        in the totals of the path are reused. A key no link has a value for
+        is None, as is a ``min`` or ``max`` without any link.
+        """
+        hops = path.hops
+        edges = [self._index.get(frozenset(pair))
+                 for pair in zip(hops[:-1], hops[1:])]
+        edges = [edge for edge in edges if edge is not None]
+        result = {}
+        for key, aggregate in metrics.items():
+            if aggregate == 'sum' and key in path.totals:
+                result[key] = path.totals[key]
+                continue
+            column = self._get_column(key)
+            if column is None:
+                result[key] = None
+                continue
+            values = [column[edge] for edge in edges
+                      if self._is_number(column[edge])]
+            if aggregate == 'sum':
+                result[key] = sum(values)
+            else:
+                result[key] = (min if aggregate == 'min' else max)(
+                    values, default=None)
+        return result
+
+    def has_edge(self, node_a, node_b):
+        """Return whether there is a visible link between two endpoints."""
+        edge = self._index.get(frozenset((node_a, node_b)))
+        return edge is not None and edge not in self._hidden
+
+    def is_path(self, hops):
+        """Return whether the hops of a path are still joined in the graph.
+
+        Each pair of consecutive hops must be a visible link, or an
+        interface and its switch. This takes a dict lookup per hop, without
+        searching the graph.
+        """
+        if not hops:
+            return False
+        if len(hops) == 1:
+            return (hops[0] in self.interfaces or
+                    self._node(hops[0]) is not None)
+        return all(self.interfaces.get(hop_a) == hop_b or
+                   self.interfaces.get(hop_b) == hop_a or
+                   self.has_edge(hop_a, hop_b)
+                   for hop_a, hop_b in zip(hops, hops[1:]))
+
+    def restrict(self, edges):
+        """Return a view of the graph hiding the given links."""
+        view = copy(self)
+        view._hidden = self._hidden.union(  # pylint: disable=protected-access
+            self._index[frozenset(edge)] for edge in edges
+            if frozenset(edge) in self._index)
+        return view
+
+    def relink(self, removed, restored):
+        """Return a view hiding some links and showing hidden ones again.
+
+        ``restored`` maps link keys to their metadata, and None is returned
+        when one of them is not hidden or had other metadata in the engine.
+        """
+        edges = [self._index.get(frozenset(key)) for key in restored]
+        if any(edge not in self._hidden or metadata != {
+                name: column[edge] for name, column in self._sparse.items()
+                if edge in column}
+               for edge, metadata in zip(edges, restored.values())):
+            return None
+        view = self.restrict(removed)
+        view._hidden -= set(edges)  # pylint: disable=protected-access
+        return view
+
+    def prune(self, predicates):
+        """Return a view of the graph hiding the links failing predicates.
+
+        Each predicate is a ``(key, operator, value)`` tuple, and a link
+        passes it when its metadata value for the key is at least (``min``)
+        or at most (``max``) the given value, or is one of the given values
+        (``in``). Links without the key are given its default value, and
+        links without a numeric value fail ``min`` and ``max``.
+        """
+        failing = set()
+        for key, operator, value in predicates:
+            values_index, (values, edges), unsorted = self._get_index(key)
+            if operator == 'in':
+                passing = {edge for item in value
+                           for edge in values_index.get(item, ())}
+                failing.update(edge for edge in range(len(self.links))
+                               if edge not in passing)
+                continue
+            if operator == 'min':
+                failing.update(edges[:bisect_left(values, value)])
+            else:
+                failing.update(edges[bisect_right(values, value):])
+            failing.update(unsorted)
+        view = copy(self)
+        view._hidden = self._hidden.union(  # pylint: disable=protected-access
+            failing)
+        return view
+
+    def set_landmarks(self, number):
+        """Pick landmark nodes and keep the distances from them.
+
+        The landmarks are picked one by one as the node farthest, by hop
+        count, from the ones already picked. The distances from each of
+        them are kept for the hop count and every numeric metadata key.
+        """
+        nodes = [self._node(name) for name in self.names]
+        if not nodes or number <= 0:
+            return
+        hop_costs = self._get_weights(None)
+        distances = self._distances(nodes[0], hop_costs)
+        landmark = max(distances, key=distances.get)
+        closest = dict.fromkeys(nodes, float('inf'))
+        while landmark is not None and len(self.landmarks) < number:
+            self.landmarks.append(landmark)
+            distances = self._distances(landmark, hop_costs)
+            for node in nodes:
+                closest[node] = min(closest[node],
+                                    distances.get(node, float('inf')))
+            landmark = max((node for node in nodes if closest[node] > 0),
+                           key=closest.get, default=None)
+
+        for weight in [None, *sorted(self.keys)]:
+            costs = self._get_weights(weight)
+            tables = [self._distances(landmark, costs)
+                      for landmark in self.landmarks]
+            self._landmark_distances[weight] = {
+                node: tuple(table.get(node) for table in tables)
+                for node in nodes}
+
+    def simple_paths(self, source, destination, weight=None, bounds=None):
+        """Generate the ``Path`` of each simple path, by cost.
+
+        The paths are enumerated with Yen's algorithm, running a
+        bidirectional Dijkstra over the switches, or A* when landmarks are
+        set.
+
+        ``bounds`` maps metadata keys to the maximum sum of their values
+        along a path. Paths beyond a bound are not generated, and the
+        deviations that can only lead to such paths are not searched. The
+        sums are kept in the ``totals`` of each path. A bound on a key that
+        is not numeric, with no link nor default value, leaves no path. Paths
+        of infinite cost are not generated either.
+        """
+        if not self.keys.issuperset(bounds or ()):
+            return
+        view = self._attach((source, destination))
+        # pylint: disable=protected-access
+        source = view._resolve(source)
+        destination = view._resolve(destination)
+        if source is None or destination is None:
+            return
+        for path in view._simple_paths(
+                source, destination, view._get_weights(weight),
+                view._get_bounds(destination, weight, bounds or {}),
+                view._get_heuristic(destination, weight)):
+            if path.cost == float('inf'):
+                return
+            yield path
+
+    def shortest_paths_from(self, source, destinations, weight=None):
+        """Return the ``Path`` of the shortest path to each destination.
+
+        A single Dijkstra runs from the source, until every reachable
+        destination is settled. Unreachable destinations are left out.
+        """
+        view = self._attach([source, *destinations])
+        # pylint: disable=protected-access
+        return view._shortest_paths_from(source, destinations,
+                                         view._get_weights(weight))
+
+    def equal_cost_paths(self, source, destination, weight=None):
+        """Return the ``EqualCostPaths`` between two names, or None.
+
+        A single Dijkstra runs from the source until the destination is
+        settled, keeping every predecessor reaching a node at its shortest
+        cost, so the paths are counted and enumerated from that DAG without
+        searching again. None is returned when the destination can not be
+        reached.
+        """
+        view = self._attach((source, destination))
+        # pylint: disable=protected-access
+        return view._equal_cost_paths(source, destination,
+                                      view._get_weights(weight))
+
+    def disjoint_paths(self, source, destination, weight=None, limit=2,
+                       nodes=False):
+        """Return up to ``limit`` disjoint ``Path`` objects, by cost.
+
+        The paths share no link or, when ``nodes`` is set, no switch but the
+        ones of the source and destination. They are found in one pass, as
+        a flow of ``limit`` units of minimum cost from the source to the
+        destination, augmented along successive shortest paths of the
+        residual graph as done by Suurballe's and Bhandari's algorithms, so
+        no other set of as many disjoint paths costs less. Between two
+        interfaces of a switch, one more path may exist than found.
+        """
+        view = self._attach((source, destination))
+        # pylint: disable=protected-access
+        source = view._resolve(source)
+        destination = view._resolve(destination)
+        if source is None or destination is None:
+            return []
+        if source == destination:
+            return [view._path([source], [], 0)]
+        shared = None
+        if nodes:
+            shared = {source, destination}
+            shared.update(view._node(view.interfaces[name])
+                          for name in view._virtual)
+        switches = [view._node(view.interfaces[name])
+                    if name in view._virtual else name
+                    for name in (source, destination)]
+        ends = [('switch', name) for name in (source, destination)
+                if name in view._virtual]
+        choices = [ends]
+        if switches[0] == switches[1]:
+            choices = [ends[:1], ends[1:]] if len(ends) == 2 else [[]]
+        results = []
+        for hops in choices:
+            flow = _Flow(view, view._get_weights(weight), limit, hops, shared)
+            paths = view._disjoint_paths(source, destination, flow)
+            results.append((-len(paths), sum(path.cost for path in paths),
+                            paths))
+        return min(results, key=lambda result: result[:2])[2]
+
+    def _get_heuristic(self, destination, weight):
+        """Return a lower bound of the cost from a node to a destination.
+
+        The bound is the largest difference between the distances of the
+        node and of the destination from a landmark, which the triangle
+        inequality keeps below the cost between them. An attached interface
+        takes the distances of its switch, less the cost of the hop between
+        them. Equal distances, infinite ones included, give no bound. The
+        bounds are computed once per node. None is returned when there are
+        no landmarks.
+        """
+        tables = self._landmark_distances.get(weight)
+        if tables is None:
+            return None
+        hop_cost = self._hop_cost(weight)
+
+        def get_distances(node):
+            if node in self._virtual:
+                return tables.get(self._node(self.interfaces[node])), hop_cost
+            return tables.get(node), 0
+
+        target, target_slack = get_distances(destination)
+        if target is None:
+            return None
+        bounds = {}
+
+        def heuristic(node):
+            bound = bounds.get(node)
+            if bound is None:
+                distances, slack = get_distances(node)
+                bound = max((abs(target_distance - distance)
+                             for target_distance, distance
+                             in zip(target, distances or ())
+                             if target_distance is not None and
+                             distance is not None and
+                             target_distance != distance), default=0)
+                bound = max(bound - slack - target_slack, 0)
+                bounds[node] = bound
+            return bound
+        return heuristic
+
+    def _get_bounds(self, destination, weight, bounds):
+        """Return the bounds of a search with what is needed to apply them.
+
+        Each bound is given as ``(costs, lower, maximum, ordered)``, where
+        ``lower`` maps each node to the lowest cost to the destination and
+        ``ordered`` tells whether the paths are found by the same costs.
+        """
+        result = []
+        for key, maximum in bounds.items():
+            costs = self._get_weights(key)
+            lower = self._distances(destination, costs)
+            result.append((key, costs, lower, maximum, key == weight))
+        return result
+
+    def _resolve(self, name):
+        """Return the node of a name in a view, or None."""
+        if name in self._virtual:
+            return name
+        return self._node(name)
+
+    def _get_name(self, node):
+        """Return the name of a node of a view."""
+        if node in self._virtual:
+            return node
+        return self._name(node)
+
+    def _attach(self, names):
+        """Return a view where the interfaces among ``names`` are nodes.
+
+        Each interface is linked to its switch and, through its link, to the
+        interface or switch at the other end, whose link is hidden.
+        """
+        interfaces = {name for name in names
+                      if name in self.interfaces and self._node(name) is None}
+        if not interfaces:
+            return self
+
+        view = copy(self)
+        extra = defaultdict(list)
+        extra_links = {}
+        extra_hops = {}
+        hidden = set()
+        for interface in interfaces:
+            edges = [(self._node(self.interfaces[interface]),
+                      ('switch', interface), (None, 1), [])]
+            edge = self._interface_links.get(interface)
+            if edge is not None and edge not in self._hidden:
+                hidden.add(edge)
+                peer = [hop for hop in self.links[edge] if hop != interface]
+                if peer[0] in interfaces:
+                    edges.append((peer[0], ('link', edge), (edge, 0), []))
+                elif self._node(peer[0]) is not None:
+                    edges.append((self._node(peer[0]), ('link', edge),
+                                  (edge, 0), []))
+                else:
+                    edges.append((self._node(self.interfaces[peer[0]]),
+                                  ('link', edge), (edge, 1), peer))
+            for node, extra_edge, link, hops in edges:
+                if extra_edge in extra_links:
+                    continue
+                extra[interface].append((node, extra_edge))
+                extra[node].append((interface, extra_edge))
+                extra_links[extra_edge] = link
+                extra_hops[extra_edge] = (interface, hops)
+
+        # pylint: disable=protected-access
+        view._hidden = self._hidden.union(hidden)
+        view._virtual = frozenset(interfaces)
+        view._extra = dict(extra)
+        view._extra_links = extra_links
+        view._extra_costs = {}
+        view._extra_hops = extra_hops
+        return view
+
+    def _neighbors(self, node, costs):
+        """Generate ``(neighbor, edge, cost)`` for the edges of a node."""
+        costs, extra_costs = costs
+        if node not in self._virtual:
+            for neighbor, edge in self._adjacent(node):
+                yield neighbor, edge, costs[edge]
+        for neighbor, edge in self._extra.get(node, ()):
+            yield neighbor, edge, extra_costs[edge]
+
+    def _path(self, nodes, edges, cost, totals=None):
+        """Return the ``Path`` of nodes and edges, with the interfaces.
+
+        Only the hop IDs are kept, the names are looked up when the path is
+        serialized.
+        """
+        ids = self.table.ids
+        hops = [ids[self._get_name(nodes[0])]]
+        for node, edge, next_node in zip(nodes, edges, nodes[1:]):
+            hops.extend(ids[hop] for hop in self._crossed(node, edge))
+            hops.append(ids[self._get_name(next_node)])
+        return Path(hops, cost, self.table, totals)
+
+    def _crossed(self, node, edge):
+        """Return the interfaces crossed by an edge, leaving a node."""
+        if edge in self._extra_hops:
+            start, hops = self._extra_hops[edge]
+            return hops if start == node else hops[::-1]
+        interface_a, interface_b = self.links[edge]
+        if self.interfaces.get(interface_a, interface_a) != self._name(node):
+            interface_a, interface_b = interface_b, interface_a
+        return [hop for hop in (interface_a, interface_b)
+                if self._node(hop) is None]
+
+    def _simple_paths(self, source, destination, costs, bounds,
+                      heuristic=None):
+        """Generate the ``Path`` of each simple path between nodes."""
+        if any(lower.get(source, float('inf')) > maximum
+               for _, _, lower, maximum, _ in bounds):
+            return
+        if source == destination:
+            yield self._path([source], [], 0,
+                             {key: 0 for key, _, _, _, _ in bounds})
+            return
+
+        path = self._shortest_path(source, destination, costs, (),
+                                   self._hidden, heuristic)
+        found = []
+        candidates = []
+        seen = set()
+        counter = count()
+        while path is not None:
+            cost, nodes, edges = path
+            if any(ordered and cost > maximum
+                   for _, _, _, maximum, ordered in bounds):
+                return
+            totals = {key: self._sum(edges, bound_costs)
+                      for key, bound_costs, _, _, _ in bounds}
+            if all(totals[key] <= maximum
+                   for key, _, _, maximum, _ in bounds):
+                yield self._path(nodes, edges, cost, totals)
+            found.append(edges)
+            seen.add(edges)
+
+            for candidate in self._spur_paths(nodes, edges, found, costs,
+                                              bounds, heuristic):
+                if candidate[2] not in seen:
+                    seen.add(candidate[2])
+                    heappush(candidates, (candidate[0], next(counter),
+                                          candidate))
+            path = heappop(candidates)[2] if candidates else None
+
+    def _shortest_paths_from(self, source, destinations, costs):
+        """Return the ``Path`` of the shortest path to each name."""
+        source = self._resolve(source)
+        if source is None:
+            return {}
+        targets = {self._resolve(destination): destination
+                   for destination in destinations
+                   if self._resolve(destination) is not None}
+        settled = {}
+        distances = {source: 0}
+        previous = {source: None}
+        counter = count()
+        heap = [(0, next(counter), source)]
+        remaining = set(targets)
+        while heap and remaining:
+            cost, _, node = heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = cost
+            remaining.discard(node)
+            for neighbor, edge, edge_cost in self._neighbors(node, costs):
+                if neighbor in settled or edge in self._hidden:
+                    continue
+                neighbor_cost = cost + edge_cost
+                if neighbor_cost < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = neighbor_cost
+                    previous[neighbor] = (node, edge)
+                    heappush(heap, (neighbor_cost, next(counter), neighbor))
+
+        tree = {}
+        for target in settled.keys() & targets.keys():
+            nodes, edges = [target], []
+            while previous[nodes[0]] is not None:
+                node, edge = previous[nodes[0]]
+                nodes.insert(0, node)
+                edges.insert(0, edge)
+            tree[targets[target]] = self._path(nodes, edges, settled[target])
+        return tree
+
+    def _equal_cost_paths(self, source, destination, costs):
+        """Return the ``EqualCostPaths`` between two names, or None."""
+        source = self._resolve(source)
+        destination = self._resolve(destination)
+        if source is None or destination is None:
+            return None
+        settled = {}
+        distances = {source: 0}
+        predecessors = {source: []}
+        counter = count()
+        heap = [(0, next(counter), source)]
+        while heap:
+            cost, _, node = heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = cost
+            if node == destination:
+                return EqualCostPaths(self, source, destination, cost,
+                                      predecessors)
+            for neighbor, edge, edge_cost in self._neighbors(node, costs):
+                if neighbor in settled or edge in self._hidden:
+                    continue
+                neighbor_cost = cost + edge_cost
+                if neighbor_cost == float('inf'):
+                    continue
+                if neighbor not in distances:
+                    distances[neighbor] = neighbor_cost
+                    predecessors[neighbor] = [(node, edge)]
+                    heappush(heap, (neighbor_cost, next(counter), neighbor))
+                elif _equal(neighbor_cost, distances[neighbor]):
+                    predecessors[neighbor].append((node, edge))
+                elif neighbor_cost < distances[neighbor]:
+                    distances[neighbor] = neighbor_cost
+                    predecessors[neighbor] = [(node, edge)]
+                    heappush(heap, (neighbor_cost, next(counter), neighbor))
+        return None
+
+    def _disjoint_paths(self, source, destination, flow):
+        """Return the paths of a minimum cost flow between two nodes."""
+        start = flow.state(source, 1)
+        end = flow.state(destination, 0)
+        potentials = {}
+        for _ in range(flow.units):
+            distances, previous = self._residual_dijkstra(flow, start,
+                                                          potentials)
+            if end not in distances:
+                break
+            for state, distance in distances.items():
+                potentials[state] = potentials.get(state, 0) + distance
+            state = end
+            while state != start:
+                state, arc, direction = previous[state]
+                flow.flows[arc] = flow.flows.get(arc, 0) + direction
+
+        paths = []
+        successors = flow.successors()
+        while successors.get(source):
+            nodes, edges = [source], []
+            while nodes[-1] != destination:
+                edge, head = successors[nodes[-1]].pop()
+                if head in nodes:
+                    del edges[nodes.index(head):]
+                    del nodes[nodes.index(head) + 1:]
+                    continue
+                nodes.append(head)
+                edges.append(edge)
+            paths.append(self._path(nodes, edges,
+                                    self._sum(edges, flow.costs)))
+        return sorted(paths, key=lambda path: path.cost)
+
+    @staticmethod
+    def _residual_dijkstra(flow, start, potentials):
+        """Return the distances and arcs of the residual shortest paths.
+
+        The arc costs are reduced by the node potentials, which keeps them
+        non-negative even for the arcs cancelling some flow.
+        """
+        settled = {}
+        distances = {start: 0}
+        previous = {}
+        counter = count()
+        heap = [(0, next(counter), start)]
+        while heap:
+            distance, _, state = heappop(heap)
+            if state in settled:
+                continue
+            settled[state] = distance
+            for next_state, arc, cost, direction in flow.arcs(state):
+                if next_state in settled:
+                    continue
+                next_distance = (distance + cost + potentials.get(state, 0) -
+                                 potentials.get(next_state, 0))
+                if next_distance < distances.get(next_state, float('inf')):
+                    distances[next_state] = next_distance
+                    previous[next_state] = (state, arc, direction)
+                    heappush(heap, (next_distance, next(counter),
+                                    next_state))
+        return settled, previous
+
+    def _spur_paths(self, nodes, edges, found, costs, bounds,
+                    heuristic=None):
+        """Generate the deviations of a path found by Yen's algorithm.
+
+        For each node of the path, the edges leaving it in the paths already
+        found with the same root are banned, as are the root nodes, and the
+        shortest path from the node to the destination is the spur path.
+        A node is skipped when its root and the lowest cost from it to the
+        destination already exceed a bound.
+        """
+        root_cost = 0
+        for position, edge in enumerate(edges):
+            if any(self._sum(edges[:position], bound_costs) +
+                   lower.get(nodes[position], float('inf')) > maximum
+                   for _, bound_costs, lower, maximum, _ in bounds):
+                root_cost += self._edge_cost(edge, costs)
+                continue
+            banned_edges = self._hidden.union(
+                other[position] for other in found
+                if other[:position] == edges[:position])
+            spur = self._shortest_path(nodes[position], nodes[-1], costs,
+                                       set(nodes[:position]), banned_edges,
+                                       heuristic)
+            if spur is not None:
+                yield (root_cost + spur[0], nodes[:position] + spur[1],
+                       edges[:position] + spur[2])
+            root_cost += self._edge_cost(edge, costs)
+
+    @staticmethod
+    def _edge_cost(edge, costs):
+        """Return the cost of a graph or attached edge."""
+        costs, extra_costs = costs
+        if edge in extra_costs:
+            return extra_costs[edge]
+        return costs[edge]
+
+    def _sum(self, edges, costs):
+        """Return the sum of the costs of some edges."""
+        return sum(self._edge_cost(edge, costs) for edge in edges)
+
+    def _distances(self, source, costs):
+        """Return the lowest cost from a node to each node it reaches."""
+        settled = {}
+        counter = count()
+        heap = [(0, next(counter), source)]
+        while heap:
+            cost, _, node = heappop(heap)
+            if node in settled:
+                continue
+            settled[node] = cost
+            for neighbor, edge, edge_cost in self._neighbors(node, costs):
+                if neighbor not in settled and edge not in self._hidden:
+                    heappush(heap, (cost + edge_cost, next(counter),
+                                    neighbor))
+        return settled
+
+    def _shortest_path(self, source, destination, costs, banned_nodes,
+                       banned_edges, heuristic=None):
+        """Return ``(cost, nodes, edges)`` of a shortest path, or None."""
+        if heuristic is None:
+            return self._dijkstra(source, destination, costs, banned_nodes,
+                                  banned_edges)
+        return self._astar(source, destination, costs, banned_nodes,
+                           banned_edges, heuristic)
+
+    def _astar(self, source, destination, costs, banned_nodes, banned_edges,
+               heuristic):
+        """Return ``(cost, nodes, edges)`` of a shortest path, or None.
+
+        The nodes are settled by their cost plus the lower bound of their
+        cost to the destination, which is consistent, so the search stops
+        once the destination is settled.
+        """
+        settled = set()
+        distances = {source: 0}
+        previous = {source: None}
+        counter = count()
+        heap = [(heuristic(source), next(counter), 0, source)]
+        while heap:
+            _, _, cost, node = heappop(heap)
+            if node in settled:
+                continue
+            if node == destination:
+                nodes, edges = self._join((previous, {node: None}), node)
+                return cost, nodes, edges
+            settled.add(node)
+            for neighbor, edge, edge_cost in self._neighbors(node, costs):
+                if (neighbor in settled or neighbor in banned_nodes or
+                        edge in banned_edges):
+                    continue
+                neighbor_cost = cost + edge_cost
+                if neighbor_cost < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = neighbor_cost
+                    previous[neighbor] = (node, edge)
+                    heappush(heap, (neighbor_cost + heuristic(neighbor),
+                                    next(counter), neighbor_cost, neighbor))
+        return None
+
+    def _dijkstra(self, source, destination, costs, banned_nodes,
+                  banned_edges):
+        """Return ``(cost, nodes, edges)`` of a shortest path, or None.
+
+        The search is bidirectional: it alternates between a search from the
+        source and one from the destination, stopping as soon as a node is
+        settled by both, as done by networkx.
+        """
+        settled = ({}, {})
+        distances = ({source: 0}, {destination: 0})
+        previous = ({source: None}, {destination: None})
+        counter = count()
+        heaps = ([(0, next(counter), source)],
+                 [(0, next(counter), destination)])
+        best_cost, meeting_node = None, None
+        direction = 1
+        while heaps[0] and heaps[1]:
+            direction = 1 - direction
+            cost, _, node = heappop(heaps[direction])
+            if node in settled[direction]:
+                continue
+            settled[direction][node] = cost
+            if node in settled[1 - direction]:
+                break
+            for neighbor, edge, edge_cost in self._neighbors(node, costs):
+                if (neighbor in settled[direction] or
+                        neighbor in banned_nodes or edge in banned_edges):
+                    continue
+                neighbor_cost = cost + edge_cost
+                known_cost = distances[direction].get(neighbor)
+                if known_cost is None or neighbor_cost < known_cost:
+                    distances[direction][neighbor] = neighbor_cost
+                    previous[direction][neighbor] = (node, edge)
+                    heappush(heaps[direction],
+                             (neighbor_cost, next(counter), neighbor))
+                    other_cost = distances[1 - direction].get(neighbor)
+                    if other_cost is not None and (
+                            best_cost is None or
+                            neighbor_cost + other_cost < best_cost):
+                        best_cost = neighbor_cost + other_cost
+                        meeting_node = neighbor
+
+        if meeting_node is None:
+            return None
+        return (best_cost,) + self._join(previous, meeting_node)
+
+    @staticmethod
+    def _join(previous, meeting_node):
+        """Return the nodes and edges of the path through a meeting node."""
+        nodes, edges = [meeting_node], []
+        while previous[0][nodes[0]] is not None:
+            node, edge = previous[0][nodes[0]]
+            nodes.insert(0, node)
+            edges.insert(0, edge)
+        while previous[1][nodes[-1]] is not None:
+            node, edge = previous[1][nodes[-1]]
+            nodes.append(node)
+            edges.append(edge)
+        return nodes, tuple(edges)
+
+
+def _equal(cost_a, cost_b):
+    """Tell whether two path costs are equal, up to rounding errors."""
+    return abs(cost_a - cost_b) <= 1e-9 * max(abs(cost_a), abs(cost_b), 1)
+
+
+class _Flow:
+    """Unit flows over the edges of a graph view, with their residual arcs.
+
+    Each edge carries at most one unit of flow in each direction, except the
+    ``hops`` joining the source or destination interface to its switch,
+    which are not links and may be shared by all the paths. When both ends
+    are on the same switch, only one of them is shared, so that the path
+    crossing only that switch is found once. When
+    ``shared`` is given, every other node is split in an inner and an outer
+    state joined by an arc carrying at most one unit, so that each of them
+    is crossed by a single path.
+    """
+
+    def __init__(self, view, costs, units, hops, shared=None):
+        self.view = view
+        self.costs = costs
+        self.units = units
+        self.hops = hops
+        self.shared = shared
+        self.flows = {}
+
+    def state(self, node, side):
+        """Return the inner (0) or outer (1) residual state of a node."""
+        if self.shared is None or node in self.shared:
+            return (node, None)
+        return (node, side)
+
+    def _capacity(self, edge):
+        """Return the flow an edge carries in each direction."""
+        if edge in self.hops:
+            return self.units
+        return 1
+
+    def arcs(self, state):
+        """Generate ``(state, arc, cost, direction)`` for residual arcs.
+
+        The direction is 1 for an arc adding flow to ``arc`` and -1 for an
+        arc cancelling its flow.
+        """
+        # pylint: disable=protected-access
+        node, side = state
+        neighbors = [(neighbor, edge, cost) for neighbor, edge, cost
+                     in self.view._neighbors(node, self.costs)
+                     if edge not in self.view._hidden and neighbor != node]
+        if side == 0 and self.flows.get(('node', node), 0) < 1:
+            yield (node, 1), ('node', node), 0, 1
+        if side == 1 and self.flows.get(('node', node), 0) > 0:
+            yield (node, 0), ('node', node), 0, -1
+        for neighbor, edge, cost in neighbors:
+            if side != 1 and self.flows.get((edge, neighbor, node), 0) > 0:
+                yield (self.state(neighbor, 1), (edge, neighbor, node),
+                       -cost, -1)
+            if (side != 0 and self.flows.get((edge, node, neighbor), 0) <
+                    self._capacity(edge)):
+                yield (self.state(neighbor, 0), (edge, node, neighbor),
+                       cost, 1)
+
+    def successors(self):
+        """Return the ``(edge, head)`` pairs carrying flow from each node.
+
+        Flows crossing an edge in opposite directions cancel each other.
+        """
+        successors = defaultdict(list)
+        for arc, flow in self.flows.items():
+            if arc[0] == 'node':
+                continue
+            edge, tail, head = arc
+            flow -= self.flows.get((edge, head, tail), 0)
+            successors[tail].extend([(edge, head)] * max(flow, 0))
+        return successors
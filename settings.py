@@ -1 +1,107 @@
 """Settings for the pathfinder NApp."""
+import os
+
+# Number of paths returned by a path request that does not set the
+# ``max_paths`` field. Paths are enumerated lazily, so this value also bounds
+# the work done by each request.
+DEFAULT_MAX_PATHS = 10
+
+# Largest ``max_paths`` value accepted from a request.
+MAX_PATHS_LIMIT = 100
+
+# Largest number of desired links accepted from a path request. The paths
+# using them are searched for each of their orders and orientations, which
+# number n! * 2^n for n links.
+MAX_DESIRED_LINKS = 4
+
+# Number of path queries whose results are kept in the path cache. Set it to
+# zero to disable the cache.
+PATH_CACHE_SIZE = 1024
+
+# Graph used to search paths: 'networkx' searches the networkx graph itself,
+# while 'csr' searches a compact copy of it, with integer node IDs and NumPy
+# arrays for the adjacency and metadata. The 'csr' backend requires numpy.
+# It is slower than 'networkx' (9.9 ms against 6.9 ms for 10 paths on a
+# 48-switch mesh in benchmarks.bench_backends), as each node it visits turns
+# a slice of its arrays back into Python lists. Nor does it save memory
+# overall, since the networkx graph is kept along with the copy.
+GRAPH_BACKEND = 'networkx'
+
+# Path search engines that GRAPH_BACKEND can name, as the dotted path of
+# their PathSearch subclass. The module of an engine, and the packages it
+# needs, are only imported when the engine is first selected, so the ones
+# not used are never loaded. Other engines can be registered here.
+GRAPH_ENGINES = {
+    'networkx': 'napps.kytos.pathfinder.graph.NetworkXGraph',
+    'csr': 'napps.kytos.pathfinder.csr.CSRGraph',
+}
+
+# Value of a link metadata key on the links missing it, by key. The keys not
+# listed default to zero. An infinite default keeps the links missing the key
+# out of the searches weighted by it, instead of making them look free.
+METADATA_DEFAULTS = {'delay': float('inf')}
+
+# Number of landmark switches of the ALT search. When positive, the distances
+# from each landmark are computed for the hop count and every metadata key
+# whenever the topology changes, and the path searches run A* with the lower
+# bounds they give. Zero keeps the bidirectional Dijkstra search.
+ALT_LANDMARKS = 0
+
+# Whether the shortest paths between every pair of nodes are computed in a
+# background thread after each topology change, for the hop count and the
+# NEXT_HOP_PARAMETERS metadata keys. Requests for the single best path
+# between two switches are then answered by walking these tables instead of
+# searching. Each table takes 16 bytes per pair of nodes and requires scipy.
+NEXT_HOP_TABLES = False
+NEXT_HOP_PARAMETERS = []
+
+# Shortest time, in milliseconds, of a v2/ request with the profile flag for
+# its cProfile summary to be returned.
+PROFILE_MIN_MS = 100
+
+# Quiet period, in milliseconds, after which a burst of topology update
+# events is applied to the graph as a single update with the newest
+# topology. Zero applies every event as it comes.
+TOPOLOGY_UPDATE_WINDOW_MS = 100
+
+# Longest time, in milliseconds, a topology update event can wait for its
+# burst to end before being applied.
+TOPOLOGY_UPDATE_MAX_DELAY_MS = 1000
+
+# Largest number of path requests accepted in one v2/batch request, and of
+# destinations in one v2/tree request.
+MAX_BATCH_SIZE = 1000
+
+# Largest number of source and destination pairs protected through
+# v2/protection. The primary and backup paths of every protected pair are
+# recomputed on topology updates.
+MAX_PROTECTED_PAIRS = 100
+
+# Largest number of paths registered through v2/subscription. They are
+# indexed by the links they use, so a topology update only checks the ones
+# crossing a removed or changed link.
+MAX_SUBSCRIBED_PATHS = 10000
+
+# Number of worker processes searching the paths of v2/ requests, away from
+# the request threads and the GIL of the controller. Each graph snapshot is
+# pickled once for them. Zero searches in the request threads. The workers
+# are spawned, which runs the script that started the controller again, so
+# only enable them when that script guards its entry point with
+# ``if __name__ == '__main__'``.
+PATH_POOL_SIZE = 0
+
+# Deadline of a v2/ request that does not set the ``timeout_ms`` field, in
+# milliseconds. The paths found by then are returned with the ``truncated``
+# flag set.
+DEFAULT_TIMEOUT_MS = 5000
+
+# File where the graph and its engine are saved on shutdown and every
+# CHECKPOINT_INTERVAL seconds, and loaded from on startup, so that paths are
+# served before the first topology update. It lives in the Kytos var
+# directory. Set it to None to disable checkpoints.
+CHECKPOINT_FILE = os.path.join(os.environ.get('VIRTUAL_ENV') or '/',
+                               'var/lib/kytos/pathfinder/graph.checkpoint')
+
+# Seconds between two checkpoints of a changed graph. Zero only saves the
+# graph on shutdown.
+CHECKPOINT_INTERVAL = 300
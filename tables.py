@@ -0,0 +1,91 @@
+"""Module Tables of kytos/pathfinder Kytos Network Application."""
+
+# A missing NumPy or SciPy fails the import, so KytosGraph builds no tables.
+import numpy as np
+from scipy.sparse.csgraph import csgraph_from_dense, shortest_path
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.search import PathSearch
+
+# pylint: enable=import-error
+
+
+class NextHopTable:
+    """Shortest paths between every pair of nodes of a graph, for a weight.
+
+    The graph is turned into a dense adjacency matrix holding the lowest
+    cost of the edges between each pair of nodes, and SciPy computes the
+    distance and predecessor matrices of every node at once. A shortest
+    path is then read by walking the predecessors from its destination,
+    with no search. The three matrices take ``16 * nodes ** 2`` bytes.
+    """
+
+    def __init__(self, graph, engine, weight=None):
+        # pylint: disable=protected-access
+        self.engine = engine
+        self.weight = weight
+        self.nodes = [engine._node(name) for name in engine.names]
+        self.index = {node: position
+                      for position, node in enumerate(self.nodes)}
+        size = len(self.nodes)
+
+        links = PathSearch.get_edges(graph)
+        ends = np.array([(self.index[engine._node(node_a)],
+                          self.index[engine._node(node_b)])
+                         for node_a, node_b, _, _ in links],
+                        dtype=np.int32).reshape(-1, 2)
+        edges = np.array([engine._index[frozenset(key)]
+                          for _, _, key, _ in links], dtype=np.int32)
+        costs = np.asarray(engine._edge_costs(weight),
+                           dtype=np.float64)[edges]
+        loops = ends[:, 0] == ends[:, 1]
+        ends, costs, edges = ends[~loops], costs[~loops], edges[~loops]
+        heads = np.concatenate((ends[:, 0], ends[:, 1]))
+        tails = np.concatenate((ends[:, 1], ends[:, 0]))
+        costs = np.concatenate((costs, costs))
+        edges = np.concatenate((edges, edges))
+
+        adjacency = np.full((size, size), np.inf)
+        np.minimum.at(adjacency, (heads, tails), costs)
+        lowest = costs == adjacency[heads, tails]
+        self.edges = np.full((size, size), -1, dtype=np.int32)
+        self.edges[heads[lowest], tails[lowest]] = edges[lowest]
+
+        self.distances, self.predecessors = shortest_path(
+            csgraph_from_dense(adjacency, null_value=np.inf), method='D',
+            directed=False, return_predecessors=True)
+        self.predecessors = self.predecessors.astype(np.int32)
+
+    @property
+    def nbytes(self):
+        """Return the memory used by the matrices of the table."""
+        return (self.distances.nbytes + self.predecessors.nbytes +
+                self.edges.nbytes)
+
+    def path(self, source, destination):
+        """Return the ``Path`` of a shortest path between two names.
+
+        None is returned when a name is not a node, since interfaces are
+        only attached to the graph by a search. An empty tuple is returned
+        when no path joins the nodes.
+        """
+        # pylint: disable=protected-access
+        source = self.index.get(self.engine._node(source))
+        destination = self.index.get(self.engine._node(destination))
+        if source is None or destination is None:
+            return None
+        cost = self.distances[source, destination]
+        if cost == np.inf:
+            return ()
+
+        positions = [destination]
+        predecessors = self.predecessors[source]
+        while positions[-1] != source:
+            positions.append(int(predecessors[positions[-1]]))
+        positions.reverse()
+        edges = [int(self.edges[position, next_position])
+                 for position, next_position
+                 in zip(positions, positions[1:])]
+        return self.engine._path(
+            [self.nodes[position] for position in positions], edges,
+            float(cost))
@@ -37,3 +37,13 @@ def get_topology_mock():
                          switch_b.dpid: switch_b,
                          switch_c.dpid: switch_c}
     return topology
+
+
+def get_pairs(paths):
+    """Return the ``(cost, hops)`` of each path."""
+    return [(path.cost, path.hops) for path in paths]
+
+
+def get_hops(paths):
+    """Return the hops of each path, or None for the missing ones."""
+    return [None if path is None else path.hops for path in paths]
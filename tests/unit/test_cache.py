@@ -0,0 +1,82 @@
+"""Test PathCache methods."""
+from unittest import TestCase
+
+from napps.kytos.pathfinder.cache import PathCache
+
+
+class TestPathCache(TestCase):
+    """Tests for the PathCache class."""
+
+    def setUp(self):
+        """Execute steps before each tests."""
+        self.cache = PathCache(2)
+        self.paths = [["A", "B", "C"], ["A", "D", "C"]]
+
+    def test_get_miss(self):
+        """Test get without entry."""
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_put_get(self):
+        """Test get returns a copy of the stored paths."""
+        self.cache.put("key", self.paths, 0, 2)
+        paths = self.cache.get("key", 2)
+
+        self.assertEqual(paths, self.paths)
+        paths[0].append("E")
+        self.assertEqual(self.cache.get("key", 1), self.paths[:1])
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_get_more_paths(self):
+        """Test get asking for more paths than stored."""
+        self.cache.put("key", self.paths, 0, 2)
+        self.assertIsNone(self.cache.get("key", 3))
+
+        self.cache.put("key", self.paths, 0, 3)
+        self.assertEqual(self.cache.get("key", 10), self.paths)
+
+    def test_put_stale_version(self):
+        """Test put ignores results computed on an old graph version."""
+        self.cache.invalidate(1)
+        self.cache.put("key", self.paths, 0, 2)
+
+        self.assertEqual(len(self.cache), 0)
+
+    def test_put_disabled(self):
+        """Test put does nothing with a zero sized cache."""
+        cache = PathCache(0)
+        cache.put("key", self.paths, 0, 2)
+
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted."""
+        self.cache.put("key1", self.paths, 0, 2)
+        self.cache.put("key2", self.paths, 0, 2)
+        self.cache.get("key1", 2)
+        self.cache.put("key3", self.paths, 0, 2)
+
+        self.assertIsNotNone(self.cache.get("key1", 2))
+        self.assertIsNone(self.cache.get("key2", 2))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidate_edges(self):
+        """Test invalidate evicts only the entries using the edges."""
+        self.cache.put("key1", [["A", "B", "C"]], 0, 2)
+        self.cache.put("key2", [["A", "D", "C"]], 0, 2)
+        self.cache.invalidate(1, [("C", "B")])
+
+        self.assertIsNone(self.cache.get("key1", 2))
+        self.assertIsNotNone(self.cache.get("key2", 2))
+        stats = self.cache.stats()
+        self.assertEqual(stats["invalidations"], 1)
+        self.assertEqual(stats["version"], 1)
+
+    def test_invalidate_all(self):
+        """Test invalidate without edges evicts every entry."""
+        self.cache.put("key1", [["A", "B", "C"]], 0, 2)
+        self.cache.put("key2", [["A", "D", "C"]], 0, 2)
+        self.cache.invalidate(1)
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.stats()["invalidations"], 2)
@@ -0,0 +1,105 @@
+"""Test CSRGraph methods."""
+from unittest import TestCase
+
+import networkx as nx
+
+from napps.kytos.pathfinder.csr import CSRGraph
+from tests.helpers import get_pairs
+
+
+class TestCSRGraph(TestCase):
+    """Tests for the CSRGraph class."""
+
+    def setUp(self):
+        """Create a CSR graph from a small weighted graph.
+
+        A --1-- B --1-- C
+        |               |
+        +-------5-------+
+        """
+        self.graph = nx.Graph()
+        self.graph.add_edge("A", "B", delay=1, name="ab")
+        self.graph.add_edge("B", "C", delay=1, name="bc")
+        self.graph.add_edge("A", "C", delay=5, name="ac")
+        self.graph.add_node("D")
+        self.csr = CSRGraph(self.graph)
+
+    def test_arrays(self):
+        """Test the CSR arrays."""
+        self.assertEqual(self.csr.nodes, ["A", "B", "C", "D"])
+        self.assertEqual(self.csr.indptr.tolist(), [0, 2, 4, 6, 6])
+        neighbors = [self.csr.nodes[index] for index
+                     in self.csr.indices[0:2]]
+        self.assertEqual(sorted(neighbors), ["B", "C"])
+        self.assertEqual(self.csr.columns, {})
+        list(self.csr.simple_paths("A", "C", "delay"))
+        self.assertEqual(self.csr.columns["delay"].tolist(), [1, 5, 1])
+        self.assertGreater(self.csr.nbytes, 0)
+
+    def test_has_edge(self):
+        """Test has edge."""
+        self.assertTrue(self.csr.has_edge("A", "B"))
+        self.assertTrue(self.csr.has_edge("B", "A"))
+        self.assertFalse(self.csr.has_edge("A", "D"))
+        self.assertFalse(self.csr.has_edge("A", "E"))
+
+    def test_simple_paths(self):
+        """Test simple paths with and without weight."""
+        paths = get_pairs(self.csr.simple_paths("A", "C"))
+        self.assertEqual(paths, [(1, ["A", "C"]), (2, ["A", "B", "C"])])
+
+        paths = get_pairs(self.csr.simple_paths("A", "C", "delay"))
+        self.assertEqual(paths, [(2, ["A", "B", "C"]), (5, ["A", "C"])])
+
+    def test_cost_types(self):
+        """Test the costs are integers when the metadata values are."""
+        for weight in (None, "delay"):
+            path = next(self.csr.simple_paths("A", "C", weight))
+            self.assertIsInstance(path.cost, int)
+
+        self.graph["A"]["C"]["delay"] = 0.5
+        path = next(CSRGraph(self.graph).simple_paths("A", "C", "delay"))
+        self.assertEqual(path.cost, 0.5)
+
+    def test_simple_paths_same_as_networkx(self):
+        """Test simple paths matches networkx on a larger graph."""
+        graph = nx.gnm_random_graph(12, 24, seed=1)
+        for node_a, node_b in graph.edges:
+            graph[node_a][node_b]["delay"] = (node_a * node_b) % 7 + 1
+        csr = CSRGraph(graph)
+
+        paths = get_pairs(csr.simple_paths(0, 11, "delay"))
+        expected = list(nx.shortest_simple_paths(graph, 0, 11, "delay"))
+        self.assertEqual(sorted(map(tuple, (path for _, path in paths))),
+                         sorted(map(tuple, expected)))
+        costs = [cost for cost, _ in paths]
+        self.assertEqual(costs, sorted(costs))
+
+    def test_simple_paths_unreachable(self):
+        """Test simple paths with unknown and unreachable nodes."""
+        self.assertEqual(list(self.csr.simple_paths("A", "D")), [])
+        self.assertEqual(list(self.csr.simple_paths("A", "E")), [])
+        self.assertEqual(get_pairs(self.csr.simple_paths("A", "A")),
+                         [(0, ["A"])])
+
+    def test_restrict(self):
+        """Test restrict hides edges without changing the graph."""
+        view = self.csr.restrict([("C", "B")])
+
+        self.assertFalse(view.has_edge("B", "C"))
+        self.assertTrue(self.csr.has_edge("B", "C"))
+        self.assertEqual(get_pairs(view.simple_paths("A", "C", "delay")),
+                         [(5, ["A", "C"])])
+
+    def test_shortest_paths_from(self):
+        """Test shortest paths from a source to many destinations."""
+        tree = self.csr.shortest_paths_from("A", ["C", "D", "E", "A"],
+                                            "delay")
+        self.assertEqual({name: (path.cost, path.hops)
+                          for name, path in tree.items()},
+                         {"C": (2, ["A", "B", "C"]), "A": (0, ["A"])})
+        self.assertEqual(self.csr.shortest_paths_from("E", ["A"]), {})
+
+        view = self.csr.restrict([("B", "C")])
+        path = view.shortest_paths_from("A", ["C"], "delay")["C"]
+        self.assertEqual((path.cost, path.hops), (5, ["A", "C"]))
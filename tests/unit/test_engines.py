@@ -0,0 +1,38 @@
+"""Test the path search engine registry."""
+import sys
+from unittest import TestCase
+from unittest.mock import patch
+
+from napps.kytos.pathfinder import settings
+from napps.kytos.pathfinder.csr import CSRGraph
+from napps.kytos.pathfinder.engines import get_engine_class
+from napps.kytos.pathfinder.graph import NetworkXGraph
+
+
+class TestEngines(TestCase):
+    """Tests for the get_engine_class function."""
+
+    def test_get_engine_class(self):
+        """Test engines are looked up in the registry by name."""
+        self.assertIs(get_engine_class("networkx"), NetworkXGraph)
+        self.assertIs(get_engine_class("csr"), CSRGraph)
+
+        engines = dict(settings.GRAPH_ENGINES,
+                       compact="napps.kytos.pathfinder.csr.CSRGraph")
+        with patch.object(settings, "GRAPH_ENGINES", engines):
+            self.assertIs(get_engine_class("compact"), CSRGraph)
+
+    @patch('napps.kytos.pathfinder.engines.log')
+    def test_get_engine_class_unknown(self, mock_log):
+        """Test an unknown engine falls back to networkx."""
+        self.assertIs(get_engine_class("unknown"), NetworkXGraph)
+        mock_log.error.assert_called_once()
+
+    @patch('napps.kytos.pathfinder.engines.log')
+    def test_get_engine_class_import_error(self, mock_log):
+        """Test the csr engine falls back to networkx without NumPy."""
+        with patch.dict(sys.modules, {"numpy": None}):
+            del sys.modules["napps.kytos.pathfinder.csr"]
+            self.assertIs(get_engine_class("csr"), NetworkXGraph)
+        mock_log.error.assert_called_once()
+        self.assertIs(get_engine_class("csr"), CSRGraph)
@@ -1,12 +1,22 @@
 """Test Graph methods."""
+import os
+import sys
+import tempfile
+from itertools import permutations
 from unittest import TestCase
-from unittest.mock import call, patch
+from unittest.mock import MagicMock, patch
 
-from napps.kytos.pathfinder.graph import KytosGraph
-from tests.helpers import get_topology_mock
+import networkx as nx
+
+from napps.kytos.pathfinder.benchmarks.topologies import get_ring_topology
+from napps.kytos.pathfinder.csr import CSRGraph
+from napps.kytos.pathfinder.graph import KytosGraph, NetworkXGraph
+from napps.kytos.pathfinder.paths import HopNames, Path
+from tests.helpers import get_hops, get_pairs, get_topology_mock
 
 
 # pylint: disable=arguments-differ, protected-access
+# pylint: disable=too-many-public-methods
 class TestGraph(TestCase):
     """Tests for the Main class."""
 
@@ -18,48 +28,232 @@ class TestGraph(TestCase):
 
     def test_clear(self):
         """Test clear."""
+        version = self.kytos_graph.version
         self.kytos_graph.clear()
 
-        self.mock_graph.clear.assert_called()
+        self.assertEqual(self.kytos_graph.version, version + 1)
+        self.assertIsNot(self.kytos_graph.graph, self.mock_graph)
+
+    @staticmethod
+    def _build_graph(topology):
+        """Return the switch-level graph of a topology, built from scratch."""
+        graph = nx.MultiGraph()
+        interfaces = {}
+        for switch in topology.switches.values():
+            graph.add_node(switch.id)
+            for interface in switch.interfaces.values():
+                interfaces[interface.id] = switch.id
+        links = [link for link in topology.links.values()
+                 if link.is_active()]
+        for link in links:
+            key = (link.endpoint_a.id, link.endpoint_b.id)
+            graph.add_edge(interfaces.get(key[0], key[0]),
+                           interfaces.get(key[1], key[1]), key,
+                           **link.metadata)
+        graph.graph['interfaces'] = interfaces
+        return graph
+
+    @staticmethod
+    def _build_interface_graph(topology):
+        """Return a graph with a node for each switch and interface."""
+        graph = nx.Graph()
+        for switch in topology.switches.values():
+            for interface in switch.interfaces.values():
+                graph.add_edge(switch.id, interface.id)
+        for link in topology.links.values():
+            if link.is_active():
+                graph.add_edge(link.endpoint_a.id, link.endpoint_b.id)
+        return graph
+
+    def assert_same_graph(self, graph, expected):
+        """Assert that two graphs have the same nodes, edges and metadata."""
+        self.assertEqual(set(graph.nodes), set(expected.nodes))
+        self.assertEqual(
+            {key: ({node_a, node_b}, metadata) for node_a, node_b, key,
+             metadata in graph.edges(keys=True, data=True)},
+            {key: ({node_a, node_b}, metadata) for node_a, node_b, key,
+             metadata in expected.edges(keys=True, data=True)})
+        self.assertEqual(graph.graph['interfaces'],
+                         expected.graph['interfaces'])
 
-    @patch('napps.kytos.pathfinder.graph.KytosGraph.update_links')
-    @patch('napps.kytos.pathfinder.graph.KytosGraph.update_nodes')
-    def test_update_topology(self, *args):
+    def test_update_topology(self):
         """Test update topology."""
-        (mock_update_nodes, mock_update_links) = args
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+
+        self.assertEqual(kytos_graph.graph.number_of_nodes(), 3)
+        self.assertEqual(kytos_graph.graph.number_of_edges(), 3)
+        self.assert_same_graph(kytos_graph.graph, self._build_graph(topology))
+
+    def test_update_topology_changes(self):
+        """Test update topology applies removed, changed and new elements."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        link_2, link_3 = topology.links["2"], topology.links["3"]
+        endpoints_3 = (link_3.endpoint_a.id, link_3.endpoint_b.id)
+
+        topology.links["1"].is_active.return_value = False
+        link_2.metadata = {"A": 5, "delay": 10}
+        switch_c = topology.switches.pop("00:00:00:00:00:00:00:03")
+        topology.links = {"1": topology.links["1"], "2": link_2}
+        kytos_graph.update_topology(topology)
+
+        self.assert_same_graph(kytos_graph.graph, self._build_graph(topology))
+        self.assertIn(link_2.endpoint_b.id, kytos_graph.graph)
+        self.assertNotIn(switch_c.id, kytos_graph.graph)
+        self.assertFalse(kytos_graph.get_engine().has_edge(*endpoints_3))
+        endpoints_2 = (link_2.endpoint_a.id, link_2.endpoint_b.id)
+        edges = {key: metadata for _, _, key, metadata
+                 in kytos_graph.graph.edges(keys=True, data=True)}
+        self.assertEqual(edges[endpoints_2], {"A": 5, "delay": 10})
+
+    def test_update_topology_port_flap(self):
+        """Test a port flap patches the graph and reuses the engine."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        graph, engine = kytos_graph.graph, kytos_graph.get_engine()
+        link = topology.links["1"]
+        endpoints = (link.endpoint_a.id, link.endpoint_b.id)
+
+        with patch.object(KytosGraph, "_get_engine") as get_engine:
+            link.is_active.return_value = False
+            kytos_graph.update_topology(topology)
+            self.assert_same_graph(kytos_graph.graph,
+                                   self._build_graph(topology))
+            self.assertFalse(kytos_graph.get_engine().has_edge(*endpoints))
+            self.assertEqual(len(list(graph.edges)), 3)
+
+            link.is_active.return_value = True
+            kytos_graph.update_topology(topology)
+            self.assert_same_graph(kytos_graph.graph, graph)
+            self.assertTrue(kytos_graph.get_engine().has_edge(*endpoints))
+            get_engine.assert_not_called()
+        self.assertEqual(get_pairs(kytos_graph.shortest_paths(*endpoints)),
+                         get_pairs(KytosGraph.search(engine, *endpoints)[0]))
+
+    def test_subscriptions(self):
+        """Test update topology returns the subscribed paths it affects."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        link_1, link_2 = topology.links["1"], topology.links["2"]
+        hops_1 = [link_1.endpoint_a.id, link_1.endpoint_b.id]
+        hops_2 = [link_2.endpoint_a.id, link_2.endpoint_b.id]
+        kytos_graph.subscribe("path_1", hops_1)
+        kytos_graph.subscribe("path_2", hops_2)
+        self.assertEqual(kytos_graph.validate_paths([hops_1, hops_1[:1], []]),
+                         [True, True, False])
+
+        link_1.is_active.return_value = False
+        self.assertEqual(kytos_graph.update_topology(topology),
+                         [{"id": "path_1", "hops": hops_1, "valid": False}])
+        self.assertEqual(kytos_graph.validate_paths([hops_1, hops_2]),
+                         [False, True])
+
+        link_2.metadata = {"delay": 10}
+        self.assertEqual(kytos_graph.update_topology(topology),
+                         [{"id": "path_2", "hops": hops_2, "valid": True}])
+        self.assertEqual(kytos_graph.update_topology(topology), [])
+
+        self.assertTrue(kytos_graph.unsubscribe("path_2"))
+        self.assertFalse(kytos_graph.unsubscribe("path_2"))
+        self.assertEqual(kytos_graph.subscriptions(),
+                         [{"id": "path_1", "hops": hops_1}])
+        link_2.metadata = {"delay": 20}
+        self.assertEqual(kytos_graph.update_topology(topology), [])
+
+    def test_update_topology_unchanged(self):
+        """Test update topology does not publish an unchanged graph."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        graph, version = kytos_graph.graph, kytos_graph.version
+
+        kytos_graph.update_topology(topology)
+
+        self.assertIs(kytos_graph.graph, graph)
+        self.assertEqual(kytos_graph.version, version)
+
+    def test_update_topology_unlocked(self):
+        """Test update topology makes the engine without holding the lock.
+
+        A graph published meanwhile makes the update refresh every path.
+        """
+        kytos_graph = KytosGraph()
         topology = get_topology_mock()
-        self.kytos_graph.update_topology(topology)
+        kytos_graph.update_topology(topology)
+        relink = kytos_graph.get_engine().relink
 
-        self.mock_graph.clear.assert_called()
-        mock_update_nodes.assert_called_with(topology.switches)
-        mock_update_links.assert_called_with(topology.links)
+        def build(removed, restored):
+            self.assertFalse(kytos_graph._lock.locked())
+            kytos_graph._snapshot = kytos_graph._snapshot._replace(
+                version=kytos_graph.version + 1)
+            return relink(removed, restored)
 
-    def test_update_nodes(self):
-        """Test update nodes."""
+        topology.links["1"].is_active.return_value = False
+        with patch.object(NetworkXGraph, 'relink', side_effect=build), \
+                patch.object(kytos_graph.cache, 'invalidate') as invalidate:
+            kytos_graph.update_topology(topology)
+        invalidate.assert_called_once_with(kytos_graph.version, None)
+
+    def test_update_topology_snapshot(self):
+        """Test update topology publishes a new graph, keeping the old one."""
+        kytos_graph = KytosGraph()
         topology = get_topology_mock()
-        self.kytos_graph.update_nodes(topology.switches)
+        kytos_graph.update_topology(topology)
+        graph, engine = kytos_graph.graph, kytos_graph.get_engine()
+        link = topology.links["1"]
+        endpoints = (link.endpoint_a.id, link.endpoint_b.id)
+
+        link.is_active.return_value = False
+        kytos_graph.update_topology(topology)
+
+        self.assertIsNot(kytos_graph.graph, graph)
+        self.assertFalse(kytos_graph.get_engine().has_edge(*endpoints))
+        self.assertTrue(engine.has_edge(*endpoints))
+        self.assertTrue(nx.is_frozen(graph))
+        self.assertEqual(get_pairs(engine.simple_paths(*endpoints))[0],
+                         (1, list(endpoints)))
+        with self.assertRaises(nx.NetworkXError):
+            kytos_graph.graph.add_node("A")
+
+    def test_get_elements(self):
+        """Test get elements."""
+        topology = get_topology_mock()
+        nodes, interfaces, links = KytosGraph._get_elements(topology)
         switch = topology.switches["00:00:00:00:00:00:00:01"]
+        link = topology.links["1"]
 
-        calls = [call(switch.id)]
-        calls += [call(interface.id)
-                  for interface in switch.interfaces.values()]
-        self.mock_graph.add_node.assert_has_calls(calls)
+        self.assertEqual(nodes, {switch.id for switch
+                                 in topology.switches.values()})
+        for interface in switch.interfaces.values():
+            self.assertEqual(interfaces[interface.id], switch.id)
+        self.assertEqual(links[(link.endpoint_a.id, link.endpoint_b.id)],
+                         link.metadata)
 
-        calls = [call(switch.id, interface.id)
-                 for interface in switch.interfaces.values()]
-        self.mock_graph.add_edge.assert_has_calls(calls)
+        del topology.switches["00:00:00:00:00:00:00:02"]
+        nodes, interfaces, links = KytosGraph._get_elements(topology)
+        self.assertIn(link.endpoint_b.id, nodes)
+        self.assertNotIn(link.endpoint_b.id, interfaces)
 
-    @patch('napps.kytos.pathfinder.graph.KytosGraph._set_default_metadata')
-    def test_update_links(self, mock_set_default_metadata):
-        """Test update nodes."""
+    def test_shortest_paths_interface_hops(self):
+        """Test shortest paths has the hops of a graph of interfaces."""
+        kytos_graph = KytosGraph()
         topology = get_topology_mock()
-        self.kytos_graph.update_links(topology.links)
+        kytos_graph.update_topology(topology)
+        graph = self._build_interface_graph(topology)
 
-        keys = []
-        all_metadata = [link.metadata for link in topology.links.values()]
-        for metadata in all_metadata:
-            keys.extend(key for key in metadata.keys())
-        mock_set_default_metadata.assert_called_with(keys)
+        for source, destination in permutations(graph, 2):
+            paths = kytos_graph.shortest_paths(source, destination)
+            expected = list(nx.shortest_simple_paths(graph, source,
+                                                     destination))
+            self.assertCountEqual(map(tuple, get_hops(paths)),
+                                  map(tuple, expected))
+            self.assertEqual([len(path) for path in paths],
+                             [len(path) for path in expected])
 
     def test_remove_switch_hops(self):
         """Test remove switch hops."""
@@ -73,12 +267,497 @@ class TestGraph(TestCase):
                                      "00:00:00:00:00:00:00:01:2"]}
         self.assertEqual(circuit, expected_circuit)
 
-    @patch('networkx.shortest_simple_paths', return_value=["any"])
-    def test_shortest_paths(self, mock_shortest_simple_paths):
+    @patch('napps.kytos.pathfinder.graph.NetworkXGraph.simple_paths')
+    def test_shortest_paths(self, mock_simple_paths):
         """Test shortest paths."""
+        path = Path([0], 1, HopNames(["any"]))
+        mock_simple_paths.return_value = [path]
         source, dest = "00:00:00:00:00:00:00:01:1", "00:00:00:00:00:00:00:02:2"
         shortest_paths = self.kytos_graph.shortest_paths(source, dest)
 
-        mock_shortest_simple_paths.assert_called_with(self.kytos_graph.graph,
-                                                      source, dest, None)
-        self.assertEqual(shortest_paths, ["any"])
+        mock_simple_paths.assert_called_with(source, dest, None, {})
+        self.assertEqual(shortest_paths, [path])
+
+    @patch('napps.kytos.pathfinder.graph.NetworkXGraph.simple_paths')
+    def test_shortest_paths_max_paths(self, mock_simple_paths):
+        """Test shortest paths stops the enumeration after max_paths."""
+        table = HopNames(["a", "b", "c"])
+        paths = [Path([hop_id], hop_id, table) for hop_id in range(3)]
+        mock_simple_paths.return_value = iter(paths)
+        source, dest = "00:00:00:00:00:00:00:01:1", "00:00:00:00:00:00:00:02:2"
+        shortest_paths = self.kytos_graph.shortest_paths(source, dest,
+                                                         max_paths=2)
+
+        self.assertEqual(shortest_paths, paths[:2])
+        self.assertEqual(list(mock_simple_paths.return_value), paths[2:])
+
+    @patch('napps.kytos.pathfinder.graph.NetworkXGraph.simple_paths',
+           return_value=[Path([0, 1], 1, HopNames(["A", "B"]))])
+    def test_shortest_paths_cached(self, mock_simple_paths):
+        """Test shortest paths answers repeated queries from the cache."""
+        self.kytos_graph.shortest_paths("A", "B", max_paths=2)
+        shortest_paths = self.kytos_graph.shortest_paths("A", "B",
+                                                         max_paths=2)
+
+        self.assertEqual(get_hops(shortest_paths), [["A", "B"]])
+        self.assertEqual(mock_simple_paths.call_count, 1)
+        self.assertEqual(self.kytos_graph.cache.stats()["hits"], 1)
+
+    def test_update_topology_invalidates_cache(self):
+        """Test update topology evicts only the paths using removed links."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        link_1, link_2 = topology.links["1"], topology.links["2"]
+        source, destination = link_1.endpoint_a.id, link_1.endpoint_b.id
+        kytos_graph.shortest_paths(source, destination, max_paths=1)
+        kytos_graph.shortest_paths(link_2.endpoint_a.id,
+                                   link_2.endpoint_b.id, max_paths=1)
+        version = kytos_graph.version
+
+        link_1.is_active.return_value = False
+        kytos_graph.update_topology(topology)
+
+        self.assertEqual(kytos_graph.version, version + 1)
+        self.assertEqual(len(kytos_graph.cache), 1)
+        self.assertNotEqual(get_hops(kytos_graph.shortest_paths(
+            source, destination, max_paths=1)), [[source, destination]])
+
+        link_1.is_active.return_value = True
+        kytos_graph.update_topology(topology)
+        self.assertEqual(len(kytos_graph.cache), 0)
+
+    def test_shortest_paths_constraints(self):
+        """Test shortest paths with desired and undesired links."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        link_1, link_2, link_3 = topology.links.values()
+        link_1 = (link_1.endpoint_a.id, link_1.endpoint_b.id)
+        link_2 = (link_2.endpoint_a.id, link_2.endpoint_b.id)
+        link_3 = (link_3.endpoint_a.id, link_3.endpoint_b.id)
+        source, destination = link_1
+
+        paths = kytos_graph.shortest_paths(source, destination)
+        self.assertEqual(len(paths), 2)
+
+        paths = kytos_graph.shortest_paths(source, destination,
+                                           desired=[link_2, link_3])
+        self.assertEqual(len(paths), 1)
+        self.assertIn(link_2[1], paths[0].hops)
+        self.assertIn(link_3[0], paths[0].hops)
+        self.assertEqual(paths[0].cost,
+                         kytos_graph.get_engine().path_cost(paths[0]))
+
+        paths = kytos_graph.shortest_paths(source, destination,
+                                           undesired=[link_3])
+        self.assertEqual(get_hops(paths), [[source, destination]])
+
+        paths = kytos_graph.shortest_paths(source, destination,
+                                           desired=[link_2],
+                                           undesired=[link_3])
+        self.assertEqual(paths, [])
+
+    def test_shortest_paths_metric_constraints(self):
+        """Test shortest paths with constraints on the link metadata."""
+        kytos_graph = KytosGraph()
+        graph = nx.Graph()
+        graph.add_edge("A", "B", delay=1, bandwidth=10)
+        graph.add_edge("B", "C", delay=1, bandwidth=100)
+        graph.add_edge("A", "C", delay=5, bandwidth=100)
+        graph.add_edge("C", "D", delay=1, bandwidth=100)
+        kytos_graph.graph = graph
+
+        paths = kytos_graph.shortest_paths(
+            "A", "D", "delay", constraints=[("bandwidth", "min", 100)])
+        self.assertEqual(get_hops(paths), [["A", "C", "D"]])
+
+        paths = kytos_graph.shortest_paths(
+            "A", "D", constraints=[("delay", "max_total", 3)])
+        self.assertEqual(get_hops(paths), [["A", "B", "C", "D"]])
+
+        paths = kytos_graph.shortest_paths(
+            "A", "D", desired=[("A", "C")],
+            constraints=[("delay", "max_total", 3)])
+        self.assertEqual(paths, [])
+
+        for options in ({}, {"desired": [("A", "C")]}, {"disjoint": "link"}):
+            paths = kytos_graph.shortest_paths(
+                "A", "D", constraints=[("unknown", "max_total", 3)],
+                **options)
+            self.assertEqual(paths, [])
+
+    def test_shortest_paths_desired_order(self):
+        """Test shortest paths with desired links returns paths by cost."""
+        kytos_graph = KytosGraph()
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(
+            [("A", "B", 1), ("B", "C", 1), ("A", "C", 5), ("C", "D", 1),
+             ("B", "D", 4)], weight="delay")
+        kytos_graph.graph = graph
+
+        paths = kytos_graph.shortest_paths("A", "D", "delay",
+                                           desired=[("C", "B")])
+        self.assertEqual(get_hops(paths),
+                         [["A", "B", "C", "D"], ["A", "C", "B", "D"]])
+        self.assertEqual([path.cost for path in paths], [3, 10])
+
+    def test_get_engine(self):
+        """Test get engine returns the backend selected in the settings."""
+        kytos_graph = KytosGraph()
+        kytos_graph.update_topology(get_topology_mock())
+        self.assertIsInstance(kytos_graph.get_engine(), NetworkXGraph)
+
+        with patch('napps.kytos.pathfinder.settings.GRAPH_BACKEND', 'csr'):
+            kytos_graph.clear()
+            self.assertIsInstance(kytos_graph.get_engine(), CSRGraph)
+
+    def test_shortest_paths_csr(self):
+        """Test shortest paths returns the same hops with both backends."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        link_1, link_2, _ = topology.links.values()
+        source, destination = link_1.endpoint_a.id, link_1.endpoint_b.id
+        desired = [(link_2.endpoint_a.id, link_2.endpoint_b.id)]
+        expected = get_hops(kytos_graph.shortest_paths(source, destination))
+        expected_desired = get_hops(kytos_graph.shortest_paths(
+            source, destination, desired=desired))
+
+        with patch('napps.kytos.pathfinder.settings.GRAPH_BACKEND', 'csr'):
+            kytos_graph = KytosGraph()
+            kytos_graph.update_topology(topology)
+            self.assertEqual(get_hops(kytos_graph.shortest_paths(
+                source, destination)), expected)
+            self.assertEqual(get_hops(kytos_graph.shortest_paths(
+                source, destination, desired=desired)), expected_desired)
+
+    def test_batch_shortest_paths(self):
+        """Test batch shortest paths answers queries in order."""
+        kytos_graph = KytosGraph()
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(
+            [("A", "B", 1), ("B", "C", 1), ("A", "C", 5), ("C", "D", 1)],
+            weight="delay")
+        kytos_graph.graph = graph
+        queries = [{"source": "A", "destination": "D", "max_paths": 1,
+                    "parameter": "delay"},
+                   {"source": "A", "destination": "C", "max_paths": 2,
+                    "parameter": "delay"},
+                   {"source": "A", "destination": "C", "max_paths": 1,
+                    "parameter": "delay", "undesired": [("B", "C")]},
+                   {"source": "A", "destination": "E", "max_paths": 1},
+                   {"source": "A", "destination": "C", "max_paths": 1,
+                    "parameter": "delay"}]
+
+        with patch.object(kytos_graph, 'find_paths',
+                          wraps=kytos_graph.find_paths) as mock:
+            results = kytos_graph.batch_shortest_paths(queries)
+            self.assertEqual(mock.call_count, 1)
+
+        self.assertEqual([get_hops(paths) for paths in results],
+                         [[["A", "B", "C", "D"]],
+                          [["A", "B", "C"], ["A", "C"]],
+                          [["A", "C"]],
+                          [],
+                          [["A", "B", "C"]]])
+        self.assertEqual(kytos_graph.batch_shortest_paths(queries[:1]),
+                         results[:1])
+        self.assertEqual(kytos_graph.cache.stats()["hits"], 2)
+
+        queries[1]["destination"] = "D"
+        results = kytos_graph.batch_find_paths(queries, deadline=0)
+        self.assertEqual([(get_hops(paths), truncated)
+                          for paths, truncated in results[:2]],
+                         [([["A", "B", "C", "D"]], False),
+                          ([["A", "B", "C", "D"]], True)])
+
+    def test_shortest_paths_disjoint(self):
+        """Test shortest paths with disjoint paths."""
+        kytos_graph = KytosGraph()
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(
+            [("A", "B", 1), ("B", "D", 3), ("A", "C", 3), ("C", "D", 1),
+             ("B", "C", 1)], weight="delay")
+        kytos_graph.graph = graph
+
+        paths = kytos_graph.shortest_paths("A", "D", "delay", max_paths=2,
+                                           disjoint="link")
+        self.assertCountEqual(get_hops(paths),
+                              [["A", "B", "D"], ["A", "C", "D"]])
+        paths = kytos_graph.shortest_paths("A", "D", "delay", max_paths=1,
+                                           disjoint="link")
+        self.assertEqual(get_hops(paths), [["A", "B", "C", "D"]])
+        paths = kytos_graph.shortest_paths(
+            "A", "D", "delay", max_paths=2, disjoint="node",
+            constraints=[("delay", "max_total", 3)])
+        self.assertEqual(paths, [])
+
+    def test_protect(self):
+        """Test protected pairs are refreshed by topology updates."""
+        kytos_graph = KytosGraph()
+        topology = get_topology_mock()
+        kytos_graph.update_topology(topology)
+        link_1, link_2 = topology.links["1"], topology.links["2"]
+        source, destination = link_1.endpoint_a.id, link_1.endpoint_b.id
+        other = (link_2.endpoint_a.id, link_2.endpoint_b.id)
+
+        protection = kytos_graph.protect(source, destination)
+        self.assertEqual(protection["primary"], [source, destination])
+        self.assertEqual(len(protection["backup"]), 9)
+        self.assertEqual(kytos_graph.protect(*other)["primary"], list(other))
+        self.assertEqual(kytos_graph.get_protection(source, destination),
+                         protection)
+
+        link_1.is_active.return_value = False
+        kytos_graph.update_topology(topology)
+        self.assertEqual(kytos_graph.get_protection(source, destination),
+                         {"primary": protection["backup"], "backup": None})
+        self.assertEqual(kytos_graph.get_protection(*other),
+                         {"primary": list(other), "backup": None})
+
+        self.assertTrue(kytos_graph.unprotect(source, destination))
+        self.assertFalse(kytos_graph.unprotect(source, destination))
+        self.assertIsNone(kytos_graph.get_protection(source, destination))
+        self.assertEqual(len(kytos_graph.protections()), 1)
+
+    def test_find_paths_deadline(self):
+        """Test find paths returns the paths found by the deadline."""
+        kytos_graph = KytosGraph()
+        kytos_graph.graph = nx.complete_graph(6)
+
+        paths, truncated = kytos_graph.find_paths(0, 1, max_paths=3,
+                                                  deadline=0)
+        self.assertEqual((get_hops(paths), truncated), ([[0, 1]], True))
+        self.assertEqual(len(kytos_graph.cache), 0)
+
+        paths, truncated = kytos_graph.find_paths(0, 1, max_paths=1,
+                                                  deadline=0)
+        self.assertEqual((get_hops(paths), truncated), ([[0, 1]], False))
+        paths, truncated = kytos_graph.find_paths(0, 1, max_paths=3)
+        self.assertEqual((len(paths), truncated), (3, False))
+
+        paths, truncated = kytos_graph.find_paths(
+            0, 1, max_paths=3, desired=[(2, 3), (4, 5)], deadline=0)
+        self.assertEqual((paths, truncated), ([], True))
+        paths, truncated = kytos_graph.find_paths(
+            0, 1, max_paths=3, desired=[(2, 3), (4, 5)])
+        self.assertEqual((len(paths), truncated), (3, False))
+
+    def test_find_paths_pool(self):
+        """Test find paths searches in the pool and caches full results."""
+        pool = MagicMock()
+        pool.search.return_value = ([["A", "B"]], False)
+        kytos_graph = KytosGraph(pool)
+        kytos_graph.graph = nx.path_graph(["A", "B"])
+
+        self.assertEqual(kytos_graph.find_paths("A", "B", max_paths=2,
+                                                deadline=5),
+                         ([["A", "B"]], False))
+        snapshot, query, deadline, metrics = pool.search.call_args[0]
+        self.assertEqual(snapshot.version, kytos_graph.version)
+        self.assertEqual(query[:2], ("A", "B"))
+        self.assertEqual(deadline, 5)
+        self.assertIs(metrics, kytos_graph.metrics)
+        self.assertEqual(kytos_graph.shortest_paths("A", "B", max_paths=2),
+                         [["A", "B"]])
+        self.assertEqual(pool.search.call_count, 1)
+
+    @patch('napps.kytos.pathfinder.graph.NetworkXGraph.simple_paths')
+    def test_stream_paths(self, mock_simple_paths):
+        """Test stream paths generates each path once found."""
+        table = HopNames(["A", "B", "C"])
+        mock_simple_paths.return_value = iter([Path([0, 1], 1, table),
+                                               Path([0, 2, 1], 2, table)])
+        paths = self.kytos_graph.stream_paths("A", "B", max_paths=2)
+
+        self.assertEqual(next(paths).hops, ["A", "B"])
+        self.assertEqual(len(list(mock_simple_paths.return_value)), 1)
+        self.assertEqual(list(paths), [])
+        self.assertEqual(get_hops(self.kytos_graph.cache.get(
+            self.kytos_graph._get_key("A", "B", None, None, None), 1)),
+            [["A", "B"]])
+
+    def test_get_engine_landmarks(self):
+        """Test the engine of each snapshot gets the ALT landmarks."""
+        kytos_graph = KytosGraph()
+        with patch('napps.kytos.pathfinder.settings.ALT_LANDMARKS', 2):
+            kytos_graph.update_topology(get_topology_mock())
+        self.assertEqual(len(kytos_graph.get_engine().landmarks), 2)
+
+        kytos_graph.clear()
+        self.assertEqual(kytos_graph.get_engine().landmarks, [])
+
+    def test_find_paths_tables(self):
+        """Test the single best path is read from the next-hop tables."""
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(
+            [("A", "B", 1), ("B", "C", 1), ("A", "C", 5)], weight="delay")
+        with patch.multiple('napps.kytos.pathfinder.settings',
+                            NEXT_HOP_TABLES=True,
+                            NEXT_HOP_PARAMETERS=["delay"]):
+            kytos_graph = KytosGraph()
+            kytos_graph.graph = graph
+            kytos_graph.tables_future.result()
+
+        with patch.object(NetworkXGraph, 'simple_paths') as mock_search:
+            paths, truncated = kytos_graph.find_paths("A", "C", "delay", 1)
+            self.assertEqual((get_hops(paths), truncated),
+                             ([["A", "B", "C"]], False))
+            self.assertEqual(get_hops(kytos_graph.shortest_paths(
+                "A", "C", None, 1)), [["A", "C"]])
+            [paths] = kytos_graph.batch_shortest_paths(
+                [{"source": "C", "destination": "A", "max_paths": 1,
+                  "parameter": "delay"}])
+            self.assertEqual(get_hops(paths), [["C", "B", "A"]])
+            mock_search.assert_not_called()
+
+        self.assertEqual(get_hops(kytos_graph.shortest_paths("A", "C",
+                                                             "delay", 2)),
+                         [["A", "B", "C"], ["A", "C"]])
+        kytos_graph.clear()
+        self.assertIsNone(kytos_graph._table_paths(kytos_graph._snapshot,
+                                                   "A", "C", None))
+
+    @patch('napps.kytos.pathfinder.graph.log')
+    def test_find_paths_tables_import_error(self, mock_log):
+        """Test no next-hop tables are computed without SciPy."""
+        graph = nx.Graph()
+        graph.add_edge("A", "B")
+        with patch.dict(sys.modules, {"scipy.sparse.csgraph": None}), \
+                patch('napps.kytos.pathfinder.settings.NEXT_HOP_TABLES',
+                      True):
+            sys.modules.pop("napps.kytos.pathfinder.tables", None)
+            kytos_graph = KytosGraph()
+            kytos_graph.graph = graph
+            kytos_graph.tables_future.result()
+        mock_log.error.assert_called_once()
+        self.assertEqual(kytos_graph._tables, (0, {}))
+        self.assertEqual(get_hops(kytos_graph.shortest_paths("A", "B", None,
+                                                             1)),
+                         [["A", "B"]])
+
+    def test_shortest_path_tree(self):
+        """Test the paths to many destinations come from one search."""
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(
+            [("A", "B", 1), ("B", "C", 1), ("A", "C", 5), ("C", "D", 1)],
+            weight="delay")
+        self.kytos_graph.graph = graph
+
+        with patch.object(NetworkXGraph, 'shortest_paths_from',
+                          wraps=self.kytos_graph.get_engine()
+                          .shortest_paths_from) as mock_tree:
+            paths, truncated = zip(*self.kytos_graph.shortest_path_tree(
+                "A", ["D", "B", "X"], "delay"))
+        mock_tree.assert_called_once()
+        self.assertEqual(get_hops(paths),
+                         [["A", "B", "C", "D"], ["A", "B"], None])
+        self.assertEqual(truncated, (False, False, False))
+        self.assertEqual(self.kytos_graph.merge_paths(paths),
+                         [["A", "B"], ["B", "C"], ["C", "D"]])
+
+        paths, truncated = zip(*self.kytos_graph.shortest_path_tree(
+            "A", ["D", "B"], "delay", desired=[("A", "C")],
+            undesired=[("B", "C")]))
+        self.assertEqual(get_hops(paths), [["A", "C", "D"], None])
+        self.assertEqual(truncated, (False, False))
+
+        results = self.kytos_graph.shortest_path_tree(
+            "A", ["D", "B"], desired=[("C", "D")], deadline=0)
+        self.assertEqual(results, [(None, True), (None, True)])
+
+    def test_ecmp_paths(self):
+        """Test the equal-cost paths are counted, capped or selected."""
+        graph = nx.Graph()
+        graph.add_edges_from([("A", "B"), ("B", "D"), ("A", "C"), ("C", "D"),
+                              ("A", "E"), ("E", "D")], bandwidth=10)
+        graph["A"]["E"]["bandwidth"] = 1
+        self.kytos_graph.graph = graph
+
+        count, paths = self.kytos_graph.ecmp_paths("A", "D")
+        self.assertEqual(count, 3)
+        self.assertEqual(sorted(get_hops(paths)),
+                         [["A", "B", "D"], ["A", "C", "D"], ["A", "E", "D"]])
+        count, first = self.kytos_graph.ecmp_paths("A", "D", max_paths=1)
+        self.assertEqual((count, get_hops(first)), (3, get_hops(paths[:1])))
+
+        count, paths = self.kytos_graph.ecmp_paths(
+            "A", "D", undesired=[("B", "D")],
+            constraints=[("bandwidth", "min", 10)], flow_key="flow")
+        self.assertEqual((count, get_hops(paths)), (1, [["A", "C", "D"]]))
+        self.assertEqual(self.kytos_graph.ecmp_paths("A", "X"), (0, []))
+
+    def test_metrics(self):
+        """Test updates and searches are recorded in the metrics."""
+        kytos_graph = KytosGraph()
+        kytos_graph.update_topology(get_topology_mock())
+        graph = nx.Graph()
+        graph.add_edge("A", "B", bandwidth=10)
+        graph.add_edge("B", "C", bandwidth=100)
+        graph.add_edge("A", "C", bandwidth=1)
+        kytos_graph.graph = graph
+
+        kytos_graph.find_paths("A", "C", max_paths=3,
+                               constraints=[("bandwidth", "min", 10)])
+        kytos_graph.find_paths("A", "B", max_paths=3, deadline=0)
+        lines = kytos_graph.metrics.render().splitlines()
+
+        self.assertIn("pathfinder_topology_update_seconds_count 1", lines)
+        self.assertIn("pathfinder_graph_nodes 3", lines)
+        self.assertIn("pathfinder_graph_edges 3", lines)
+        self.assertIn("pathfinder_search_seconds_count 2", lines)
+        self.assertIn("pathfinder_search_first_path_seconds_count 2", lines)
+        self.assertIn("pathfinder_search_paths_sum 2", lines)
+        self.assertIn("pathfinder_search_truncated_total 1", lines)
+        self.assertIn('pathfinder_pruned_links_bucket{le="1"} 1', lines)
+        self.assertIn("pathfinder_pruned_links_sum 1", lines)
+
+    def test_save_load(self):
+        """Test a graph and its engine are restored from a checkpoint."""
+        path = os.path.join(tempfile.mkdtemp(), "graph.checkpoint")
+        kytos_graph = KytosGraph()
+        self.assertFalse(kytos_graph.save(path))
+        self.assertFalse(kytos_graph.load(path))
+
+        topology = get_ring_topology(4)
+        with patch.multiple('napps.kytos.pathfinder.settings',
+                            GRAPH_BACKEND='csr', ALT_LANDMARKS=2):
+            kytos_graph.update_topology(topology)
+            self.assertTrue(kytos_graph.save(path))
+
+            loaded = KytosGraph()
+            self.assertTrue(loaded.load(path))
+            self.assert_same_graph(loaded.graph, kytos_graph.graph)
+            self.assertIsInstance(loaded.get_engine(), CSRGraph)
+            self.assertEqual(len(loaded.get_engine().landmarks), 2)
+            version = loaded.version
+            loaded.update_topology(topology)
+            self.assertEqual(loaded.version, version)
+
+        loaded = KytosGraph()
+        self.assertTrue(loaded.load(path))
+        self.assertIsInstance(loaded.get_engine(), NetworkXGraph)
+        self.assertEqual(loaded.get_engine().landmarks, [])
+
+    def test_load_other_format(self):
+        """Test a checkpoint of another format is ignored."""
+        path = os.path.join(tempfile.mkdtemp(), "graph.checkpoint")
+        with open(path, "wb") as checkpoint_file:
+            checkpoint_file.write(b"KPFGRAPH\xff\xff")
+        self.assertFalse(KytosGraph().load(path))
+
+        with open(path, "wb") as checkpoint_file:
+            checkpoint_file.write(b"")
+        self.assertFalse(KytosGraph().load(path))
+
+    def test_load_moved_class(self):
+        """Test a checkpoint holding a class that was moved is ignored."""
+        path = os.path.join(tempfile.mkdtemp(), "graph.checkpoint")
+        kytos_graph = KytosGraph()
+        kytos_graph.graph = nx.path_graph(["A", "B"])
+        kytos_graph.save(path)
+        for error in (AttributeError("moved"), ModuleNotFoundError("gone")):
+            with patch('pickle.load', side_effect=error):
+                self.assertFalse(KytosGraph().load(path))
+        self.assertTrue(KytosGraph().load(path))
@@ -1,15 +1,22 @@
 """Test Main methods."""
+import json
+import os
+import tempfile
+from time import time
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import ANY, MagicMock, patch
 
+import networkx as nx
 from kytos.core.events import KytosEvent
 from kytos.lib.helpers import get_controller_mock, get_test_client
 
+from napps.kytos.pathfinder import settings
 from napps.kytos.pathfinder.main import Main
+from napps.kytos.pathfinder.paths import HopNames, Path
 from tests.helpers import get_topology_mock
 
 
-# pylint: disable=protected-access
+# pylint: disable=protected-access,too-many-public-methods
 class TestMain(TestCase):
     """Tests for the Main class."""
 
@@ -26,6 +33,24 @@ class TestMain(TestCase):
 
         self.assertEqual(self.napp._topology, topology)
 
+    def test_update_topology_coalesced(self):
+        """Test a burst of topology updates is applied as one update.
+
+        The topologies are submitted to the scheduler directly, as event
+        handlers run in threads of their own, in no given order.
+        """
+        topologies = [get_topology_mock() for _ in range(3)]
+        with patch.object(self.napp.graph,
+                          'update_topology') as mock_update_topology:
+            with patch.object(self.napp.updates, 'window', 60):
+                for topology in topologies:
+                    self.napp.updates.submit(topology)
+            mock_update_topology.assert_not_called()
+
+            self.napp.shutdown()
+            mock_update_topology.assert_called_once_with(topologies[-1])
+        self.assertEqual(self.napp.updates.stats()['coalesced'], 2)
+
     def test_update_topology_failure_case(self):
         """Test update topology method to failure case."""
         event = KytosEvent(name='kytos.topology.updated')
@@ -33,12 +58,13 @@ class TestMain(TestCase):
 
         self.assertIsNone(self.napp._topology)
 
-    @patch('napps.kytos.pathfinder.graph.KytosGraph.shortest_paths')
-    def test_shortest_path(self, mock_shortest_paths):
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.find_paths')
+    def test_shortest_path(self, mock_find_paths):
         """Test shortest path."""
         self.napp._topology = get_topology_mock()
-        path = ["00:00:00:00:00:00:00:01:1", "00:00:00:00:00:00:00:02:1"]
-        mock_shortest_paths.return_value = [path]
+        path = Path([0, 1], 1, HopNames(["00:00:00:00:00:00:00:01:1",
+                                         "00:00:00:00:00:00:00:02:1"]))
+        mock_find_paths.return_value = ([path], False)
 
         api = get_test_client(self.napp.controller, self.napp)
         url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
@@ -48,22 +74,559 @@ class TestMain(TestCase):
                 "undesired_links": None}
         response = api.open(url, method='POST', json=data)
 
-        expected_response = {'paths': [{'hops': path}]}
+        expected_response = {'paths': [{'hops': path.hops, 'cost': 1}],
+                             'truncated': False}
         self.assertEqual(response.json, expected_response)
         self.assertEqual(response.status_code, 200)
+        link = self.napp._topology.links["1"]
+        mock_find_paths.assert_called_with(
+            source=data['source'], destination=data['destination'],
+            parameter=None, max_paths=settings.DEFAULT_MAX_PATHS,
+            desired=[(link.endpoint_a.id, link.endpoint_b.id)], undesired=[],
+            constraints=[], disjoint=None, deadline=ANY)
 
-    def test_filter_paths(self):
-        """Test filter paths."""
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.find_paths')
+    def test_shortest_path_unknown_desired_link(self, mock_find_paths):
+        """Test shortest path with a desired link that does not exist."""
         self.napp._topology = get_topology_mock()
-        paths = [{"hops": ["00:00:00:00:00:00:00:01:1",
-                           "00:00:00:00:00:00:00:02:1"]}]
-        desired, undesired = ["1"], None
-
-        filtered_paths = self.napp._filter_paths(paths, desired, undesired)
-        self.assertEqual(filtered_paths, paths)
-
-        paths = [{"hops": ["00:00:00:00:00:00:00:01:2",
-                           "00:00:00:00:00:00:00:03:1"]}]
-        desired, undesired = None, ["2"]
-        filtered_paths = self.napp._filter_paths(paths, desired, undesired)
-        self.assertEqual(filtered_paths, [])
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        data = {"source": "00:00:00:00:00:00:00:01:1",
+                "destination": "00:00:00:00:00:00:00:02:1",
+                "desired_links": ["1", "4"],
+                "undesired_links": ["5"]}
+        response = api.open(url, method='POST', json=data)
+
+        self.assertEqual(response.json, {'paths': [], 'truncated': False})
+        mock_find_paths.assert_not_called()
+
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.find_paths')
+    def test_shortest_path_max_paths(self, mock_find_paths):
+        """Test shortest path with max_paths."""
+        mock_find_paths.return_value = ([], False)
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        data = {"source": "00:00:00:00:00:00:00:01:1",
+                "destination": "00:00:00:00:00:00:00:02:1",
+                "max_paths": 3}
+        response = api.open(url, method='POST', json=data)
+
+        self.assertEqual(response.status_code, 200)
+        mock_find_paths.assert_called_with(
+            source=data['source'], destination=data['destination'],
+            parameter=None, max_paths=3, desired=[], undesired=[],
+            constraints=[], disjoint=None, deadline=ANY)
+
+        for max_paths in (0, settings.MAX_PATHS_LIMIT + 1, "3", True):
+            data['max_paths'] = max_paths
+            response = api.open(url, method='POST', json=data)
+            self.assertEqual(response.status_code, 400)
+
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.find_paths')
+    def test_shortest_path_constraints(self, mock_find_paths):
+        """Test shortest path with constraints."""
+        mock_find_paths.return_value = ([], False)
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        data = {"source": "00:00:00:00:00:00:00:01:1",
+                "destination": "00:00:00:00:00:00:00:02:1",
+                "constraints": {"bandwidth": {"min": 100},
+                                "delay": {"max_total": 50.5},
+                                "ownership": {"in": ["red", "blue"]}}}
+        response = api.open(url, method='POST', json=data)
+
+        self.assertEqual(response.status_code, 200)
+        constraints = mock_find_paths.call_args[1]['constraints']
+        self.assertCountEqual(constraints, [
+            ("bandwidth", "min", 100), ("delay", "max_total", 50.5),
+            ("ownership", "in", frozenset(["red", "blue"]))])
+
+        for constraints in (["delay"], {"delay": 5}, {"delay": {"sum": 5}},
+                            {"delay": {"max": "5"}}, {"owner": {"in": "a"}},
+                            {"owner": {"in": [["a"]]}}):
+            data['constraints'] = constraints
+            response = api.open(url, method='POST', json=data)
+            self.assertEqual(response.status_code, 400)
+
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.find_paths')
+    def test_shortest_path_disjoint(self, mock_find_paths):
+        """Test shortest path with disjoint paths."""
+        self.napp._topology = get_topology_mock()
+        mock_find_paths.return_value = ([], False)
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        data = {"source": "00:00:00:00:00:00:00:01:1",
+                "destination": "00:00:00:00:00:00:00:02:1",
+                "disjoint": "node"}
+        response = api.open(url, method='POST', json=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_find_paths.call_args[1]['disjoint'],
+                         "node")
+
+        for disjoint, desired_links in (("path", []), ("link", ["1"])):
+            data.update(disjoint=disjoint, desired_links=desired_links)
+            response = api.open(url, method='POST', json=data)
+            self.assertEqual(response.status_code, 400)
+
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.find_paths')
+    def test_shortest_path_desired_limit(self, mock_find_paths):
+        """Test path requests with too many desired links are rejected."""
+        mock_find_paths.return_value = ([], False)
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        data = {"source": "00:00:00:00:00:00:00:01:1",
+                "destination": "00:00:00:00:00:00:00:02:1",
+                "desired_links": ["1", "2", "3"]}
+        with patch('napps.kytos.pathfinder.settings.MAX_DESIRED_LINKS', 2):
+            response = api.open(url, method='POST', json=data)
+            self.assertEqual(response.status_code, 400)
+
+            response = api.open(url + "/tree", method='POST',
+                                json={"source": "A", "destinations": ["B"],
+                                      "desired_links": ["1", "2", "3"]})
+            self.assertEqual(response.status_code, 400)
+        mock_find_paths.assert_not_called()
+
+    def test_protection(self):
+        """Test protecting a pair, listing and unprotecting it."""
+        graph = nx.Graph()
+        graph.add_edges_from([("A", "B"), ("B", "D"), ("A", "C"),
+                              ("C", "D"), ("B", "C")])
+        self.napp.graph.graph = graph
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/protection"
+        data = {"source": "A", "destination": "D", "disjoint": "node"}
+
+        response = api.open(url, method='POST', json=data)
+        self.assertEqual(response.status_code, 200)
+        paths = response.json
+        self.assertCountEqual(paths.values(),
+                              [["A", "B", "D"], ["A", "C", "D"]])
+
+        response = api.open(url, method='GET')
+        self.assertEqual(response.json["protections"],
+                         [dict(data, parameter=None, **paths)])
+
+        response = api.open(url, method='DELETE', json=data)
+        self.assertEqual(response.status_code, 200)
+        response = api.open(url, method='DELETE', json=data)
+        self.assertEqual(response.status_code, 404)
+
+    def test_protection_limit(self):
+        """Test protecting more pairs than allowed."""
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/protection"
+
+        with patch('napps.kytos.pathfinder.settings.MAX_PROTECTED_PAIRS', 1):
+            response = api.open(url, method='POST',
+                                json={"source": "A", "destination": "B"})
+            self.assertEqual(response.status_code, 200)
+            response = api.open(url, method='POST',
+                                json={"source": "A", "destination": "B"})
+            self.assertEqual(response.status_code, 200)
+            response = api.open(url, method='POST',
+                                json={"source": "A", "destination": "C"})
+            self.assertEqual(response.status_code, 400)
+
+        response = api.open(url, method='POST', json={"source": "A"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_validate_paths(self):
+        """Test validate paths checks each list of hops."""
+        graph = nx.Graph()
+        graph.add_edges_from([("A", "B"), ("B", "C")])
+        self.napp.graph.graph = graph
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/validate"
+
+        response = api.open(url, method='POST', json={
+            "paths": [["A", "B", "C"], ["A", "C"]]})
+        self.assertEqual(response.json, {"valid": [True, False]})
+        response = api.open(url, method='POST', json={"paths": [["A", 1]]})
+        self.assertEqual(response.status_code, 400)
+        response = api.open(url, method='POST', json={"paths": "A"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_subscription(self):
+        """Test subscribing a path, listing and unsubscribing it."""
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/subscription"
+        data = {"id": "circuit", "hops": ["A", "B"]}
+
+        response = api.open(url, method='POST', json=data)
+        self.assertEqual(response.json, {"valid": False})
+        response = api.open(url, method='GET')
+        self.assertEqual(response.json["subscriptions"], [data])
+        with patch('napps.kytos.pathfinder.settings.MAX_SUBSCRIBED_PATHS', 1):
+            response = api.open(url, method='POST', json=data)
+            self.assertEqual(response.status_code, 200)
+            response = api.open(url, method='POST',
+                                json={"id": "other", "hops": ["A"]})
+            self.assertEqual(response.status_code, 400)
+
+        response = api.open(url, method='DELETE', json={"id": "circuit"})
+        self.assertEqual(response.status_code, 200)
+        response = api.open(url, method='DELETE', json={"id": "circuit"})
+        self.assertEqual(response.status_code, 404)
+        response = api.open(url, method='POST', json={"id": "circuit"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_apply_topology_affected_paths(self):
+        """Test an event lists the subscribed paths an update affects."""
+        topology = get_topology_mock()
+        self.napp._apply_topology(topology)
+        link = topology.links["1"]
+        hops = [link.endpoint_a.id, link.endpoint_b.id]
+        self.napp.graph.subscribe("circuit", hops)
+        self.napp.controller.buffers.app.put = MagicMock()
+
+        link.is_active.return_value = False
+        self.napp._apply_topology(topology)
+
+        event = self.napp.controller.buffers.app.put.call_args[0][0]
+        self.assertEqual(event.name, 'kytos/pathfinder.paths_affected')
+        self.assertEqual(event.content, {'paths': [
+            {'id': 'circuit', 'hops': hops, 'valid': False}]})
+        self.napp._apply_topology(topology)
+        self.napp.controller.buffers.app.put.assert_called_once()
+
+    @patch('napps.kytos.pathfinder.main.time', return_value=100)
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.find_paths')
+    def test_shortest_path_timeout(self, mock_find_paths, _):
+        """Test shortest path with a deadline returns the truncated flag."""
+        path = Path([0, 1], 1, HopNames(["00:00:00:00:00:00:00:01:1",
+                                         "00:00:00:00:00:00:00:02:1"]))
+        mock_find_paths.return_value = ([path], True)
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        data = {"source": path[0], "destination": path[1],
+                "timeout_ms": 250}
+        response = api.open(url, method='POST', json=data)
+
+        self.assertEqual(response.json, {'paths': [{'hops': path.hops,
+                                                    'cost': 1}],
+                                         'truncated': True})
+        self.assertEqual(mock_find_paths.call_args[1]['deadline'], 100.25)
+
+        del data['timeout_ms']
+        api.open(url, method='POST', json=data)
+        self.assertEqual(mock_find_paths.call_args[1]['deadline'],
+                         100 + settings.DEFAULT_TIMEOUT_MS / 1000)
+
+        for timeout in (0, "250", True, 2.5):
+            data['timeout_ms'] = timeout
+            response = api.open(url, method='POST', json=data)
+            self.assertEqual(response.status_code, 400)
+
+    def test_shortest_path_ndjson(self):
+        """Test shortest path streams the paths as NDJSON lines."""
+        graph = nx.Graph()
+        graph.add_edges_from([("A", "B"), ("B", "D"), ("A", "C"),
+                              ("C", "D")])
+        self.napp.graph.graph = graph
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        headers = {"Accept": "application/x-ndjson"}
+        data = {"source": "A", "destination": "D", "max_paths": 2}
+
+        response = api.open(url, method='POST', json=data, headers=headers)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line
+                 in response.get_data(as_text=True).splitlines()]
+        self.assertCountEqual(lines, [{"hops": ["A", "B", "D"], "cost": 2},
+                                      {"hops": ["A", "C", "D"], "cost": 2}])
+
+        with patch('napps.kytos.pathfinder.main.time', return_value=0):
+            data.update(max_paths=3, timeout_ms=1)
+            response = api.open(url, method='POST', json=data,
+                                headers=headers)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(json.loads(lines[-1]), {"truncated": True})
+        self.assertEqual(len(lines), 2)
+
+        data["desired_links"] = ["unknown"]
+        response = api.open(url, method='POST', json=data, headers=headers)
+        self.assertEqual(response.get_data(as_text=True), "")
+
+    def test_shutdown(self):
+        """Test shutdown stops the path search workers."""
+        with patch.object(self.napp, 'pool') as mock_pool:
+            self.napp.shutdown()
+        mock_pool.close.assert_called_once()
+
+    def test_shortest_path_without_destination(self):
+        """Test shortest path without destination."""
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2"
+        data = {"source": "00:00:00:00:00:00:00:01:1"}
+        response = api.open(url, method='POST', json=data)
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch('napps.kytos.pathfinder.graph.KytosGraph.batch_find_paths')
+    def test_batch_shortest_paths(self, mock_batch_find_paths):
+        """Test batch shortest paths keeps the order of the queries."""
+        self.napp._topology = get_topology_mock()
+        path = Path([0, 1], 1, HopNames(["00:00:00:00:00:00:00:01:1",
+                                         "00:00:00:00:00:00:00:02:1"]))
+        mock_batch_find_paths.return_value = [([path], True), ([], False)]
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/batch"
+        queries = [{"source": path[0], "destination": path[1],
+                    "max_paths": 1},
+                   {"source": path[0]},
+                   {"source": path[0], "destination": path[1],
+                    "desired_links": ["4"]},
+                   {"source": path[1], "destination": path[0],
+                    "undesired_links": ["1"]},
+                   {"source": path[0], "destination": path[1],
+                    "max_paths": 0}]
+        response = api.open(url, method='POST',
+                            json={"queries": queries, "timeout_ms": 2000})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json["results"]
+        self.assertEqual(results[0], {"paths": [{"hops": path.hops,
+                                                 "cost": 1}],
+                                      "truncated": True})
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2], {"paths": [], "truncated": False})
+        self.assertEqual(results[3], {"paths": [], "truncated": False})
+        self.assertIn("error", results[4])
+        valid_queries, deadline = mock_batch_find_paths.call_args[0]
+        self.assertEqual([query["source"] for query in valid_queries],
+                         [path[0], path[1]])
+        self.assertAlmostEqual(deadline, time() + 2, delta=1)
+
+        response = api.open(url, method='POST',
+                            json={"queries": queries, "timeout_ms": 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_shortest_paths_invalid(self):
+        """Test batch shortest paths without a list of queries."""
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/batch"
+        response = api.open(url, method='POST', json={"queries": {}})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_shortest_path_tree(self):
+        """Test shortest path tree returns a path for each destination."""
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(
+            [("A", "B", 1), ("B", "C", 1), ("A", "C", 5), ("D", "E", 1)],
+            weight="delay")
+        self.napp.graph.graph = graph
+
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/tree"
+        response = api.open(url, method='POST', json={
+            "source": "A", "destinations": ["C", "B", "E"],
+            "parameter": "delay", "merged": True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            "paths": [{"destination": "C", "hops": ["A", "B", "C"],
+                       "cost": 2, "truncated": False},
+                      {"destination": "B", "hops": ["A", "B"], "cost": 1,
+                       "truncated": False},
+                      {"destination": "E", "hops": [], "truncated": False}],
+            "tree": [["A", "B"], ["B", "C"]]})
+
+        response = api.open(url, method='POST', json={
+            "source": "A", "destinations": ["C"], "desired_links": ["9"]})
+        self.assertEqual(response.json, {
+            "paths": [{"destination": "C", "hops": [], "truncated": False}]})
+
+        with patch.object(self.napp.graph, 'shortest_path_tree',
+                          return_value=[(None, True)]) as mock_tree:
+            response = api.open(url, method='POST', json={
+                "source": "A", "destinations": ["C"], "timeout_ms": 10})
+        self.assertEqual(response.json, {
+            "paths": [{"destination": "C", "hops": [], "truncated": True}]})
+        self.assertAlmostEqual(mock_tree.call_args[0][-1], time() + 0.01,
+                               delta=1)
+
+    def test_shortest_path_tree_invalid(self):
+        """Test shortest path tree without a list of destinations."""
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/tree"
+        response = api.open(url, method='POST',
+                            json={"source": "A", "destinations": "B"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_shortest_path_ecmp(self):
+        """Test shortest path returns the equal-cost paths of a request."""
+        graph = nx.Graph()
+        graph.add_edges_from([("A", "B"), ("B", "D"), ("A", "C"), ("C", "D")])
+        self.napp.graph.graph = graph
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+
+        response = api.open(url, method='POST', json={
+            "source": "A", "destination": "D", "ecmp": True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["ecmp_count"], 2)
+        self.assertEqual(sorted(path["hops"]
+                                for path in response.json["paths"]),
+                         [["A", "B", "D"], ["A", "C", "D"]])
+
+        selected = []
+        for flow_key in ({"src": 1, "dst": 2}, {"dst": 2, "src": 1}):
+            response = api.open(url, method='POST', json={
+                "source": "A", "destination": "D", "ecmp": True,
+                "flow_key": flow_key})
+            self.assertEqual(len(response.json["paths"]), 1)
+            selected.append(response.json["paths"])
+        self.assertEqual(selected[0], selected[1])
+
+        response = api.open(url, method='POST', json={
+            "source": "A", "destination": "D", "ecmp": True,
+            "disjoint": "link"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_shortest_path_metrics(self):
+        """Test shortest path returns the metrics of each path, sorted."""
+        graph = nx.Graph()
+        graph.add_edge("A", "B", delay=1, bandwidth=10)
+        graph.add_edge("B", "D", delay=1, bandwidth=100)
+        graph.add_edge("A", "C", delay=5, bandwidth=100)
+        graph.add_edge("C", "D", delay=1, bandwidth=100)
+        graph.add_edge("D", "E")
+        self.napp.graph.graph = graph
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+        data = {"source": "A", "destination": "D",
+                "metrics": {"delay": "sum", "bandwidth": "min"},
+                "sort_by": "bandwidth", "sort_order": "desc"}
+
+        response = api.open(url, method='POST', json=data)
+        self.assertEqual(response.json["paths"], [
+            {"hops": ["A", "C", "D"], "cost": 2,
+             "metrics": {"delay": 6, "bandwidth": 100}},
+            {"hops": ["A", "B", "D"], "cost": 2,
+             "metrics": {"delay": 2, "bandwidth": 10}}])
+
+        data.update(sort_by="delay", sort_order="asc")
+        response = api.open(url, method='POST', json=data)
+        self.assertEqual([path["hops"] for path in response.json["paths"]],
+                         [["A", "B", "D"], ["A", "C", "D"]])
+
+        response = api.open(url, method='POST', json={
+            "source": "A", "destination": "E", "max_paths": 1,
+            "metrics": {"delay": "sum", "bandwidth": "max"}})
+        self.assertEqual(response.json["paths"][0]["metrics"],
+                         {"delay": None, "bandwidth": 100})
+
+        for invalid in ({"metrics": ["delay"]},
+                        {"metrics": {"delay": "avg"}},
+                        {"sort_by": "jitter"},
+                        {"sort_by": "cost", "sort_order": "up"}):
+            response = api.open(url, method='POST',
+                                json=dict(data, **invalid))
+            self.assertEqual(response.status_code, 400)
+        response = api.open(url, method='POST', json=data,
+                            headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_shortest_path_profile(self):
+        """Test shortest path returns a profile summary of slow searches."""
+        graph = nx.Graph()
+        graph.add_edges_from([("A", "B"), ("B", "C")])
+        self.napp.graph.graph = graph
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/"
+
+        with patch.object(settings, 'PROFILE_MIN_MS', 0):
+            response = api.open(url, method='POST', json={
+                "source": "A", "destination": "C", "profile": True})
+        self.assertEqual(response.json["paths"],
+                         [{"hops": ["A", "B", "C"], "cost": 2}])
+        self.assertIn("function calls", response.json["profile"])
+
+        with patch.object(settings, 'PROFILE_MIN_MS', 60000):
+            response = api.open(url, method='POST', json={
+                "source": "A", "destination": "C", "profile": True})
+        self.assertNotIn("profile", response.json)
+        self.assertEqual(self.napp.graph.cache.stats()["misses"], 0)
+
+    def test_metrics(self):
+        """Test metrics are written in the Prometheus text format."""
+        self.napp.graph.cache.get("key")
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/stats"
+        response = api.open(url, method='GET')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertIn("pathfinder_graph_nodes 0", lines)
+        self.assertIn("pathfinder_cache_misses_total 1", lines)
+        self.assertIn("# TYPE pathfinder_search_seconds histogram", lines)
+
+    def test_checkpoint(self):
+        """Test the graph is saved on shutdown and loaded on setup."""
+        path = os.path.join(tempfile.mkdtemp(), "graph.checkpoint")
+        with patch.multiple(settings, CHECKPOINT_FILE=path,
+                            PATH_POOL_SIZE=0):
+            napp = Main(get_controller_mock())
+            napp.graph.graph = nx.path_graph(["A", "B"])
+            napp.execute()
+            self.assertTrue(os.path.exists(path))
+            with patch.object(napp.graph, 'save') as mock_save:
+                napp.shutdown()
+            mock_save.assert_not_called()
+
+            napp = Main(get_controller_mock())
+            self.assertEqual(list(napp.graph.graph.edges), [("A", "B")])
+
+    def test_setup(self):
+        """Test the graph is built in the background after setup."""
+        with patch.multiple(settings, CHECKPOINT_FILE=None,
+                            PATH_POOL_SIZE=0):
+            napp = Main(get_controller_mock())
+            napp._graph_future.result()
+        self.assertIsNone(napp.pool)
+        self.assertEqual(napp.graph.version, 1)
+        lines = napp.graph.metrics.render().splitlines()
+        self.assertTrue(any(line.startswith("pathfinder_startup_seconds ")
+                            for line in lines))
+
+    @patch('napps.kytos.pathfinder.main.log')
+    def test_setup_checkpoint_error(self, mock_log):
+        """Test a checkpoint failing to load leaves an empty graph."""
+        with patch.multiple(settings, CHECKPOINT_FILE="graph.checkpoint",
+                            PATH_POOL_SIZE=0):
+            with patch('napps.kytos.pathfinder.graph.KytosGraph.load',
+                       side_effect=AttributeError("moved")):
+                napp = Main(get_controller_mock())
+                graph = napp.graph
+        mock_log.error.assert_called_once()
+        self.assertEqual(graph.version, 1)
+        self.assertEqual(len(graph.graph), 0)
+
+    def test_get_endpoints(self):
+        """Test get endpoints ignores unknown links."""
+        self.napp._topology = get_topology_mock()
+        link = self.napp._topology.links["2"]
+
+        endpoints = self.napp._get_endpoints(["2", "4"])
+        self.assertEqual(endpoints,
+                         [(link.endpoint_a.id, link.endpoint_b.id)])
+
+    def test_cache_stats(self):
+        """Test cache stats."""
+        api = get_test_client(self.napp.controller, self.napp)
+        url = "http://127.0.0.1:8181/api/kytos/pathfinder/v2/cache"
+        response = api.open(url, method='GET')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, self.napp.graph.cache.stats())
@@ -0,0 +1,43 @@
+"""Test Metrics methods."""
+from unittest import TestCase
+
+from napps.kytos.pathfinder.metrics import Metrics, profile
+
+
+class TestMetrics(TestCase):
+    """Tests for the Metrics class."""
+
+    def setUp(self):
+        """Create the metrics."""
+        self.metrics = Metrics()
+
+    def test_render(self):
+        """Test render writes cumulative buckets, gauges and counters."""
+        self.metrics.observe('pathfinder_search_paths', 1)
+        self.metrics.observe('pathfinder_search_paths', 7)
+        self.metrics.observe('pathfinder_search_paths', 500)
+        self.metrics.set('pathfinder_graph_nodes', 3)
+        self.metrics.increment('pathfinder_search_truncated_total')
+        lines = self.metrics.render(
+            {'pathfinder_cache_hits_total': ('Path cache hits.', 4)})
+        lines = lines.splitlines()
+
+        self.assertIn('# TYPE pathfinder_search_paths histogram', lines)
+        self.assertIn('pathfinder_search_paths_bucket{le="0"} 0', lines)
+        self.assertIn('pathfinder_search_paths_bucket{le="1"} 1', lines)
+        self.assertIn('pathfinder_search_paths_bucket{le="10"} 2', lines)
+        self.assertIn('pathfinder_search_paths_bucket{le="+Inf"} 3', lines)
+        self.assertIn('pathfinder_search_paths_sum 508', lines)
+        self.assertIn('pathfinder_search_paths_count 3', lines)
+        self.assertIn('pathfinder_graph_nodes 3', lines)
+        self.assertIn('pathfinder_search_truncated_total 1', lines)
+        self.assertIn('# TYPE pathfinder_cache_hits_total counter', lines)
+        self.assertIn('pathfinder_cache_hits_total 4', lines)
+
+    def test_profile(self):
+        """Test profile returns the result and a summary of the call."""
+        result, seconds, summary = profile(sorted, [3, 1, 2], reverse=True)
+
+        self.assertEqual(result, [3, 2, 1])
+        self.assertGreaterEqual(seconds, 0)
+        self.assertIn('function calls', summary)
@@ -0,0 +1,43 @@
+"""Test HopNames and Path methods."""
+import pickle
+from unittest import TestCase
+
+from napps.kytos.pathfinder.paths import HopNames, Path
+
+
+class TestPaths(TestCase):
+    """Tests for the HopNames and Path classes."""
+
+    def setUp(self):
+        """Create a table of hop names."""
+        self.table = HopNames(["A", "B", "C"])
+
+    def test_intern(self):
+        """Test names keep their IDs and new names get the next one."""
+        self.assertEqual(self.table.intern("B"), 1)
+        self.assertEqual(self.table.intern("D"), 3)
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(self.table.get_edges([("A", "D"), ("A", "X")]),
+                         [(0, 3)])
+
+    def test_path(self):
+        """Test a path is a sequence of IDs decoded to names on demand."""
+        path = Path([0, 2, 1], 2, self.table)
+        self.assertEqual(list(path), [0, 2, 1])
+        self.assertEqual((len(path), path[-1], path[1:].tolist()),
+                         (3, 1, [2, 1]))
+        self.assertEqual(path.hops, ["A", "C", "B"])
+        self.assertEqual(path.totals, {})
+
+    def test_pickle(self):
+        """Test a pickled path leaves its table behind."""
+        table = pickle.loads(pickle.dumps(self.table))
+        self.assertEqual(table.ids, self.table.ids)
+
+        path = Path([0, 1], 1, self.table, {"delay": 3})
+        path = pickle.loads(pickle.dumps(path))
+        self.assertIsNone(path.table)
+        self.assertEqual((list(path), path.cost, path.totals),
+                         ([0, 1], 1, {"delay": 3}))
+        path.table = table
+        self.assertEqual(path.hops, ["A", "B"])
@@ -0,0 +1,134 @@
+"""Test PathPool methods."""
+import multiprocessing
+import os
+from time import time
+from unittest import TestCase
+from unittest.mock import patch
+
+import networkx as nx
+
+from napps.kytos.pathfinder.graph import KytosGraph
+from napps.kytos.pathfinder.metrics import Metrics
+from napps.kytos.pathfinder.pool import PathPool, _collect
+from tests.helpers import get_hops, get_pairs
+
+
+# pylint: disable=protected-access
+class TestPathPool(TestCase):
+    """Tests for the PathPool class."""
+
+    def setUp(self):
+        """Create a graph searched by a pool of one worker."""
+        self.pool = PathPool(1)
+        self.kytos_graph = KytosGraph(self.pool)
+        self.kytos_graph.graph = nx.complete_graph(5)
+
+    def tearDown(self):
+        """Stop the worker."""
+        self.pool.close()
+
+    def test_search(self):
+        """Test search finds the paths of the snapshot in a worker."""
+        snapshot = self.kytos_graph._snapshot
+        query = (0, 1, None, 3, None, None, None, None)
+        paths, truncated = self.pool.search(snapshot, query)
+        expected, _ = KytosGraph.search(snapshot.engine, *query)
+        self.assertEqual((get_pairs(paths), truncated),
+                         (get_pairs(expected), False))
+
+        self.kytos_graph.graph = nx.path_graph(3)
+        paths, truncated = self.kytos_graph.find_paths(0, 2)
+        self.assertEqual((get_hops(paths), truncated), ([[0, 1, 2]], False))
+
+    def test_search_metrics(self):
+        """Test the metrics observed by a worker are recorded."""
+        snapshot = self.kytos_graph._snapshot
+        query = (0, 1, None, 3, None, None, [("delay", "max", 1)], None)
+        metrics = Metrics()
+        self.assertEqual(self.pool.search(snapshot, query, None, metrics),
+                         ([], False))
+        lines = metrics.render().splitlines()
+        self.assertIn("pathfinder_pruned_links_sum 10", lines)
+
+        query = (0, 1, None, 3, None, None, None, None)
+        self.pool.search(snapshot, query, None, metrics)
+        lines = metrics.render().splitlines()
+        self.assertIn("pathfinder_search_first_path_seconds_count 1", lines)
+
+    def test_search_deadline(self):
+        """Test search returns the paths the worker found by the deadline."""
+        snapshot = self.kytos_graph._snapshot
+        query = (0, 1, None, 3, None, None, None, None)
+        paths, truncated = self.pool.search(snapshot, query, time())
+        self.assertEqual((get_hops(paths), truncated), ([[0, 1]], True))
+        self.assertEqual(len(self.pool._idle), 1)
+
+    def test_search_late_worker(self):
+        """Test a worker missing the deadline is replaced."""
+        snapshot = self.kytos_graph._snapshot
+        query = (0, 1, None, 3, None, None, None, None)
+        with patch('napps.kytos.pathfinder.pool.GRACE_PERIOD', 0):
+            self.assertEqual(self.pool.search(snapshot, query, 0),
+                             ([], True))
+        self.assertEqual((len(self.pool._idle), len(self.pool._busy)),
+                         (1, 0))
+        paths, truncated = self.pool.search(snapshot, query)
+        self.assertEqual((len(paths), truncated), (3, False))
+
+    def test_search_dead_worker(self):
+        """Test search runs in the calling thread when the worker dies."""
+        self.kytos_graph.graph = nx.path_graph(3)
+        snapshot = self.kytos_graph._snapshot
+        query = (0, 2, None, 3, None, None, None, None)
+        self.assertEqual(get_hops(self.pool.search(snapshot, query)[0]),
+                         [[0, 1, 2]])
+        worker = self.pool._idle[0]
+        worker.process.kill()
+        worker.process.join()
+
+        paths, truncated = self.pool.search(snapshot, query, time() + 5)
+        self.assertEqual((get_hops(paths), truncated), ([[0, 1, 2]], False))
+        self.assertEqual(len(self.pool._idle), 1)
+        self.assertIsNot(self.pool._idle[0], worker)
+        self.assertEqual(get_hops(self.pool.search(snapshot, query)[0]),
+                         [[0, 1, 2]])
+
+    def test_collect(self):
+        """Test the paths streamed by a worker are kept past the deadline."""
+        connection, worker = multiprocessing.Pipe()
+        path = next(self.kytos_graph._snapshot.engine.simple_paths(0, 1))
+        worker.send(path)
+        with patch('napps.kytos.pathfinder.pool.GRACE_PERIOD', 0):
+            paths, end = _collect(connection, 0)
+        self.assertEqual(([found.ids for found in paths], end),
+                         ([path.ids], None))
+
+        worker.send(path)
+        worker.send(ValueError())
+        paths, end = _collect(connection, None)
+        self.assertEqual(len(paths), 1)
+        self.assertIsInstance(end, ValueError)
+
+    def test_search_busy(self):
+        """Test search runs in the calling thread when no worker is free."""
+        snapshot = self.kytos_graph._snapshot
+        query = (0, 1, None, 3, None, None, None, None)
+        with patch.object(self.pool, '_slots') as mock_slots:
+            mock_slots.acquire.return_value = False
+            paths, truncated = self.pool.search(snapshot, query, 0)
+        self.assertEqual((get_hops(paths), truncated), ([[0, 1]], True))
+        self.assertEqual(self.pool._idle, [])
+
+    def test_dump(self):
+        """Test snapshots are pickled once and old ones are removed."""
+        paths = []
+        for _ in range(3):
+            snapshot = self.kytos_graph._snapshot
+            paths.append(self.pool._dump(snapshot))
+            self.assertEqual(self.pool._dump(snapshot), paths[-1])
+            self.kytos_graph.clear()
+
+        self.assertEqual([os.path.exists(path) for path in paths],
+                         [False, True, True])
+        self.pool.close()
+        self.assertFalse(os.path.exists(paths[-1]))
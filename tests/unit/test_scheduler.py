@@ -0,0 +1,52 @@
+"""Test CoalescingScheduler methods."""
+from time import sleep
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from napps.kytos.pathfinder.scheduler import CoalescingScheduler
+
+
+class TestCoalescingScheduler(TestCase):
+    """Tests for the CoalescingScheduler class."""
+
+    def setUp(self):
+        """Create a function applying the items."""
+        self.apply = MagicMock()
+
+    def test_submit_burst(self):
+        """Test a burst of items is applied once, with the newest item."""
+        scheduler = CoalescingScheduler(self.apply, 60, 60)
+        for item in range(3):
+            scheduler.submit(item)
+        self.apply.assert_not_called()
+        self.assertEqual(scheduler.stats(), {'received': 3, 'applied': 0,
+                                             'coalesced': 2, 'pending': 1})
+
+        scheduler.flush()
+        scheduler.flush()
+        self.apply.assert_called_once_with(2)
+        self.assertEqual(scheduler.stats()['pending'], 0)
+
+    def test_submit_window(self):
+        """Test the pending item is applied when the window expires."""
+        scheduler = CoalescingScheduler(self.apply, 0.01, 60)
+        scheduler.submit('a')
+        scheduler.submit('b')
+        for _ in range(100):
+            if self.apply.called:
+                break
+            sleep(0.01)
+        self.apply.assert_called_once_with('b')
+
+    def test_submit_max_delay(self):
+        """Test the items are applied once the max delay has passed."""
+        scheduler = CoalescingScheduler(self.apply, 60, 0)
+        scheduler.submit('a')
+        scheduler.submit('b')
+        self.assertEqual(self.apply.call_count, 2)
+
+        scheduler = CoalescingScheduler(self.apply, 0, 60)
+        scheduler.submit('c')
+        self.apply.assert_called_with('c')
+        self.assertEqual(scheduler.stats(), {'received': 1, 'applied': 1,
+                                             'coalesced': 0, 'pending': 0})
@@ -0,0 +1,337 @@
+"""Test PathSearch methods."""
+from unittest import TestCase
+from unittest.mock import patch
+
+import networkx as nx
+
+from napps.kytos.pathfinder.csr import CSRGraph
+from napps.kytos.pathfinder.graph import NetworkXGraph
+from tests.helpers import get_pairs
+
+
+# pylint: disable=protected-access
+class TestPathSearch(TestCase):
+    """Tests for the PathSearch class, through both backends."""
+
+    def setUp(self):
+        """Create a switch-level graph with parallel links.
+
+        S1:1 --1-- S2:1
+        S1:2 --5-- S2:2
+        S1:3 --1-- S3:1
+        S2:3 --1-- S3:2
+        """
+        self.graph = nx.MultiGraph()
+        self.graph.add_edge("S1", "S2", ("S1:1", "S2:1"), delay=1,
+                            bandwidth=10, ownership="red")
+        self.graph.add_edge("S1", "S2", ("S1:2", "S2:2"), delay=5,
+                            bandwidth=100, ownership="blue")
+        self.graph.add_edge("S1", "S3", ("S1:3", "S3:1"), delay=1,
+                            bandwidth=100, ownership="red")
+        self.graph.add_edge("S2", "S3", ("S2:3", "S3:2"), delay=1,
+                            bandwidth=100, ownership="blue")
+        self.graph.graph["interfaces"] = {
+            "S1:1": "S1", "S1:2": "S1", "S1:3": "S1", "S2:1": "S2",
+            "S2:2": "S2", "S2:3": "S2", "S3:1": "S3", "S3:2": "S3"}
+        self.engines = [NetworkXGraph(self.graph), CSRGraph(self.graph)]
+
+    def test_simple_paths_parallel_links(self):
+        """Test simple paths goes through each of the parallel links."""
+        for engine in self.engines:
+            paths = get_pairs(engine.simple_paths("S1", "S2", "delay"))
+            self.assertEqual(paths, [
+                (1, ["S1", "S1:1", "S2:1", "S2"]),
+                (2, ["S1", "S1:3", "S3:1", "S3", "S3:2", "S2:3", "S2"]),
+                (5, ["S1", "S1:2", "S2:2", "S2"])])
+
+    def test_simple_paths_hop_count(self):
+        """Test simple paths counts the switch to interface hops."""
+        for engine in self.engines:
+            costs = [path.cost for path in engine.simple_paths("S1", "S2")]
+            self.assertEqual(costs, [3, 3, 6])
+
+    def test_simple_paths_interfaces(self):
+        """Test simple paths between interfaces."""
+        for engine in self.engines:
+            paths = get_pairs(engine.simple_paths("S1:1", "S2:1", "delay"))
+            self.assertEqual(paths[0], (1, ["S1:1", "S2:1"]))
+            self.assertIn((5, ["S1:1", "S1", "S1:2", "S2:2", "S2", "S2:1"]),
+                          paths)
+            self.assertEqual(len(paths), 3)
+
+            paths = get_pairs(engine.simple_paths("S1:2", "S2"))
+            self.assertEqual(paths[0], (2, ["S1:2", "S2:2", "S2"]))
+            self.assertEqual(get_pairs(engine.simple_paths("S1:1", "S1:1")),
+                             [(0, ["S1:1"])])
+            self.assertEqual(
+                get_pairs(engine.simple_paths("S1:1", "S9:1")), [])
+
+    def test_restrict(self):
+        """Test restrict hides one of the parallel links."""
+        for engine in self.engines:
+            view = engine.restrict([("S2:1", "S1:1")])
+            self.assertFalse(view.has_edge("S1:1", "S2:1"))
+            self.assertTrue(view.has_edge("S1:2", "S2:2"))
+            self.assertEqual(get_pairs(view.simple_paths("S1:1", "S2:1")), [
+                (5, ["S1:1", "S1", "S1:2", "S2:2", "S2", "S2:1"]),
+                (8, ["S1:1", "S1", "S1:3", "S3:1", "S3", "S3:2", "S2:3",
+                     "S2", "S2:1"])])
+
+    def test_shortest_paths_from(self):
+        """Test shortest paths from an interface to switches and interfaces."""
+        for engine in self.engines:
+            tree = engine.shortest_paths_from("S1:2", ["S2", "S3:2", "S9"],
+                                              "delay")
+            self.assertEqual({name: (path.cost, path.hops)
+                              for name, path in tree.items()}, {
+                "S2": (1, ["S1:2", "S1", "S1:1", "S2:1", "S2"]),
+                "S3:2": (1, ["S1:2", "S1", "S1:3", "S3:1", "S3", "S3:2"])})
+
+    def test_equal_cost_paths(self):
+        """Test equal cost paths counts and builds the paths of a DAG."""
+        self.graph.add_edge("S3", "S2", ("S3:3", "S2:4"), delay=1)
+        self.graph.graph["interfaces"].update({"S3:3": "S3", "S2:4": "S2"})
+        for engine in (NetworkXGraph(self.graph), CSRGraph(self.graph)):
+            paths = engine.equal_cost_paths("S1", "S2")
+            self.assertEqual((paths.count, paths.cost), (2, 3))
+            self.assertEqual([path.hops for path in paths],
+                             [["S1", "S1:1", "S2:1", "S2"],
+                              ["S1", "S1:2", "S2:2", "S2"]])
+
+            paths = engine.equal_cost_paths("S1", "S2", "delay")
+            self.assertEqual(paths.count, 1)
+            paths = engine.equal_cost_paths("S3:1", "S2:1", "delay")
+            self.assertEqual((paths.count, paths.cost), (2, 1))
+            self.assertEqual(sorted(path.hops for path in paths), [
+                ["S3:1", "S3", "S3:2", "S2:3", "S2", "S2:1"],
+                ["S3:1", "S3", "S3:3", "S2:4", "S2", "S2:1"]])
+            self.assertEqual(paths.select("flow").hops,
+                             paths.select("flow").hops)
+            self.assertEqual({str(paths.select(str(key)).hops)
+                              for key in range(50)},
+                             {str(path.hops) for path in paths})
+            with self.assertRaises(IndexError):
+                paths.get(2)
+
+            self.assertEqual([path.hops for path in
+                              engine.equal_cost_paths("S1:1", "S1:1")],
+                             [["S1:1"]])
+            self.assertIsNone(engine.equal_cost_paths("S1", "S9"))
+            view = engine.prune([("delay", "max", 0)])
+            self.assertIsNone(view.equal_cost_paths("S1", "S2"))
+
+    def test_is_path(self):
+        """Test is path checks each hop pair against the graph."""
+        for engine in self.engines:
+            self.assertTrue(engine.is_path(
+                ["S1:2", "S1", "S1:3", "S3:1", "S3", "S3:2", "S2:3"]))
+            self.assertTrue(engine.is_path(["S1"]))
+            self.assertFalse(engine.is_path(["S1:2", "S1", "S3:1"]))
+            self.assertFalse(engine.is_path(["S9"]))
+            self.assertFalse(engine.is_path([]))
+            view = engine.restrict([("S1:3", "S3:1")])
+            self.assertFalse(view.is_path(["S1", "S1:3", "S3:1", "S3"]))
+
+    def test_prune(self):
+        """Test prune hides the links failing the predicates."""
+        for engine in self.engines:
+            view = engine.prune([("bandwidth", "min", 100)])
+            self.assertFalse(view.has_edge("S1:1", "S2:1"))
+            self.assertTrue(view.has_edge("S1:2", "S2:2"))
+
+            view = engine.prune([("delay", "max", 1),
+                                 ("ownership", "in", {"red"})])
+            self.assertEqual([edge for edge in self.graph.edges(keys=True)
+                              if view.has_edge(*edge[2])],
+                             [("S1", "S2", ("S1:1", "S2:1")),
+                              ("S1", "S3", ("S1:3", "S3:1"))])
+            self.assertEqual(get_pairs(view.simple_paths("S1", "S2")),
+                             [(3, ["S1", "S1:1", "S2:1", "S2"])])
+            self.assertFalse(engine.prune([("unknown", "min", 0)])
+                             .has_edge("S1:1", "S2:1"))
+
+    def test_simple_paths_bounds(self):
+        """Test simple paths leaves out the paths beyond a bound."""
+        for engine in self.engines:
+            paths = list(engine.simple_paths("S1", "S2", None, {"delay": 2}))
+            self.assertEqual([path.hops for path in paths], [
+                ["S1", "S1:1", "S2:1", "S2"],
+                ["S1", "S1:3", "S3:1", "S3", "S3:2", "S2:3", "S2"]])
+            self.assertEqual([path.totals for path in paths],
+                             [{"delay": 1}, {"delay": 2}])
+            self.assertEqual(get_pairs(engine.simple_paths(
+                "S1:2", "S2", "delay", {"delay": 0})), [])
+
+    def test_path_cost(self):
+        """Test path cost of the hops of a path."""
+        for engine in self.engines:
+            hops = ["S1:2", "S1", "S1:3", "S3:1", "S3", "S3:2", "S2:3"]
+            self.assertEqual(engine.path_cost(hops), 6)
+            self.assertEqual(engine.path_cost(hops, "delay"), 2)
+
+    def test_path_metrics(self):
+        """Test path metrics aggregates the metadata of the path links."""
+        metrics = {"delay": "sum", "bandwidth": "min", "ownership": "max",
+                   "utilization": "max"}
+        for engine in self.engines:
+            path = list(engine.simple_paths("S1", "S2"))[2]
+            self.assertEqual(engine.path_metrics(path, metrics),
+                             {"delay": 2, "bandwidth": 100,
+                              "ownership": None, "utilization": None})
+            path = next(engine.simple_paths("S1", "S2", None, {"delay": 9}))
+            path.totals["delay"] = 7
+            self.assertEqual(engine.path_metrics(
+                path, {"delay": "sum", "bandwidth": "max"}),
+                {"delay": 7, "bandwidth": 10})
+            path = next(engine.simple_paths("S1", "S1"))
+            self.assertEqual(engine.path_metrics(path, metrics),
+                             {"delay": 0, "bandwidth": None,
+                              "ownership": None, "utilization": None})
+
+    def test_disjoint_paths(self):
+        """Test disjoint paths share no link, or no switch."""
+        for engine in self.engines:
+            self.assertEqual(get_pairs(engine.disjoint_paths("S1", "S2",
+                                                             "delay", 3)), [
+                (1, ["S1", "S1:1", "S2:1", "S2"]),
+                (2, ["S1", "S1:3", "S3:1", "S3", "S3:2", "S2:3", "S2"]),
+                (5, ["S1", "S1:2", "S2:2", "S2"])])
+            self.assertEqual(get_pairs(
+                engine.disjoint_paths("S1:1", "S2:2", "delay", 3, True)), [
+                    (1, ["S1:1", "S2:1", "S2", "S2:2"]),
+                    (2, ["S1:1", "S1", "S1:3", "S3:1", "S3", "S3:2", "S2:3",
+                         "S2", "S2:2"]),
+                    (5, ["S1:1", "S1", "S1:2", "S2:2"])])
+            paths = get_pairs(engine.disjoint_paths("S1:1", "S1:3"))
+            self.assertEqual(paths[0], (2, ["S1:1", "S1", "S1:3"]))
+            self.assertEqual([cost for cost, _ in paths], [2, 6])
+            self.assertEqual(engine.disjoint_paths("S1:1", "S9"), [])
+
+    def test_disjoint_paths_lowest_total(self):
+        """Test disjoint paths leaving out the shortest path.
+
+        A --1-- B --3-- D
+        A --3-- C --1-- D
+        B --1-- C
+        The shortest path, A-B-C-D, leaves no disjoint path.
+        """
+        graph = nx.Graph()
+        graph.add_weighted_edges_from(
+            [("A", "B", 1), ("B", "D", 3), ("A", "C", 3), ("C", "D", 1),
+             ("B", "C", 1)], weight="delay")
+        for engine in (NetworkXGraph(graph), CSRGraph(graph)):
+            self.assertEqual(next(engine.simple_paths("A", "D",
+                                                      "delay")).hops,
+                             ["A", "B", "C", "D"])
+            self.assertCountEqual(get_pairs(engine.disjoint_paths("A", "D",
+                                                                  "delay")),
+                                  [(4, ["A", "B", "D"]), (4, ["A", "C", "D"])])
+
+    def test_disjoint_paths_nodes(self):
+        """Test node-disjoint paths do not cross the same switch.
+
+        A -- B -- M -- E -- D
+        A -- C -- M -- F -- D
+        """
+        graph = nx.Graph()
+        graph.add_edges_from([("A", "B"), ("B", "M"), ("M", "E"), ("E", "D"),
+                              ("A", "C"), ("C", "M"), ("M", "F"),
+                              ("F", "D")])
+        for engine in (NetworkXGraph(graph), CSRGraph(graph)):
+            self.assertEqual(len(engine.disjoint_paths("A", "D")), 2)
+            self.assertEqual(len(engine.disjoint_paths("A", "D", None, 2,
+                                                       True)), 1)
+
+    def test_set_landmarks(self):
+        """Test landmarks are the farthest nodes and keep their distances."""
+        for engine in self.engines:
+            engine.set_landmarks(5)
+            self.assertEqual([engine._name(node) for node in
+                              engine.landmarks], ["S2", "S1", "S3"])
+            node = engine._node("S2")
+            self.assertEqual(engine._landmark_distances["delay"][node],
+                             (0, 1, 1))
+            self.assertEqual(engine._landmark_distances[None][node],
+                             (0, 3, 3))
+
+    def test_simple_paths_landmarks(self):
+        """Test simple paths with landmarks finds the same paths."""
+        for engine in self.engines:
+            expected = [get_pairs(engine.simple_paths(*pair, weight))
+                        for pair in (("S1", "S2"), ("S1:2", "S3:2"))
+                        for weight in (None, "delay")]
+            engine.set_landmarks(2)
+            with patch.object(engine, "_dijkstra") as mock_dijkstra:
+                paths = [get_pairs(engine.simple_paths(*pair, weight))
+                         for pair in (("S1", "S2"), ("S1:2", "S3:2"))
+                         for weight in (None, "delay")]
+            mock_dijkstra.assert_not_called()
+            self.assertEqual([[cost for cost, _ in pair_paths]
+                              for pair_paths in paths],
+                             [[cost for cost, _ in pair_paths]
+                              for pair_paths in expected])
+
+    def test_heuristic(self):
+        """Test the landmark bounds stay below the costs to the target."""
+        for engine in self.engines:
+            engine.set_landmarks(2)
+            view = engine._attach(["S1:2", "S3:2"])
+            costs = view._get_weights("delay")
+            target = view._resolve("S3:2")
+            heuristic = view._get_heuristic(target, "delay")
+            for node, cost in view._distances(target, costs).items():
+                self.assertLessEqual(heuristic(node), cost)
+            self.assertIsNone(view._get_heuristic(target, "unknown"))
+
+    def test_metadata_defaults(self):
+        """Test links missing a metadata key take the default of the key.
+
+        A --1-- B --1-- C
+        A ------------- C, without delay nor bandwidth
+        """
+        graph = nx.Graph()
+        graph.add_edge("A", "B", delay=1, bandwidth=10)
+        graph.add_edge("B", "C", delay=1, bandwidth=10)
+        graph.add_edge("A", "C")
+        defaults = {"delay": float("inf")}
+        for engine in (NetworkXGraph(graph, defaults),
+                       CSRGraph(graph, defaults)):
+            self.assertEqual(get_pairs(engine.simple_paths("A", "C", "delay")),
+                             [(2, ["A", "B", "C"])])
+            self.assertEqual(get_pairs(engine.simple_paths("A", "C",
+                                                           "bandwidth")),
+                             [(0, ["A", "C"]), (20, ["A", "B", "C"])])
+            self.assertFalse(engine.prune([("bandwidth", "min", 1)])
+                             .has_edge("A", "C"))
+            self.assertTrue(engine.prune([("delay", "min", 1)])
+                            .has_edge("A", "C"))
+            self.assertTrue(engine.prune([("bandwidth", "in", {0})])
+                            .has_edge("A", "C"))
+
+        for engine in (NetworkXGraph(graph), CSRGraph(graph)):
+            path = next(engine.simple_paths("A", "C", "delay"))
+            self.assertEqual((path.cost, path.hops), (0, ["A", "C"]))
+
+    def test_metadata_defaults_without_values(self):
+        """Test a key no link has is weighed by its default.
+
+        A ----- B ----- C
+        A ------------- C, none of the links with a delay
+        """
+        graph = nx.Graph()
+        graph.add_edge("A", "B")
+        graph.add_edge("B", "C")
+        graph.add_edge("A", "C")
+        for engine in (NetworkXGraph(graph, {"delay": 5}),
+                       CSRGraph(graph, {"delay": 5})):
+            self.assertEqual(get_pairs(engine.simple_paths("A", "C", "delay")),
+                             [(5, ["A", "C"]), (10, ["A", "B", "C"])])
+
+        for engine in (NetworkXGraph(graph, {"delay": float("inf")}),
+                       CSRGraph(graph, {"delay": float("inf")})):
+            engine.set_landmarks(2)
+            self.assertEqual(list(engine.simple_paths("A", "C", "delay")), [])
+            self.assertFalse(engine.prune([("delay", "max", 10)])
+                             .has_edge("A", "C"))
+            self.assertEqual(get_pairs(engine.simple_paths("A", "C")),
+                             [(1, ["A", "C"]), (2, ["A", "B", "C"])])
@@ -0,0 +1,66 @@
+"""Test NextHopTable methods."""
+from unittest import TestCase
+
+import networkx as nx
+
+from napps.kytos.pathfinder.csr import CSRGraph
+from napps.kytos.pathfinder.graph import KytosGraph, NetworkXGraph
+from napps.kytos.pathfinder.tables import NextHopTable
+
+
+# pylint: disable=protected-access
+
+class TestNextHopTable(TestCase):
+    """Tests for the NextHopTable class, over both backends."""
+
+    def setUp(self):
+        """Create a switch-level graph with parallel links.
+
+        S1:1 --1-- S2:1
+        S1:2 --5-- S2:2
+        S1:3 --1-- S3:1
+        S2:3 --1-- S3:2
+        S4
+        """
+        self.graph = nx.MultiGraph()
+        self.graph.add_edge("S1", "S2", ("S1:1", "S2:1"), delay=1)
+        self.graph.add_edge("S1", "S2", ("S1:2", "S2:2"), delay=5)
+        self.graph.add_edge("S1", "S3", ("S1:3", "S3:1"), delay=1)
+        self.graph.add_edge("S2", "S3", ("S2:3", "S3:2"), delay=1)
+        self.graph.add_node("S4")
+        self.graph.graph["interfaces"] = {
+            "S1:1": "S1", "S1:2": "S1", "S1:3": "S1", "S2:1": "S2",
+            "S2:2": "S2", "S2:3": "S2", "S3:1": "S3", "S3:2": "S3"}
+        self.engines = [NetworkXGraph(self.graph), CSRGraph(self.graph)]
+
+    def test_path(self):
+        """Test path walks the lowest cost links between two switches."""
+        for engine in self.engines:
+            table = NextHopTable(self.graph, engine, "delay")
+            path = table.path("S2", "S1")
+            self.assertEqual((path.cost, path.hops),
+                             (1, ["S2", "S2:1", "S1:1", "S1"]))
+            self.assertEqual(table.path("S1", "S1").hops, ["S1"])
+            self.assertEqual(table.path("S1", "S4"), ())
+            self.assertIsNone(table.path("S1:1", "S2"))
+            self.assertEqual(table.nbytes, 16 * 4 ** 2)
+
+    def test_path_hop_count(self):
+        """Test path counts the switch hops without a weight."""
+        for engine in self.engines:
+            table = NextHopTable(self.graph, engine)
+            path = table.path("S3", "S2")
+            self.assertEqual(path.cost, 3)
+            self.assertEqual(path.hops, ["S3", "S3:2", "S2:3", "S2"])
+
+    def test_path_relinked(self):
+        """Test path skips the links hidden in a relinked engine."""
+        graph = KytosGraph._patch_graph(
+            self.graph, [("S1", "S2", ("S1:1", "S2:1"))], [])
+        for engine in self.engines:
+            engine = engine.relink([("S1:1", "S2:1")], {})
+            table = NextHopTable(graph, engine, "delay")
+            path = table.path("S2", "S1")
+            self.assertEqual((path.cost, path.hops),
+                             (2, ["S2", "S2:3", "S3:2", "S3", "S3:1", "S1:3",
+                                  "S1"]))